@@ -0,0 +1,31 @@
+"""
+Road Fighter - Remote Env Server
+
+Hosts a batch of races for train.py's "remote" backend (see src/remote_env.py).
+Start one per machine, then list the addresses in train.py's
+REMOTE_ENV_ADDRESSES:
+
+    python env_server.py --address 10.0.0.5:5555 --envs 16
+    python env_server.py --address unix:/tmp/road_fighter.sock --envs 8
+
+The server is unauthenticated and listens on loopback by default: only
+bind it to an interface of a trusted network.
+"""
+
+import argparse
+from src.remote_env import serve
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Road Fighter races to a remote trainer")
+    parser.add_argument("--address", default="127.0.0.1:5555",
+                        help="host:port or unix:/path (default: loopback only)")
+    parser.add_argument("--envs", type=int, default=8, help="Races hosted by this server")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--frame-skip", type=int, default=8, help="Must match train.py's FRAME_SKIP")
+    args = parser.parse_args()
+    serve(args.address, args.envs, num_workers=args.workers, env_kwargs={'frame_skip': args.frame_skip})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Road Fighter - Checkpoint Evaluation
+
+Loads each checkpoint once and plays a seeded suite of headless episodes
+with it: evaluate_episodes (src/inference.py) fans them out over worker
+processes of RacingGameEnv races, every action coming from one batched
+predict per round. The same seeds give every checkpoint the same traffic,
+so reports compare directly.
+
+Reports (JSON): win / timeout / collision rates, collisions by the car type
+hit, mean distance, reward and length, cars passed by type and score
+percentiles.
+
+Usage: python evaluate.py [checkpoint.zip ...] [--episodes N] [--seed S]
+                          [--workers N] [--output report.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
+from src.config import GameConfig
+from src.inference import evaluate_episodes
+
+# =========================================================
+# CONFIGURATION
+# =========================================================
+DEFAULT_CHECKPOINT = os.path.join("modelTraining", "models", "road_fighter_ppo_final.zip")
+EPISODES = 100
+SUITE_SEED = 0  # Episodes use seeds SUITE_SEED .. SUITE_SEED + EPISODES - 1
+FRAME_SKIP = 8  # As in train.py: evaluate with the frame skip the policy was trained on
+GAME_CONFIG = None  # As in train.py: the GameConfig variant to race on (None = src/constants.py)
+ENVS_PER_WORKER = 4
+SCORE_PERCENTILES = (5, 25, 50, 75, 95)
+CAR_TYPES = ('green', 'yellow', 'red')
+
+
+def summarize(infos):
+    """Suite statistics from evaluate_episodes' final infos"""
+    n = len(infos)
+    end_reasons = [info['end_reason'] for info in infos]
+    scores = np.array([info['score'] for info in infos], dtype=np.float64)
+    return {
+        'episodes': n,
+        'win_rate': end_reasons.count('victory') / n,
+        'timeout_rate': end_reasons.count('timeout') / n,
+        'collision_rate': end_reasons.count('collision') / n,
+        # Share of all episodes that ended hitting each car type
+        'collision_rate_by_car': {
+            car: sum(info.get('collision_car_type') == car for info in infos) / n for car in CAR_TYPES
+        },
+        'mean_distance': float(np.mean([info['distance'] for info in infos])),
+        'mean_reward': float(np.mean([info['reward'] for info in infos])),
+        'mean_length': float(np.mean([info['length'] for info in infos])),
+        'mean_cars_passed': {
+            car: float(np.mean([info['cars_passed'][car] for info in infos])) for car in CAR_TYPES
+        },
+        'score': dict(
+            {'mean': float(scores.mean())},
+            **{f"p{q}": float(np.percentile(scores, q)) for q in SCORE_PERCENTILES},
+        ),
+    }
+
+
+def evaluate_checkpoint(path, episodes=EPISODES, seed=SUITE_SEED, num_workers=None,
+                        envs_per_worker=ENVS_PER_WORKER, frame_skip=FRAME_SKIP, deterministic=True,
+                        config=GAME_CONFIG):
+    """Play the seeded suite with the checkpoint at path and return its report"""
+    from stable_baselines3 import PPO
+
+    # 1. Load once; workers only ever see observations and actions
+    model = PPO.load(path, device="cpu")
+    seeds = list(range(seed, seed + episodes))
+
+    # 2. Fan the suite out over the worker processes
+    start = time.perf_counter()
+    infos = evaluate_episodes(model, seeds, num_workers=num_workers, envs_per_worker=envs_per_worker,
+                              env_kwargs={'frame_skip': frame_skip, 'config': config},
+                              deterministic=deterministic)
+    seconds = time.perf_counter() - start
+
+    return dict(
+        {'checkpoint': path, 'seeds': [seeds[0], seeds[-1]], 'frame_skip': frame_skip,
+         'deterministic': deterministic, 'seconds': round(seconds, 3)},
+        **summarize(infos),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate PPO checkpoints on a seeded episode suite")
+    parser.add_argument("checkpoints", nargs="*", default=[DEFAULT_CHECKPOINT])
+    parser.add_argument("--episodes", type=int, default=EPISODES)
+    parser.add_argument("--seed", type=int, default=SUITE_SEED, help="First seed of the suite")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--envs-per-worker", type=int, default=ENVS_PER_WORKER)
+    parser.add_argument("--frame-skip", type=int, default=FRAME_SKIP)
+    parser.add_argument("--stochastic", action="store_true", help="Sample actions instead of the best one")
+    parser.add_argument("--output", default=None, help="Write the JSON report here (default: stdout)")
+    args = parser.parse_args()
+
+    reports = []
+    for path in args.checkpoints:
+        if not os.path.exists(path):
+            parser.error(f"checkpoint not found: {path}")
+        report = evaluate_checkpoint(path, args.episodes, args.seed, args.workers, args.envs_per_worker,
+                                     args.frame_skip, deterministic=not args.stochastic)
+        reports.append(report)
+        print(f"📊 {path}: wins {report['win_rate']:.0%}, collisions {report['collision_rate']:.0%},"
+              f" distance {report['mean_distance']:.0f}, median score {report['score']['p50']:.0f}"
+              f" ({report['episodes']} episodes in {report['seconds']:.1f}s)", file=sys.stderr)
+
+    text = json.dumps(reports[0] if len(reports) == 1 else reports, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+        print(f"💾 Report written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
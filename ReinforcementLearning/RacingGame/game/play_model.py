@@ -10,6 +10,8 @@ import time
 BASE_MODEL_TRAINING_DIR_NAME = "modelTraining"
 MODEL_PATH = os.path.join(BASE_MODEL_TRAINING_DIR_NAME, "models", "road_fighter_ppo_final")
 FRAME_SKIP = 4
+RENDER_MODE = "human"  # "human": real time at 60 FPS; "turbo": uncapped simulation, DISPLAY_FPS frames shown per second
+DISPLAY_FPS = 15  # "turbo" only: frames drawn per wall-clock second (the rest are simulated, not drawn)
 
 def main():
     print(f"Loading model from: {MODEL_PATH}")
@@ -20,9 +22,9 @@ def main():
         print("Did you run 'python train.py' first?")
         return
 
-    # 2. Create Environment (Human Render Mode)
-    # We want to see the game, so render_mode="human"
-    env = RacingGameEnv(render_mode="human", frame_skip=FRAME_SKIP)
+    # 2. Create Environment (Human or Turbo Render Mode)
+    # One env, so one window and renderer for every episode
+    env = RacingGameEnv(render_mode=RENDER_MODE, frame_skip=FRAME_SKIP, display_fps=DISPLAY_FPS)
     
     # 3. Load the Trained Agent
     model = PPO.load(MODEL_PATH)
@@ -30,6 +32,7 @@ def main():
     print("\n🎮 Starting Replay... Press ESC to Quit.")
     
     episodes = 0
+    start_time = time.time()
     while True:
         episodes += 1
         obs, _ = env.reset()
@@ -54,6 +57,8 @@ def main():
             # time.sleep(0.01) 
             
         print(f"Episode Finished. Total Neural Reward: {total_reward:.2f}")
+        if RENDER_MODE == "turbo":
+            print(f"⏩ {episodes / max(time.time() - start_time, 1e-9) * 60:.1f} episodes/minute")
         
         # Determine if we should quit based on pygame events (handled in env)
         # If the window was closed, env.close() handles it usually, 
@@ -0,0 +1,252 @@
+"""
+Road Fighter - Asynchronous Evaluator
+
+Evaluates the policy being trained in a separate process, so training never
+waits on it. The trainer publishes its weights into a shared-memory block
+(a parameter copy, no model.zip round-trip); whenever the evaluator is free
+it takes the newest version, plays a round of seeded headless episodes on
+the engine the trainer collects with (all races stepped at once on the
+batched engine, or RacingGameEnv races in-process for the other backends),
+and puts the metrics on a queue the trainer drains without blocking.
+"""
+
+import copy
+import queue
+import time
+import numpy as np
+from multiprocessing import shared_memory
+from stable_baselines3.common.callbacks import BaseCallback
+from stable_baselines3.common.env_util import make_vec_env
+from .batched_env import BatchedRoadFighter
+from .gym_env import RacingGameEnv
+from .shm_worker import mp_context
+
+# Seconds the evaluator waits for new weights before re-checking for shutdown
+EVAL_POLL_INTERVAL = 0.5
+HEADER_BYTES = 8  # int64: the training step the published weights come from
+# train.py backends whose workers or servers step RacingGameEnv races
+REFERENCE_BACKENDS = ("dummy", "shm", "pool", "remote")
+
+
+def _weight_layout(policy):
+    """(name, shape) of every floating-point tensor in the policy's state dict"""
+    return [(name, tuple(tensor.shape)) for name, tensor in policy.state_dict().items()
+            if tensor.is_floating_point()]
+
+
+def _attach_weights(buf, layout):
+    size = sum(int(np.prod(shape)) for _, shape in layout)
+    header = np.ndarray((1,), dtype=np.int64, buffer=buf)
+    flat = np.ndarray((size,), dtype=np.float32, buffer=buf, offset=HEADER_BYTES)
+    return header, flat
+
+
+def make_eval_env(num_envs, frame_skip, backend="batched", env_kwargs=None):
+    """
+    num_envs in-process races on the engine of train.py's backend: the
+    batched engine for "batched", RacingGameEnv races (Monitor-wrapped) for
+    the others. env_kwargs go to the env constructor with frame_skip.
+    """
+    env_kwargs = dict(env_kwargs or {}, frame_skip=frame_skip)
+    if backend == "batched":
+        return BatchedRoadFighter(num_envs, **env_kwargs)
+    if backend in REFERENCE_BACKENDS:
+        return make_vec_env(RacingGameEnv, n_envs=num_envs, env_kwargs=env_kwargs)
+    raise ValueError(f"Unknown VEC_ENV_BACKEND: {backend}")
+
+
+def play_round(policy, env, n_episodes, deterministic=True, stop=None):
+    """
+    Play n_episodes on env (a VecEnv whose finished races report 'episode',
+    see make_eval_env), race i taking
+    episodes i, i + num_envs, ... so short episodes are not over-counted.
+    Returns their final infos (None if stop was set first).
+    """
+    num_envs = env.num_envs
+    quota = np.full(num_envs, n_episodes // num_envs)
+    quota[:n_episodes % num_envs] += 1
+    infos = []
+    obs = env.reset()
+    while len(infos) < n_episodes:
+        if stop is not None and stop.is_set():
+            return None
+        actions, _ = policy.predict(obs, deterministic=deterministic)
+        obs, _, dones, step_infos = env.step(actions)
+        for idx in np.flatnonzero(dones & (quota > 0)):
+            quota[idx] -= 1
+            infos.append(step_infos[idx])
+    return infos
+
+
+def episode_metrics(infos):
+    """Summary statistics of a round of final episode infos"""
+    rewards = np.array([info['episode']['r'] for info in infos])
+    return {
+        'episodes': len(infos),
+        'mean_reward': float(rewards.mean()),
+        'std_reward': float(rewards.std()),
+        'mean_length': float(np.mean([info['episode']['l'] for info in infos])),
+        'mean_distance': float(np.mean([info['distance'] for info in infos])),
+        'win_rate': float(np.mean([info['victory'] for info in infos])),
+        'collision_rate': float(np.mean([info['end_reason'] == 'collision' for info in infos])),
+    }
+
+
+def _evaluator(policy, shm_name, layout, lock, fresh, stop, results, settings):
+    """Evaluator process: evaluate each newest published version until stopped"""
+    import torch
+    torch.set_num_threads(1)  # Leave the cores to training
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    header, flat = _attach_weights(shm.buf, layout)
+    env = make_eval_env(min(settings['n_episodes'], settings['max_parallel']), settings['frame_skip'],
+                        settings['backend'], settings['env_kwargs'])
+    policy.set_training_mode(False)
+    try:
+        while not stop.is_set():
+            if not fresh.wait(EVAL_POLL_INTERVAL) or stop.is_set():
+                continue
+            # 1. Take the newest weights
+            with lock:
+                fresh.clear()
+                num_timesteps = int(header[0])
+                weights = flat.copy()
+            state, offset = {}, 0
+            for name, shape in layout:
+                size = int(np.prod(shape))
+                state[name] = torch.from_numpy(weights[offset:offset + size].reshape(shape))
+                offset += size
+            policy.load_state_dict(state, strict=False)
+
+            # 2. Same seeded races every round, so rounds compare
+            start = time.perf_counter()
+            env.seed(settings['seed'])
+            infos = play_round(policy, env, settings['n_episodes'], settings['deterministic'], stop)
+            if infos is None:
+                break
+            results.put(dict(episode_metrics(infos), timesteps=num_timesteps,
+                             seconds=time.perf_counter() - start))
+    finally:
+        env.close()
+        del header, flat
+        shm.close()
+
+
+class AsyncEvaluator:
+    """
+    Evaluator process for policies shaped like `policy`.
+
+    publish(policy, num_timesteps) hands it the current weights and returns
+    at once (False, to retry later, in the rare case the evaluator is
+    copying the previous version right then); results() returns the metrics
+    of every round finished since the last call. Versions published while a
+    round runs are superseded: only the newest is evaluated next.
+
+    frame_skip, backend and env_kwargs describe the training envs (see
+    make_eval_env); frame_skip has no default, so evaluation cannot silently
+    run at another frame skip than training.
+    """
+
+    def __init__(self, policy, n_episodes=8, seed=0, frame_skip=None, max_parallel=16,
+                 deterministic=True, start_method=None, backend="batched", env_kwargs=None):
+        if frame_skip is None:
+            raise ValueError("frame_skip must be given: the training envs' frame skip")
+        if backend != "batched" and backend not in REFERENCE_BACKENDS:
+            raise ValueError(f"Unknown VEC_ENV_BACKEND: {backend}")
+        ctx = mp_context(start_method)
+        self._layout = _weight_layout(policy)
+        size = sum(int(np.prod(shape)) for _, shape in self._layout)
+        self._shm = shared_memory.SharedMemory(create=True, size=HEADER_BYTES + 4 * size)
+        self._header, self._flat = _attach_weights(self._shm.buf, self._layout)
+        self._lock = ctx.Lock()
+        self._fresh = ctx.Event()
+        self._stop = ctx.Event()
+        self._results = ctx.Queue()
+        settings = {'n_episodes': n_episodes, 'seed': seed, 'frame_skip': frame_skip,
+                    'max_parallel': max_parallel, 'deterministic': deterministic,
+                    'backend': backend, 'env_kwargs': dict(env_kwargs or {})}
+        self._process = ctx.Process(
+            target=_evaluator,
+            args=(copy.deepcopy(policy).cpu(), self._shm.name, self._layout, self._lock,
+                  self._fresh, self._stop, self._results, settings),
+            daemon=True,
+        )
+        self._process.start()
+        self.closed = False
+
+    def publish(self, policy, num_timesteps):
+        """Copy policy's weights for the evaluator; never blocks"""
+        if not self._lock.acquire(block=False):
+            return False
+        try:
+            state = policy.state_dict()
+            offset = 0
+            for name, shape in self._layout:
+                size = int(np.prod(shape))
+                self._flat[offset:offset + size] = state[name].detach().cpu().numpy().ravel()
+                offset += size
+            self._header[0] = num_timesteps
+        finally:
+            self._lock.release()
+        self._fresh.set()
+        return True
+
+    def results(self):
+        """Metrics of the rounds finished since the last call, oldest first"""
+        finished = []
+        while True:
+            try:
+                finished.append(self._results.get_nowait())
+            except queue.Empty:
+                return finished
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._stop.set()
+        self._fresh.set()
+        self._process.join(timeout=5.0)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._header = self._flat = None
+        self._shm.close()
+        self._shm.unlink()
+
+
+class AsyncEvalCallback(BaseCallback):
+    """
+    Publishes the policy to an AsyncEvaluator every eval_freq calls and logs
+    finished rounds under eval/ (eval/timesteps is the step the evaluated
+    weights come from). The evaluator outlives learn(): close it afterwards.
+    """
+
+    def __init__(self, evaluator, eval_freq, verbose=1):
+        super().__init__(verbose)
+        self.evaluator = evaluator
+        self.eval_freq = eval_freq
+        self._due = False
+        self.history = []
+
+    def _on_step(self):
+        if self.n_calls % self.eval_freq == 0:
+            self._due = True
+        if self._due:
+            # Pipelined learners train self.policy meanwhile: publish the acting copy
+            policy = getattr(self.model, 'acting_policy', self.model.policy)
+            self._due = not self.evaluator.publish(policy, self.num_timesteps)
+        for metrics in self.evaluator.results():
+            self._log(metrics)
+        return True
+
+    def _log(self, metrics):
+        self.history.append(metrics)
+        for key, value in metrics.items():
+            self.logger.record(f"eval/{key}", value)
+        if self.verbose:
+            print(f"\n📋 Eval @ {metrics['timesteps']:,} steps: reward {metrics['mean_reward']:.2f}, "
+                  f"distance {metrics['mean_distance']:.0f}, wins {metrics['win_rate']:.0%}\n")
+
+    def _on_training_end(self):
+        for metrics in self.evaluator.results():
+            self._log(metrics)
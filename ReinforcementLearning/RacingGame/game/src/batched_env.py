@@ -0,0 +1,601 @@
+"""
+Road Fighter - Batched Simulation Engine
+
+Steps N independent races at once. Player and opponent state live in
+preallocated struct-of-arrays NumPy buffers, and every rule of
+RoadFighterGame (physics, spawning, kinematics, passing, collisions,
+rewards and State V3 features) is applied to all races with array ops.
+
+The class implements the Stable-Baselines3 VecEnv interface directly, so it
+can replace make_vec_env(RacingGameEnv, n_envs=N) in train.py. Road, physics,
+spawning and difficulty come from a GameConfig, like RoadFighterGame.
+"""
+
+import math
+import time
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.vec_env.base_vec_env import VecEnv
+from .constants import *
+from .config import DEFAULT_CONFIG
+from .observation import (
+    OBS_SIZE, K_NEAREST, OPPONENT_FEATURES, OPPONENT_PADDING, TYPE_FEATURE,
+    OPPONENT_SPEED_REFERENCE,
+)
+
+# Opponent car type codes (index into the per-type tables below)
+GREEN, YELLOW, RED = 0, 1, 2
+CAR_TYPE_NAMES = ('green', 'yellow', 'red')
+NO_TYPE = -1
+
+# End reason codes
+END_NONE, END_COLLISION, END_TIMEOUT, END_VICTORY = 0, 1, 2, 3
+END_REASON_NAMES = (None, 'collision', 'timeout', 'victory')
+
+# Max simultaneous opponents per race (spacing rules keep it below ~8)
+MAX_OPPONENTS = 16
+
+# Per-type tables (indexed by car type code)
+PASSING_BONUS = np.array([2.0, 3.0, 5.0])
+COLLISION_PENALTY = np.array([-5.0, -3.0, -1.0])
+TYPE_FEATURE_BY_CODE = np.array([TYPE_FEATURE[name] for name in CAR_TYPE_NAMES])
+
+# Termination rewards applied by RacingGameEnv (indexed by END_* code)
+TERMINAL_REWARD = np.array([0.0, -100.0, 0.0, 100.0])
+
+
+class BatchedRoadFighter(VecEnv):
+    """
+    Vectorized Road Fighter engine for N races.
+    Mirrors RacingGameEnv(frame_skip=...) semantics, including auto-reset
+    and the 'terminal_observation' / 'episode' info keys SB3 expects.
+    """
+
+    def __init__(self, num_envs, frame_skip=4, seed=None, max_opponents=MAX_OPPONENTS, config=None):
+        self.config = config = DEFAULT_CONFIG if config is None else config
+        self.frame_skip = frame_skip
+        self.max_opponents = max_opponents
+        self.render_mode = None
+        self.spawn_interval = config.spawn_interval
+        self.rng = np.random.default_rng(seed)
+
+        # Config tables as arrays: opponent x centered in each lane, the
+        # difficulty steps, blocking pairs and the red car's two road halves
+        self._lane_car_x = np.array(config.lane_centers, dtype=np.float64) - config.opponent_width // 2
+        self._thresholds = np.array(config.multiplier_thresholds)
+        self._multipliers = np.array(config.multiplier_values)
+        self._lane_pairs = np.array(config.blocking_lane_pairs, dtype=np.int64).reshape(-1, 2)
+        self._lower_lanes = np.array(config.lower_lanes, dtype=np.int64)
+        self._upper_lanes = np.array(config.upper_lanes, dtype=np.int64)
+        self._spawn_y = -config.opponent_height
+
+        n, m = num_envs, max_opponents
+        self._rows = np.arange(n)
+
+        # Player state
+        self.player_x = np.zeros(n)
+        self.player_vy = np.zeros(n)
+        self.player_lane = np.zeros(n, dtype=np.int64)
+        self.changing_lane = np.zeros(n, dtype=bool)
+        self.lane_start_x = np.zeros(n)
+        self.lane_target_x = np.zeros(n)
+        self.lane_progress = np.zeros(n)
+
+        # Race state
+        self.game_over = np.zeros(n, dtype=bool)
+        self.end_reason = np.zeros(n, dtype=np.int64)
+        self.elapsed_time = np.zeros(n)
+        self.time_remaining = np.zeros(n)
+        self.distance_traveled = np.zeros(n)
+        self.weighted_distance_score = np.zeros(n)
+        self.passing_bonus = np.zeros(n)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.cars_passed = np.zeros((n, 3), dtype=np.int64)
+        self.collision_car_type = np.full(n, NO_TYPE, dtype=np.int64)
+        self.rewards_active = np.zeros(n, dtype=bool)
+
+        # Spawning and camping state
+        self.time_since_last_spawn = np.zeros(n)
+        self.player_current_lane_cars_passed = np.zeros(n, dtype=np.int64)
+        self.last_player_lane = np.zeros(n, dtype=np.int64)
+        self.lane_camping_mode = np.zeros(n, dtype=bool)
+        self.last_spawned_type = np.zeros(n, dtype=np.int64)
+        self.consecutive_same_type = np.zeros(n, dtype=np.int64)
+        self.last_spawned_lane = np.zeros(n, dtype=np.int64)
+        self.consecutive_same_lane = np.zeros(n, dtype=np.int64)
+        self.last_red_car_lane = np.zeros(n, dtype=np.int64)
+
+        # Opponent pool (N races x M slots)
+        self.opp_active = np.zeros((n, m), dtype=bool)
+        self.opp_x = np.zeros((n, m))
+        self.opp_y = np.zeros((n, m))
+        self.opp_type = np.zeros((n, m), dtype=np.int64)
+        self.opp_lane = np.zeros((n, m), dtype=np.int64)
+        self.opp_start_lane = np.zeros((n, m), dtype=np.int64)
+        self.opp_adjacent_lane = np.zeros((n, m), dtype=np.int64)
+        self.opp_direction = np.zeros((n, m))
+        self.opp_timer = np.zeros((n, m))
+        self.opp_passed = np.zeros((n, m), dtype=bool)
+
+        # Episode bookkeeping (Monitor-style stats)
+        self.episode_reward = np.zeros(n)
+        self.episode_length = np.zeros(n, dtype=np.int64)
+        self._t_start = time.time()
+
+        # Step buffers
+        self._obs = np.zeros((n, OBS_SIZE), dtype=np.float32)
+        self._actions = np.zeros(n, dtype=np.int64)
+
+        observation_space = spaces.Box(low=-3.0, high=3.0, shape=(OBS_SIZE,), dtype=np.float32)
+        action_space = spaces.Discrete(4)
+        super().__init__(num_envs, observation_space, action_space)
+
+        self._reset_envs(np.ones(n, dtype=bool))
+
+    # ------------------------------------------------------------------
+    # VecEnv interface
+    # ------------------------------------------------------------------
+    def reset(self):
+        seed = self._seeds[0]
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self._reset_seeds()
+        self._reset_options()
+        self._reset_envs(np.ones(self.num_envs, dtype=bool))
+        self._write_obs(self._obs)
+        return self._obs.copy()
+
+    def step_async(self, actions):
+        self._actions[:] = np.asarray(actions).reshape(self.num_envs)
+
+    def step_wait(self):
+        actions = self._actions
+        left = actions == 1
+        right = actions == 2
+        brake = actions == 3
+
+        rewards = np.zeros(self.num_envs)
+        alive = ~self.game_over
+        for _ in range(self.frame_skip):
+            if not alive.any():
+                break
+            frame_reward = self._frame(alive, left, right, brake)
+            rewards += np.where(alive, frame_reward, 0.0)
+
+            ended = alive & self.game_over
+            if ended.any():
+                # Same bookkeeping as RacingGameEnv: the terminal frame's
+                # reward is added again together with the end bonus
+                rewards[ended] += frame_reward[ended] + TERMINAL_REWARD[self.end_reason[ended]]
+                alive &= ~ended
+
+        self.episode_reward += rewards
+        self.episode_length += 1
+        self._write_obs(self._obs)
+
+        dones = self.game_over.copy()
+        infos = [{} for _ in range(self.num_envs)]
+        if dones.any():
+            for idx in np.flatnonzero(dones):
+                info = self._episode_info(idx)
+                info["terminal_observation"] = self._obs[idx].copy()
+                infos[idx] = info
+            self._reset_envs(dones)
+            self._write_obs(self._obs)
+
+        return self._obs.copy(), rewards.astype(np.float32), dones, infos
+
+    def seed(self, seed=None):
+        if seed is None:
+            seed = int(np.random.randint(0, np.iinfo(np.uint32).max, dtype=np.uint32))
+        self.rng = np.random.default_rng(seed)
+        return [seed + idx for idx in range(self.num_envs)]
+
+    def close(self):
+        pass
+
+    def get_attr(self, attr_name, indices=None):
+        value = getattr(self, attr_name)
+        return [value for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        method = getattr(self, method_name)
+        return [method(*method_args, **method_kwargs) for _ in self._get_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
+
+    # ------------------------------------------------------------------
+    # Simulation
+    # ------------------------------------------------------------------
+    def _reset_envs(self, mask):
+        """Reset the races selected by mask to their starting state"""
+        config = self.config
+        self.player_x[mask] = config.player_start_x
+        self.player_vy[mask] = config.player_base_speed
+        self.player_lane[mask] = config.player_start_lane
+        self.changing_lane[mask] = False
+        self.lane_start_x[mask] = config.player_start_x
+        self.lane_target_x[mask] = config.player_start_x
+        self.lane_progress[mask] = 0.0
+
+        self.game_over[mask] = False
+        self.end_reason[mask] = END_NONE
+        self.elapsed_time[mask] = 0.0
+        self.time_remaining[mask] = config.race_time_limit
+        self.distance_traveled[mask] = 0.0
+        self.weighted_distance_score[mask] = 0.0
+        self.passing_bonus[mask] = 0.0
+        self.score[mask] = 0
+        self.cars_passed[mask] = 0
+        self.collision_car_type[mask] = NO_TYPE
+        self.rewards_active[mask] = False
+
+        self.time_since_last_spawn[mask] = 0.0
+        self.player_current_lane_cars_passed[mask] = 0
+        self.last_player_lane[mask] = config.player_start_lane
+        self.lane_camping_mode[mask] = False
+        self.last_spawned_type[mask] = NO_TYPE
+        self.consecutive_same_type[mask] = 0
+        self.last_spawned_lane[mask] = -1
+        self.consecutive_same_lane[mask] = 0
+        self.last_red_car_lane[mask] = -1
+
+        self.opp_active[mask] = False
+        self.opp_passed[mask] = False
+
+        self.episode_reward[mask] = 0.0
+        self.episode_length[mask] = 0
+
+    def _speed_multiplier(self):
+        return self._multipliers[np.searchsorted(self._thresholds, self.elapsed_time, side='right')]
+
+    def _frame(self, alive, left, right, brake):
+        """Advance every race in `alive` by one 1/60s frame. Returns per-race reward."""
+        dt = FRAME_DT
+
+        # 1. Player
+        self.elapsed_time[alive] += dt
+        self._update_player(alive, left, right, brake, dt)
+        distance_delta = (self.player_vy / 3.6) * dt
+        self.distance_traveled[alive] += distance_delta[alive]
+
+        # 2. Time / 3. Victory
+        self.time_remaining[alive] -= dt
+        timeout = alive & (self.time_remaining <= 0)
+        victory = alive & ~timeout & (self.distance_traveled >= self.config.target_distance)
+        self.game_over |= timeout | victory
+        self.end_reason[timeout] = END_TIMEOUT
+        self.end_reason[victory] = END_VICTORY
+        running = alive & ~timeout & ~victory
+
+        # 4. Spawning
+        mult = self._speed_multiplier()
+        self._update_spawning(running, mult)
+
+        # 5. Score
+        self.weighted_distance_score[running] += (distance_delta * 10 * mult)[running]
+        self.score[running] = (self.weighted_distance_score.astype(np.int64) + self.passing_bonus.astype(np.int64))[running]
+
+        # 6. Opponents, passing, clean-up
+        old_bonus = self.passing_bonus.copy()
+        self._update_opponents(running, mult, dt)
+        bonus_delta = self.passing_bonus - old_bonus
+
+        # 7. Collisions
+        collided, car_type = self._check_collisions(running)
+        self.game_over |= collided
+        self.end_reason[collided] = END_COLLISION
+        self.collision_car_type[collided] = car_type[collided]
+
+        # Reward (same shaping as RoadFighterGame.step + RacingGameEnv.step)
+        self.rewards_active |= alive & (self.opp_active & (self.opp_y > 0)).any(axis=1)
+        reward = np.where(self.rewards_active, distance_delta * 0.1 + bonus_delta, 0.0)
+        reward += np.where(collided, COLLISION_PENALTY[np.maximum(car_type, 0)], 0.0)
+        reward -= np.where(self.changing_lane, self.config.lane_change_penalty, 0.0)
+        return reward
+
+    def _update_player(self, alive, left, right, brake, dt):
+        config = self.config
+
+        # Lane change in progress
+        changing = alive & self.changing_lane
+        progress = self.lane_progress + config.lane_change_speed * dt
+        finished = changing & (progress >= 1.0)
+        moving = changing & ~finished
+        self.player_x = np.where(finished, self.lane_target_x, self.player_x)
+        self.player_x = np.where(
+            moving,
+            self.lane_start_x + (self.lane_target_x - self.lane_start_x) * progress,
+            self.player_x,
+        )
+        self.lane_progress = np.where(finished, 0.0, np.where(moving, progress, self.lane_progress))
+        self.changing_lane &= ~finished
+
+        # New half-lane move (left wins over right)
+        idle = alive & ~changing
+        half_lane = config.lane_width / 2.0
+        new_left = self.player_x - half_lane
+        new_right = self.player_x + half_lane
+        go_left = idle & left & (new_left >= config.road_left_edge)
+        go_right = idle & ~left & right & (new_right + config.player_width <= config.road_right_edge)
+        start = go_left | go_right
+        self.lane_start_x = np.where(start, self.player_x, self.lane_start_x)
+        self.lane_target_x = np.where(go_left, new_left, np.where(go_right, new_right, self.lane_target_x))
+        self.lane_progress[start] = 0.0
+        self.changing_lane |= start
+
+        # Speed
+        accel = np.where(brake, -config.player_brake_force, config.player_acceleration) * dt
+        self.player_vy = np.where(
+            alive, np.clip(self.player_vy + accel, config.player_min_speed, config.player_max_speed), self.player_vy
+        )
+
+        # Current lane
+        self.player_lane = np.where(
+            alive, _lane_of(config, self.player_x + config.player_width / 2.0, self.player_lane), self.player_lane
+        )
+
+    def _update_spawning(self, running, mult):
+        self.time_since_last_spawn[running] += FRAME_DT
+        due = running & (self.time_since_last_spawn >= self.spawn_interval / mult)
+        if not due.any():
+            return
+
+        n_active = self.opp_active.sum(axis=1)
+        try_pattern = due & (self.rng.random(self.num_envs) < self.config.blocking_pattern_chance) & (n_active < 3)
+        if not len(self._lane_pairs):
+            try_pattern[:] = False  # Narrow roads have no blocking pairs
+        spawned = np.zeros(self.num_envs, dtype=bool)
+        if try_pattern.any():
+            spawned |= self._spawn_blocking_pattern(try_pattern)
+        single = due & ~spawned
+        if single.any():
+            spawned |= self._spawn_single_car(single)
+        self.time_since_last_spawn[spawned] = 0.0
+
+    def _spacing_clear(self, mask, spawn_y):
+        too_close = self.opp_active & (np.abs(self.opp_y - spawn_y) < self.config.opponent_min_spacing)
+        return mask & ~too_close.any(axis=1)
+
+    def _spawn_single_car(self, mask):
+        n = self.num_envs
+        rng = self.rng
+        num_lanes = self.config.num_lanes
+
+        # Lane camping prevention
+        camping_lane = np.clip(self.last_player_lane, 0, num_lanes - 1)
+        lane = np.where(self.lane_camping_mode, camping_lane, rng.integers(0, num_lanes, n))
+
+        # Physical overlap
+        ok = self._spacing_clear(mask, self._spawn_y)
+
+        # RULE 1: No more than 2 cars in same lane consecutively
+        repeat = (self.last_spawned_lane == lane) & (self.consecutive_same_lane >= 2)
+        lane = np.where(repeat, (lane + 1 + rng.integers(0, num_lanes - 1, n)) % num_lanes, lane)
+
+        # Red car horizontal spacing: after a red car in one half of the road,
+        # a red-adjacent spawn goes to a lane of the other half (one draw
+        # covers either half evenly)
+        too_near_red = (
+            (self.last_spawned_type == RED)
+            & (self.last_red_car_lane >= 0)
+            & (np.abs(lane - self.last_red_car_lane) < 2)
+        )
+        lower, upper = self._lower_lanes, self._upper_lanes
+        pick = rng.integers(0, math.lcm(len(lower), len(upper)), n)
+        far_side = np.where(self.last_red_car_lane < len(lower),
+                            upper[pick % len(upper)], lower[pick % len(lower)])
+        lane = np.where(too_near_red, far_side, lane)
+
+        return self._place_cars(ok, lane, 0.0)
+
+    def _spawn_blocking_pattern(self, mask):
+        n = self.num_envs
+        rng = self.rng
+        num_lanes = self.config.num_lanes
+        lanes = self._lane_pairs[rng.integers(0, len(self._lane_pairs), n)]
+
+        camping = mask & self.lane_camping_mode
+        player_lane = np.clip(self.last_player_lane, 0, num_lanes - 1)
+        other_lane = (player_lane + 1 + rng.integers(0, num_lanes - 1, n)) % num_lanes
+        lanes[camping, 0] = player_lane[camping]
+        lanes[camping, 1] = other_lane[camping]
+
+        any_spawned = np.zeros(n, dtype=bool)
+        for i in range(lanes.shape[1]):
+            y_offset = -(i * self.config.blocking_pattern_row_gap)
+            ok = self._spacing_clear(mask, self._spawn_y + y_offset)
+            any_spawned |= self._place_cars(ok, lanes[:, i], y_offset)
+        return any_spawned
+
+    def _place_cars(self, mask, lane, y_offset):
+        """Spawn one opponent in each race selected by mask. Returns the races that got a car."""
+        n = self.num_envs
+        rng = self.rng
+        config = self.config
+        num_lanes = config.num_lanes
+
+        free = ~self.opp_active
+        mask = mask & free.any(axis=1)
+        if not mask.any():
+            return mask
+        slot = free.argmax(axis=1)
+
+        # RULE 2: No more than 2 consecutive same color
+        u = rng.random(n)
+        random_type = np.where(
+            u < config.green_car_probability, GREEN,
+            np.where(u < config.green_car_probability + config.yellow_car_probability, YELLOW, RED),
+        )
+        other_type = (self.last_spawned_type + 1 + rng.integers(0, 2, n)) % 3
+        car_type = np.where(self.consecutive_same_type >= 2, other_type, random_type)
+
+        # Yellow: one adjacent lane to alternate with. Red: random direction.
+        side = rng.choice(np.array([-1, 1]), n)
+        adjacent = np.where(lane == 0, 1, np.where(lane == num_lanes - 1, num_lanes - 2, lane + side))
+        red_direction = rng.choice(np.array([-1.0, 1.0]), n)
+        direction = np.where(car_type == YELLOW, 1.0, np.where(car_type == RED, red_direction, 0.0))
+
+        rows = self._rows[mask]
+        cols = slot[mask]
+        self.opp_active[rows, cols] = True
+        self.opp_x[rows, cols] = self._lane_car_x[lane[mask]]
+        self.opp_y[rows, cols] = self._spawn_y + y_offset
+        self.opp_type[rows, cols] = car_type[mask]
+        self.opp_lane[rows, cols] = lane[mask]
+        self.opp_start_lane[rows, cols] = lane[mask]
+        self.opp_adjacent_lane[rows, cols] = adjacent[mask]
+        self.opp_direction[rows, cols] = direction[mask]
+        self.opp_timer[rows, cols] = 0.0
+        self.opp_passed[rows, cols] = False
+
+        # Spawn constraint tracking
+        same_type = car_type == self.last_spawned_type
+        same_lane = lane == self.last_spawned_lane
+        self.consecutive_same_type = np.where(mask, np.where(same_type, self.consecutive_same_type + 1, 1), self.consecutive_same_type)
+        self.consecutive_same_lane = np.where(mask, np.where(same_lane, self.consecutive_same_lane + 1, 1), self.consecutive_same_lane)
+        self.last_spawned_type = np.where(mask, car_type, self.last_spawned_type)
+        self.last_spawned_lane = np.where(mask, lane, self.last_spawned_lane)
+        self.last_red_car_lane = np.where(mask & (car_type == RED), lane, self.last_red_car_lane)
+        return mask
+
+    def _update_opponents(self, running, mult, dt):
+        moving = running[:, None] & self.opp_active
+        if not moving.any():
+            return
+        config = self.config
+        mult = mult[:, None]
+        x, y, direction = self.opp_x, self.opp_y, self.opp_direction
+
+        # Vertical: everyone drifts down at the same rate
+        old_y = y.copy()
+        y += np.where(moving, config.opponent_scroll_speed * mult * dt, 0.0)
+
+        # Yellow: zig-zag between start lane and adjacent lane
+        yellow = moving & (self.opp_type == YELLOW)
+        target_lane = np.where(direction > 0, self.opp_adjacent_lane, self.opp_start_lane)
+        target_x = self._lane_car_x[np.clip(target_lane, 0, config.num_lanes - 1)]
+        far = yellow & (np.abs(x - target_x) > 2)
+        step_x = config.yellow_speed_x * mult * dt
+        x += np.where(far, np.where(x < target_x, step_x, -step_x), 0.0)
+        arrived = yellow & ~far
+        x[arrived] = target_x[arrived]
+        direction[arrived] *= -1
+
+        # Red: bounce between the road edges
+        red = moving & (self.opp_type == RED)
+        self.opp_timer += np.where(red, dt, 0.0)
+        x += np.where(red, direction * config.red_speed_x * mult * dt, 0.0)
+        left_bound = config.road_left_edge
+        right_bound = config.road_right_edge - config.opponent_width
+        hit_left = red & (x <= left_bound)
+        hit_right = red & ~hit_left & (x >= right_bound)
+        x[hit_left] = left_bound
+        direction[hit_left] = 1.0
+        x[hit_right] = right_bound
+        direction[hit_right] = -1.0
+
+        self.opp_lane = np.where(moving, _lane_of(config, x + config.opponent_width / 2.0, self.opp_lane), self.opp_lane)
+
+        # Passing bonus and stats
+        player_y = config.player_y
+        passed = moving & ~self.opp_passed & (old_y < player_y) & (y >= player_y)
+        if passed.any():
+            self.opp_passed |= passed
+            self.passing_bonus += np.where(passed, PASSING_BONUS[self.opp_type], 0.0).sum(axis=1)
+            for car_type in (GREEN, YELLOW, RED):
+                self.cars_passed[:, car_type] += (passed & (self.opp_type == car_type)).sum(axis=1)
+            self._update_camping(passed.sum(axis=1))
+
+        # Clean up off-screen cars
+        self.opp_active &= ~(moving & (y >= config.opponent_despawn_y))
+
+    def _update_camping(self, n_passed):
+        has_passed = n_passed > 0
+        same_lane = self.last_player_lane == self.player_lane
+        count = np.where(same_lane, self.player_current_lane_cars_passed + n_passed, n_passed)
+        self.player_current_lane_cars_passed = np.where(has_passed, count, self.player_current_lane_cars_passed)
+        self.last_player_lane = np.where(has_passed, self.player_lane, self.last_player_lane)
+        self.lane_camping_mode = np.where(has_passed, count >= 2, self.lane_camping_mode)
+
+    def _check_collisions(self, running):
+        # Float AABB overlap, same as Car.overlaps
+        config = self.config
+        px = self.player_x[:, None]
+        ox = self.opp_x
+        oy = self.opp_y
+        player_y = config.player_y
+        hit = (
+            running[:, None] & self.opp_active
+            & (px < ox + config.opponent_width) & (ox < px + config.player_width)
+            & (player_y < oy + config.opponent_height) & (oy < player_y + config.player_height)
+        )
+        collided = hit.any(axis=1)
+        car_type = np.where(collided, self.opp_type[self._rows, hit.argmax(axis=1)], NO_TYPE)
+        return collided, car_type
+
+    # ------------------------------------------------------------------
+    # Observation / info
+    # ------------------------------------------------------------------
+    def _write_obs(self, out):
+        """Write the State V3 vector of every race into out (N x 32)"""
+        config = self.config
+        mult = self._speed_multiplier()
+
+        # 1. Player features [4]
+        out[:, 0] = self.player_x / SCREEN_WIDTH
+        out[:, 1] = self.player_vy / config.player_max_speed
+        out[:, 2] = self.player_lane / (config.num_lanes - 1)
+        out[:, 3] = self.changing_lane
+
+        # 2. Global progress [3]
+        out[:, 4] = self.time_remaining / config.race_time_limit
+        out[:, 5] = np.minimum(self.distance_traveled / config.target_distance, 1.0)
+        out[:, 6] = mult / 2.0
+
+        # 3. Nearest opponents [5 * 5]
+        dx = (self.opp_x - self.player_x[:, None]) / SCREEN_WIDTH
+        dy = (self.opp_y - config.player_y) / SCREEN_HEIGHT
+        dist = np.where(self.opp_active, dx * dx + dy * dy, np.inf)
+        nearest = np.argsort(dist, axis=1, kind='stable')[:, :K_NEAREST]
+        rows = self._rows[:, None]
+        present = np.isfinite(dist[rows, nearest])
+
+        features = np.empty((self.num_envs, K_NEAREST, OPPONENT_FEATURES), dtype=np.float32)
+        features[..., 0] = dx[rows, nearest]
+        features[..., 1] = dy[rows, nearest]
+        features[..., 2] = TYPE_FEATURE_BY_CODE[self.opp_type[rows, nearest]]
+        features[..., 3] = self.opp_direction[rows, nearest]
+        features[..., 4] = (self.config.opponent_scroll_speed * mult / OPPONENT_SPEED_REFERENCE)[:, None]
+        features[~present] = OPPONENT_PADDING
+        out[:, 7:] = features.reshape(self.num_envs, K_NEAREST * OPPONENT_FEATURES)
+        return out
+
+    def _episode_info(self, idx):
+        end_reason = int(self.end_reason[idx])
+        return {
+            'victory': end_reason == END_VICTORY,
+            'distance': float(self.distance_traveled[idx]),
+            'score': int(self.score[idx]),
+            'end_reason': END_REASON_NAMES[end_reason],
+            'cars_passed': {
+                name: int(self.cars_passed[idx, code]) for code, name in enumerate(CAR_TYPE_NAMES)
+            },
+            'episode': {
+                'r': round(float(self.episode_reward[idx]), 6),
+                'l': int(self.episode_length[idx]),
+                't': round(time.time() - self._t_start, 6),
+            },
+            'TimeLimit.truncated': False,
+        }
+
+
+def _lane_of(config, center_x, current_lane):
+    """Lane index containing center_x (GameConfig.lane_at); keeps current_lane when off the road"""
+    on_road = (center_x >= config.road_left_edge) & (center_x < config.road_right_edge)
+    lane = np.floor((center_x - config.road_left_edge) / config.lane_width).astype(np.int64)
+    return np.where(on_road, np.clip(lane, 0, config.num_lanes - 1), current_lane)
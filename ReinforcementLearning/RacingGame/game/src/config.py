@@ -0,0 +1,151 @@
+"""
+Road Fighter - Game Configuration
+"""
+
+from dataclasses import dataclass, field
+from . import constants as C
+
+
+@dataclass(frozen=True)
+class GameConfig:
+    """
+    Immutable simulation parameters for one RoadFighterGame.
+
+    The defaults reproduce src/constants.py. Everything derived from them
+    (lane geometry, position-to-lane lookup, per-frame difficulty table) is
+    computed once in __post_init__, so engines built with different configs
+    can run side by side in one process and the hot paths read tables.
+    Make variants with GameConfig(num_lanes=3, ...) or dataclasses.replace().
+    BatchedRoadFighter, TrafficSchedule.compile and GameRenderer take their
+    road, rules, opponent speeds and difficulty from the same config, and
+    RacingGameEnv(config=...) hands one to its engine.
+    """
+
+    # Road
+    num_lanes: int = C.NUM_LANES
+    lane_width: int = C.LANE_WIDTH
+    road_left_edge: int = C.ROAD_LEFT_EDGE
+
+    # Player
+    player_width: int = C.PLAYER_WIDTH
+    player_height: int = C.PLAYER_HEIGHT
+    player_y: int = C.PLAYER_Y
+    player_start_lane: int = 1
+    player_base_speed: float = C.PLAYER_BASE_SPEED
+    player_max_speed: float = C.PLAYER_MAX_SPEED
+    player_min_speed: float = C.PLAYER_MIN_SPEED
+    player_acceleration: float = C.PLAYER_ACCELERATION
+    player_brake_force: float = C.PLAYER_BRAKE_FORCE
+    lane_change_speed: float = C.LANE_CHANGE_SPEED
+
+    # Race
+    race_time_limit: float = C.RACE_TIME_LIMIT
+    target_distance: float = C.TARGET_DISTANCE
+
+    # Opponents and spawning (speeds in px/s at difficulty 1.0)
+    opponent_width: int = C.OPPONENT_WIDTH
+    opponent_height: int = C.OPPONENT_HEIGHT
+    opponent_speed: float = C.OPPONENT_SPEED
+    opponent_scroll_speed: float = C.OPPONENT_SCROLL_SPEED
+    yellow_speed_x: float = C.YELLOW_SPEED_X
+    red_speed_x: float = C.RED_SPEED_X
+    opponent_min_spacing: float = C.OPPONENT_MIN_SPACING
+    opponent_despawn_y: float = C.OPPONENT_DESPAWN_Y
+    opponent_pool_size: int = C.OPPONENT_POOL_SIZE
+    green_car_probability: float = C.GREEN_CAR_PROBABILITY
+    yellow_car_probability: float = C.YELLOW_CAR_PROBABILITY
+    spawn_interval: float = C.SPAWN_INTERVAL
+    blocking_pattern_chance: float = C.BLOCKING_PATTERN_CHANCE
+    blocking_pattern_row_gap: float = C.BLOCKING_PATTERN_ROW_GAP
+
+    # Stepped difficulty: the multiplier becomes values[i + 1] at thresholds[i] seconds
+    multiplier_thresholds: tuple = C.MULTIPLIER_THRESHOLDS
+    multiplier_values: tuple = C.MULTIPLIER_VALUES
+
+    # Rewards and stepping
+    lane_change_penalty: float = C.LANE_CHANGE_PENALTY
+    adaptive_near_frames: int = C.ADAPTIVE_NEAR_FRAMES
+
+    # Derived in __post_init__
+    road_right_edge: int = field(init=False)
+    lane_centers: tuple = field(init=False)
+    lane_starts: tuple = field(init=False)
+    player_start_x: int = field(init=False)
+    blocking_lane_pairs: tuple = field(init=False)
+    lower_lanes: tuple = field(init=False)
+    upper_lanes: tuple = field(init=False)
+    multiplier_table: tuple = field(init=False, repr=False)
+    _multiplier_split: tuple = field(init=False, repr=False)
+    _multiplier_before: tuple = field(init=False, repr=False)
+
+    def __post_init__(self):
+        if len(self.multiplier_values) != len(self.multiplier_thresholds) + 1:
+            raise ValueError("multiplier_values needs one more entry than multiplier_thresholds")
+        if self.num_lanes < 2:
+            raise ValueError("num_lanes must be at least 2 (cars change between adjacent lanes)")
+        if not 0 <= self.player_start_lane < self.num_lanes:
+            raise ValueError(f"player_start_lane {self.player_start_lane} is not a lane")
+
+        # 1. Lane geometry
+        width = self.lane_width
+        left = self.road_left_edge
+        lane_starts = tuple(left + width * i for i in range(self.num_lanes))
+        lane_centers = tuple(start + width // 2 for start in lane_starts)
+        self._set('road_right_edge', left + width * self.num_lanes)
+        self._set('lane_starts', lane_starts)
+        self._set('lane_centers', lane_centers)
+        self._set('player_start_x', lane_centers[self.player_start_lane] - self.player_width // 2)
+
+        # 2. Spawn lane sets: blocking pairs leave a lane between the two cars,
+        #    a red car after a red car goes to the other half of the road
+        lanes = range(self.num_lanes)
+        self._set('blocking_lane_pairs', tuple((a, b) for a in lanes for b in lanes if b >= a + 2))
+        half = self.num_lanes // 2
+        self._set('lower_lanes', tuple(range(half)))
+        self._set('upper_lanes', tuple(range(half, self.num_lanes)))
+
+        # 3. Difficulty per frame: multiplier_table[f] holds for elapsed time in
+        #    [f, f + 1) frames; a frame a threshold falls in keeps the value before
+        #    it until the threshold (split) is reached
+        num_frames = int(self.race_time_limit * C.FPS) + 2
+        table, split, before = [], [], []
+        step = 0
+        for frame in range(num_frames):
+            end = (frame + 1) / C.FPS
+            prior = self.multiplier_values[step]
+            cut = -1.0
+            while step < len(self.multiplier_thresholds) and self.multiplier_thresholds[step] < end:
+                cut = self.multiplier_thresholds[step]
+                step += 1
+            table.append(self.multiplier_values[step])
+            split.append(cut)
+            before.append(prior)
+        self._set('multiplier_table', tuple(table))
+        self._set('_multiplier_split', tuple(split))
+        self._set('_multiplier_before', tuple(before))
+
+    def _set(self, name, value):
+        object.__setattr__(self, name, value)
+
+    @property
+    def road_width(self):
+        return self.road_right_edge - self.road_left_edge
+
+    def lane_at(self, x):
+        """Lane containing the horizontal position x, or None off the road (O(1))"""
+        offset = x - self.road_left_edge
+        if 0 <= offset < self.num_lanes * self.lane_width:
+            return int(offset // self.lane_width)
+        return None
+
+    def multiplier_at(self, elapsed):
+        """Difficulty multiplier after `elapsed` seconds (table lookup)"""
+        frame = int(elapsed * C.FPS)
+        if frame >= len(self.multiplier_table):
+            return self.multiplier_values[-1]
+        if elapsed < self._multiplier_split[frame]:
+            return self._multiplier_before[frame]
+        return self.multiplier_table[frame]
+
+
+DEFAULT_CONFIG = GameConfig()
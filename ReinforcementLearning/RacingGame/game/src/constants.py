@@ -6,6 +6,7 @@ Road Fighter - Game Constants
 SCREEN_WIDTH = 1100  # Expanded to show full HUD on right side with extra buffer
 SCREEN_HEIGHT = 800  # Increased for better vertical fit
 FPS = 60
+FRAME_DT = 1 / 60.0  # One engine frame
 
 # Road
 NUM_LANES = 4
@@ -47,6 +48,27 @@ OPPONENT_WIDTH = 60
 OPPONENT_HEIGHT = 100
 OPPONENT_SPEED = 180.0
 OPPONENT_MIN_SPACING = 250.0  # Min check. Target: 280px spacing = 180px gap (1.8 car lengths)
+OPPONENT_DESPAWN_Y = SCREEN_HEIGHT + 100  # Cars at or below this line are culled
+OPPONENT_POOL_SIZE = 16  # Preallocated opponent slots (a race rarely has more than 8 on the road)
+ADAPTIVE_NEAR_FRAMES = 8  # Adaptive dt: a car that can reach the player within this many frames is near
+
+# Opponent speeds in px/s at difficulty 1.0 (scaled by the speed multiplier)
+OPPONENT_SCROLL_SPEED = 120.0
+YELLOW_SPEED_X = 100.0
+RED_SPEED_X = 70.0
+LANE_CHANGE_SPEED = 5.0  # Player lane changes per second
+
+# Spawning
+SPAWN_INTERVAL = 2.33  # Seconds between spawns at difficulty 1.0
+BLOCKING_PATTERN_CHANCE = 0.15  # Chance a due spawn tries a two-car blocking pattern
+BLOCKING_PATTERN_ROW_GAP = 280  # Vertical gap between the two pattern cars
+
+# Stepped difficulty: the multiplier becomes MULTIPLIER_VALUES[i + 1] at MULTIPLIER_THRESHOLDS[i] seconds
+MULTIPLIER_THRESHOLDS = (30.0, 46.0, 60.0, 80.0, 100.0)
+MULTIPLIER_VALUES = (1.0, 1.2, 1.4, 1.6, 1.8, 2.0)
+
+# Rewards
+LANE_CHANGE_PENALTY = 0.05  # Per frame spent changing lanes
 
 # Spawn probabilities (5:3:2 ratio - Green:Yellow:Red)
 GREEN_CAR_PROBABILITY = 0.500
@@ -1,13 +1,32 @@
-import random
+import numpy as np
 from .constants import *
+from .config import DEFAULT_CONFIG
 from .entities import PlayerCar, OpponentCar
+from .observation import ObservationBuilder, OBS_SIZE
+from .info import StepInfo
+from .spatial import LaneIndex
+from .rng import BlockRandom
+from .traffic import PATTERN_TRAIL
+from .kinematics import scroll_per_frame, advance, x_after, first_contact, near_player
+from . import snapshot
 
 class RoadFighterGame:
     """
     Headless Game Engine
     Handles logic, physics, and state. No rendering.
+    Road, physics and difficulty come from a GameConfig (default: constants.py).
     """
-    def __init__(self):
+    def __init__(self, seed=None, config=None):
+        # Immutable parameters and their precomputed tables
+        self.config = config = DEFAULT_CONFIG if config is None else config
+        
+        # Per-instance random stream (see seed())
+        self.rng = BlockRandom(seed)
+        
+        # Observation buffers (State V3 is written in place, see get_state)
+        self._obs_builder = ObservationBuilder()
+        self._state_buf = np.zeros(OBS_SIZE, dtype=np.float32)
+        
         # Game State
         self.running = True
         self.game_over = False
@@ -15,7 +34,7 @@ class RoadFighterGame:
         self.end_reason = None
         self.score = 0
         self.distance_traveled = 0.0
-        self.time_remaining = RACE_TIME_LIMIT
+        self.time_remaining = config.race_time_limit
         
         # Difficulty scaling
         self.elapsed_time = 0
@@ -24,15 +43,31 @@ class RoadFighterGame:
         self.player = None
         self.opponents = []
         
+        # Recycled OpponentCar slots (green cars: building them draws no randomness)
+        self._free_opponents = [OpponentCar(0, force_type='green', config=config)
+                                for _ in range(config.opponent_pool_size)]
+        
+        # Per-lane, y-sorted index over self.opponents (spacing and collision queries)
+        self._lane_index = LaneIndex(config)
+        
         # Helper lists for spawning logic
-        self.lane_positions = [
-            ROAD_LEFT_EDGE + LANE_WIDTH * i + LANE_WIDTH // 2 
-            for i in range(NUM_LANES)
-        ]
+        self.lane_positions = list(config.lane_centers)
         
         # Spawning State
         self.time_since_last_spawn = 0
-        self.spawn_interval = 2.33
+        self.spawn_interval = config.spawn_interval
+        
+        # Closed-form frames in step_n (see _advance_closed_form): fast_forward
+        # only on an empty road, macro_steps through traffic as well,
+        # adaptive_dt sized by threat proximity (see _coarse_frames)
+        self.fast_forward = False
+        self.macro_steps = False
+        self.adaptive_dt = False
+        
+        # Optional precompiled TrafficSchedule (replaces live spawn rules)
+        self.traffic = None
+        self._traffic_cursor = 0
+        self._next_traffic_time = float('inf')
         
         # Logic - Camping Prevention
         self.player_current_lane_cars_passed = 0
@@ -59,6 +94,28 @@ class RoadFighterGame:
         
         self.reset()
         
+    def seed(self, seed=None):
+        """Reseed the engine's random stream (traffic) for reproducible races"""
+        self.rng.seed(seed)
+
+    def set_traffic_schedule(self, schedule):
+        """
+        Spawn from a TrafficSchedule (None restores the live spawn rules).
+        The schedule must have been compiled for this engine's config.
+        """
+        if schedule is not None and schedule.config is not self.config and schedule.config != self.config:
+            raise ValueError("TrafficSchedule was compiled for a different GameConfig; "
+                             "use TrafficSchedule.compile(seed, game.config)")
+        self.traffic = schedule
+        self._rewind_traffic()
+
+    def _rewind_traffic(self):
+        self._traffic_cursor = 0
+        if self.traffic is not None and len(self.traffic):
+            self._next_traffic_time = self.traffic.times[0]
+        else:
+            self._next_traffic_time = float('inf')
+
     def reset(self):
         """Reset game to starting state"""
         self.running = True
@@ -68,15 +125,19 @@ class RoadFighterGame:
         self.score = 0
         self.weighted_distance_score = 0.0 # NEW: Weighted accumulator
         self.distance_traveled = 0.0
-        self.time_remaining = RACE_TIME_LIMIT
+        self.time_remaining = self.config.race_time_limit
         self.elapsed_time = 0
         
-        # Reset entities
-        self.player = PlayerCar(PLAYER_START_X, PLAYER_Y)
+        # Reset entities (opponents go back to the pool)
+        self.player = PlayerCar(self.config.player_start_x, self.config.player_y, self.config)
+        for opp in self.opponents:
+            self._release_opponent(opp)
         self.opponents = []
+        self._lane_index.rebuild(self.opponents)
         
         # Reset tracking
         self.time_since_last_spawn = 0
+        self._rewind_traffic()
         self.player_current_lane_cars_passed = 0
         self.last_player_lane = self.player.current_lane
         self.lane_camping_mode = False
@@ -98,14 +159,73 @@ class RoadFighterGame:
         
         # Reward Control
         self.rewards_active = False
+        self.last_frame_reward = 0.0
         
         return self.get_state()
 
-    def step(self, left, right, brake):
-        """Execute one frame of logic"""
+    def step(self, left, right, brake, out=None):
+        """
+        Execute one frame of logic.
+        If `out` (float32 array of size 32) is given, the state is written
+        into it and returned instead of a new list.
+        """
+        if self.game_over:
+            return self._state(out), 0, True, {'victory': self.victory}
+
+        reward = self._frame(left, right, brake)
+        return self._state(out), reward, self.game_over, self._info()
+
+    def step_n(self, k, left, right, brake, out=None):
+        """
+        Execute up to k frames with the same controls (fused frame skip).
+        Reward and the per-frame lane-change penalty are accumulated here and
+        the loop stops on the frame the race ends. State and info are built
+        once, after the last frame. The reward of that last frame (penalty
+        included) is left in `last_frame_reward` for termination shaping.
+        With adaptive_dt, k may be a long stretch (e.g. 60 * seconds of held
+        controls): far-field traffic is crossed in coarse closed-form steps.
+        """
         if self.game_over:
-            return self.get_state(), 0, True, {'victory': self.victory}
+            reward = -self.config.lane_change_penalty if self.player.is_changing_lane else 0.0
+            self.last_frame_reward = reward
+            return self._state(out), reward, True, {'victory': self.victory}
+
+        lane_change_penalty = self.config.lane_change_penalty
+        total_reward = reward = 0.0
+        frame = 0
+        adaptive = self.adaptive_dt
+        closed_form = (self.fast_forward or self.macro_steps or adaptive) and not (left or right)
+        while frame < k:
+            if closed_form:
+                if adaptive:
+                    budget = self._coarse_frames(k - frame)
+                elif self.macro_steps or not self.opponents:
+                    budget = k - frame
+                else:
+                    budget = 0
+                if budget:
+                    skipped, skipped_reward, reward = self._advance_closed_form(budget, brake)
+                    if skipped:
+                        total_reward += skipped_reward
+                        frame += skipped
+                        continue
+                    if not adaptive:
+                        # Something is close: the rest of this step runs frame by frame
+                        closed_form = False
             
+            reward = self._frame(left, right, brake)
+            if self.player.is_changing_lane:
+                reward -= lane_change_penalty
+            total_reward += reward
+            frame += 1
+            if self.game_over:
+                break
+
+        self.last_frame_reward = reward
+        return self._state(out), total_reward, self.game_over, self._info()
+
+    def _frame(self, left, right, brake):
+        """Advance one 60Hz frame and return its engine reward"""
         dt = 1/60.0
         
         # Update Game Logic
@@ -130,25 +250,151 @@ class RoadFighterGame:
              # Zero reward until the action starts
             reward = 0.0
         
-        
-        done = self.game_over
-        
         # Apply collision penalty if game ended due to collision
-        if done and self.end_reason == 'collision':
+        if self.game_over and self.end_reason == 'collision':
             reward += self.collision_penalty
-        info = {
-            'victory': self.victory,
-            'distance': self.distance_traveled,
-            'score': self.score,
-            'end_reason': self.end_reason,
-            'cars_passed': {
-                'green': self.green_cars_passed,
-                'yellow': self.yellow_cars_passed,
-                'red': self.red_cars_passed
-            }
-        }
-        
-        return self.get_state(), reward, done, info
+        return reward
+
+    def _advance_closed_form(self, limit, brake):
+        """
+        Advance up to `limit` frames in one closed-form macro step while the
+        player holds no lateral input and is not mid lane change. Stops short
+        of every event that has to run frame by frame: the next spawn,
+        difficulty step, timeout or victory (2 frames of margin), the first
+        car entering the screen while rewards are off, and any possible
+        collision (swept test, see kinematics.first_contact). Opponents move
+        along their closed-form paths and passes are paid as in update().
+        Returns (frames, summed reward, reward of the last frame), frames=0
+        if no frame can be skipped.
+        """
+        player = self.player
+        if player.is_changing_lane:
+            return 0, 0.0, 0.0
+        config = self.config
+        dt = 1/60.0
+        margin = 3  # Frames kept exact before an event: the event frame plus 2
+        
+        # 1. Frames until the next event
+        elapsed = self.elapsed_time
+        mult = self._get_speed_multiplier()
+        if self.traffic is not None:
+            spawn_at = self._next_traffic_time - 0.5 * dt - elapsed
+        else:
+            spawn_at = self.spawn_interval / mult - self.time_since_last_spawn
+        horizon = min(spawn_at, self.time_remaining)
+        for threshold in config.multiplier_thresholds:
+            if threshold > elapsed:
+                horizon = min(horizon, threshold - elapsed)
+                break
+        frames = int(horizon / dt) + 1 - margin
+        # Victory: bound the distance by the top speed
+        frames = min(frames, limit,
+                     int((config.target_distance - self.distance_traveled) / (config.player_max_speed / 3.6 * dt)) - margin)
+        if frames <= 0:
+            return 0, 0.0, 0.0
+        
+        # 2. Traffic: stay a frame short of rewards switching on and of any contact
+        opponents = self.opponents
+        dy = scroll_per_frame(self.config, mult)
+        for opp in opponents:
+            if not self.rewards_active and opp.y <= 0:
+                frames = min(frames, int(-opp.y / dy) - 1)
+            if frames > 0:
+                contact = first_contact(player, opp, frames, mult)
+                if contact is not None:
+                    frames = min(frames, int(contact) - 1)
+            if frames <= 0:
+                return 0, 0.0, 0.0
+        
+        # 3. Player speed, clocks and distance. Only additions, but summed
+        #    frame by frame in update()'s order: the score and every
+        #    threshold test then round exactly as they would at 60Hz
+        accel = -config.player_brake_force * dt if brake else config.player_acceleration * dt
+        min_speed, max_speed = config.player_min_speed, config.player_max_speed
+        v = player.velocity_y
+        elapsed = self.elapsed_time
+        remaining = self.time_remaining
+        since_spawn = self.time_since_last_spawn
+        distance = self.distance_traveled
+        weighted = self.weighted_distance_score
+        distance_reward = 0.0
+        for _ in range(frames):
+            v = max(min_speed, min(max_speed, v + accel))
+            d_delta = (v / 3.6) * dt
+            elapsed += dt
+            remaining -= dt
+            since_spawn += dt
+            distance += d_delta
+            weighted += d_delta * 10 * mult
+            distance_reward += d_delta * 0.1
+        player.velocity_y = v
+        self.elapsed_time = elapsed
+        self.time_remaining = remaining
+        if self.traffic is None:
+            self.time_since_last_spawn = since_spawn
+        self.distance_traveled = distance
+        self.weighted_distance_score = weighted
+        
+        # 4. Opponents, and the passes on the way
+        bonus = last_bonus = 0.0
+        if opponents:
+            lane_index = self._indexed_opponents()
+            player_y = player.y
+            despawn_y = config.opponent_despawn_y
+            despawned = False
+            for opp in opponents:
+                old_y = opp.y
+                if opp.car_type != 'green':
+                    opp.x, opp.movement_direction = x_after(opp, frames, mult)
+                    if opp.car_type == 'red':
+                        opp.movement_timer += frames * dt
+                    lane = config.lane_at(opp.x + opp.width / 2.0)
+                    if lane is not None and lane != opp.lane:
+                        old_lane = opp.lane
+                        opp.lane = lane
+                        lane_index.move(opp, old_lane)
+                before_last = advance(old_y, dy, frames - 1)
+                opp.y = before_last + dy
+                if old_y < player_y <= opp.y and not opp.passed_counted:
+                    paid = self._pay_passing_bonus(opp)
+                    bonus += paid
+                    if before_last < player_y:
+                        last_bonus += paid
+                if opp.y >= despawn_y:
+                    despawned = True
+            if despawned:
+                self._cull_opponents()
+        
+        # Score is taken before the opponents move in update(): last frame's passes are not in it yet
+        self.score = int(self.weighted_distance_score) + self.passing_bonus
+        if last_bonus:
+            self.score -= last_bonus
+        
+        # 5. Rewards
+        if not self.rewards_active:
+            return frames, 0.0, 0.0
+        return frames, distance_reward + bonus, d_delta * 0.1 + last_bonus
+
+    def _coarse_frames(self, limit):
+        """
+        Adaptive dt: how many frames (up to `limit`) the next step may cover.
+        0 refines to single 1/60 frames: during a lane change, or while any
+        opponent could reach the player within config.adaptive_near_frames.
+        Otherwise the whole budget is offered to _advance_closed_form, which
+        cuts it short of any possible contact and of the next event.
+        """
+        player = self.player
+        if player.is_changing_lane:
+            return 0
+        mult = self._get_speed_multiplier()
+        near_frames = self.config.adaptive_near_frames
+        for opp in self.opponents:
+            if near_player(player, opp, near_frames, mult):
+                return 0
+        return limit
+
+    def _info(self):
+        return StepInfo(self)
 
     def update(self, delta_time, left, right, brake):
         """Main update loop"""
@@ -173,7 +419,7 @@ class RoadFighterGame:
             return
 
         # 3. Check Victory
-        if self.distance_traveled >= TARGET_DISTANCE:
+        if self.distance_traveled >= self.config.target_distance:
             self.game_over = True
             self.victory = True
             self.end_reason = 'victory'
@@ -206,29 +452,27 @@ class RoadFighterGame:
         self.score = int(self.weighted_distance_score) + self.passing_bonus
         
         # 5. Update Opponents
+        lane_index = self._indexed_opponents()
+        despawn_y = self.config.opponent_despawn_y
+        despawned = False
         for opp in self.opponents:
             old_y = opp.y
+            old_lane = opp.lane
             opp.update(delta_time, self.player.velocity_y, speed_multiplier)
+            if opp.lane != old_lane:
+                lane_index.move(opp, old_lane)
             
             # Check for passing
             if old_y < self.player.y and opp.y >= self.player.y:
-                if not hasattr(opp, 'passed_counted') or not opp.passed_counted:
-                    opp.passed_counted = True
-                    # Variable reward based on car difficulty:
-                    # Green (slowest/easiest): +2.0
-                    # Yellow (medium): +3.0
-                    # Red (fastest/hardest): +5.0
-                    if opp.car_type == 'green':
-                        self.passing_bonus += 2.0
-                    elif opp.car_type == 'yellow':
-                        self.passing_bonus += 3.0
-                    elif opp.car_type == 'red':
-                        self.passing_bonus += 5.0
-                    self._update_cars_passed_stats(opp)
-                    self._check_camping_logic()
-
-        # 6. Clean up off-screen components
-        self.opponents = [opp for opp in self.opponents if opp.y < SCREEN_HEIGHT + 100]
+                if not opp.passed_counted:
+                    self._pay_passing_bonus(opp)
+            
+            if opp.y >= despawn_y:
+                despawned = True
+
+        # 6. Clean up off-screen components (swap-remove, slots return to the pool)
+        if despawned:
+            self._cull_opponents()
 
         # 7. Collisions
         collided_car = self._check_collisions()
@@ -249,8 +493,57 @@ class RoadFighterGame:
                 self.collision_penalty = -1.0
             self.collision_car_type = collided_car.car_type
 
-    def _get_speed_multiplier(self):
-        return 1.0 + min(self.elapsed_time / 60.0, 1.0)
+    def _new_opponent(self, lane, y_offset, force_type=None, side=None):
+        """Spawn an opponent, reusing a pooled slot when one is free"""
+        if self._free_opponents:
+            car = self._free_opponents.pop()
+            car.reset(lane, y_offset, 0, force_type, self.rng, side)
+            return car
+        return OpponentCar(lane, y_offset, 0, force_type=force_type, rng=self.rng, side=side,
+                           config=self.config)
+
+    def _indexed_opponents(self):
+        """Lane index, rebuilt if self.opponents was replaced or appended to from outside"""
+        self._lane_index.sync(self.opponents)
+        return self._lane_index
+
+    def _add_opponent(self, car):
+        self.opponents.append(car)
+        self._lane_index.add(car)
+
+    def _release_opponent(self, opp):
+        if len(self._free_opponents) < self.config.opponent_pool_size:
+            self._free_opponents.append(opp)
+
+    def _cull_opponents(self):
+        """Drop cars past the bottom of the screen without rebuilding the list"""
+        opponents = self.opponents
+        despawn_y = self.config.opponent_despawn_y
+        for i in range(len(opponents) - 1, -1, -1):
+            opp = opponents[i]
+            if opp.y >= despawn_y:
+                opponents[i] = opponents[-1]
+                opponents.pop()
+                self._lane_index.remove(opp)
+                self._release_opponent(opp)
+
+    def _pay_passing_bonus(self, opp):
+        """Count opp as passed (once per car) and return the bonus paid"""
+        opp.passed_counted = True
+        # Variable reward based on car difficulty:
+        # Green (slowest/easiest): +2.0
+        # Yellow (medium): +3.0
+        # Red (fastest/hardest): +5.0
+        if opp.car_type == 'green':
+            bonus = 2.0
+        elif opp.car_type == 'yellow':
+            bonus = 3.0
+        else:
+            bonus = 5.0
+        self.passing_bonus += bonus
+        self._update_cars_passed_stats(opp)
+        self._check_camping_logic()
+        return bonus
 
     def _update_cars_passed_stats(self, opp):
         if opp.car_type == 'green': self.green_cars_passed += 1
@@ -269,45 +562,75 @@ class RoadFighterGame:
             self.lane_camping_mode = False
 
     def _update_spawning(self, delta_time):
+        if self.traffic is not None:
+            # Scheduled traffic: a single comparison until the next entry is due
+            if self.elapsed_time + 0.5 / 60.0 >= self._next_traffic_time:
+                self._spawn_scheduled()
+            return
+        
         self.time_since_last_spawn += delta_time
         current_interval = self.spawn_interval / self._get_speed_multiplier()
         if self.time_since_last_spawn >= current_interval:
             spawned = False
-            if random.random() < 0.15 and len(self.opponents) < 3:
+            # Narrow roads have no blocking pairs (the draw is kept, as in TrafficSchedule)
+            if (self.rng.random() < self.config.blocking_pattern_chance and len(self.opponents) < 3
+                    and self.config.blocking_lane_pairs):
                 spawned = self._spawn_blocking_pattern()
             if not spawned:
                 spawned = self._spawn_single_car()
             if spawned:
                 self.time_since_last_spawn = 0
 
+    def _spawn_scheduled(self):
+        """Pop every TrafficSchedule entry that is due"""
+        entries = self.traffic.entries
+        times = self.traffic.times
+        due = self.elapsed_time + 0.5 / 60.0
+        i = self._traffic_cursor
+        while i < len(entries) and times[i] <= due:
+            _, lane, car_type, y_offset, side, role, alt_lane = entries[i]
+            
+            # Lane camping prevention depends on the player, so it is applied here
+            if self.lane_camping_mode and self.last_player_lane is not None:
+                player_lane = max(0, min(self.config.num_lanes - 1, self.last_player_lane))
+                if role != PATTERN_TRAIL:
+                    lane = player_lane
+                elif lane == player_lane:
+                    lane = alt_lane
+            
+            self._add_opponent(self._new_opponent(lane, y_offset, force_type=car_type, side=side))
+            i += 1
+        self._traffic_cursor = i
+        self._next_traffic_time = times[i] if i < len(times) else float('inf')
+
     def _spawn_single_car(self):
+        num_lanes = self.config.num_lanes
+        
         # Lane camping prevention
         if self.lane_camping_mode and self.last_player_lane is not None:
-            lane = max(0, min(NUM_LANES - 1, self.last_player_lane))
+            lane = max(0, min(num_lanes - 1, self.last_player_lane))
         else:
-            lane = random.randint(0, NUM_LANES - 1)
+            lane = self.rng.randint(0, num_lanes - 1)
         
-        # Check PHYSICAL OVERLAP
-        min_spacing = OPPONENT_MIN_SPACING
+        # Check PHYSICAL OVERLAP (any lane)
+        min_spacing = self.config.opponent_min_spacing
         spawn_y = -100
         
-        for opp in self.opponents:
-            vertical_distance = abs(opp.y - spawn_y)
-            if vertical_distance < min_spacing:
-                return False
+        if self._indexed_opponents().any_within(spawn_y, min_spacing):
+            return False
         
         # RULE 1: No more than 2 cars in same lane consecutively
         if self.last_spawned_lane_for_consecutive == lane and self.consecutive_same_lane >= 2:
-            available_lanes = [l for l in range(NUM_LANES) if l != lane]
+            available_lanes = [l for l in range(num_lanes) if l != lane]
             if available_lanes:
-                lane = random.choice(available_lanes)
+                lane = self.rng.choice(available_lanes)
         
         # Red car horizontal spacing
         if self.last_spawned_type == 'red' and self.last_red_car_lane is not None:
              lane_distance = abs(lane - self.last_red_car_lane)
              if lane_distance < 2:
-                 if self.last_red_car_lane <= 1: lane = random.choice([2, 3])
-                 else: lane = random.choice([0, 1])
+                 if self.last_red_car_lane in self.config.lower_lanes: lane = self.rng.choice(self.config.upper_lanes)
+                 else: lane = self.rng.choice(self.config.lower_lanes)
 
         # RULE 2: No more than 2 consecutive same color
         force_different_type = False
@@ -316,10 +639,10 @@ class RoadFighterGame:
         
         if force_different_type:
             available_types = [t for t in ['green', 'yellow', 'red'] if t != self.last_spawned_type]
-            forced_type = random.choice(available_types)
-            new_car = OpponentCar(lane, 0, 0, force_type=forced_type)
+            forced_type = self.rng.choice(available_types)
+            new_car = self._new_opponent(lane, 0, force_type=forced_type)
         else:
-            new_car = OpponentCar(lane, 0, 0)
+            new_car = self._new_opponent(lane, 0)
         
         if new_car.car_type == self.last_spawned_type:
             self.consecutive_same_type += 1
@@ -336,12 +659,13 @@ class RoadFighterGame:
         if new_car.car_type == 'red':
             self.last_red_car_lane = lane
         
-        self.opponents.append(new_car)
+        self._add_opponent(new_car)
         return True
 
     def _get_speed_multiplier(self):
         """
         Calculate difficulty multiplier based on Time Elapsed (Stepped)
+        Default schedule (GameConfig.multiplier_thresholds / _values):
         0-30s   -> 1.0 (Base)
         30-46s  -> 1.2
         46-60s  -> 1.4
@@ -349,52 +673,38 @@ class RoadFighterGame:
         80-100s -> 1.8
         100s+   -> 2.0 (Max)
         """
-        time = self.elapsed_time
-        
-        if time < 30: return 1.0
-        elif time < 46: return 1.2
-        elif time < 60: return 1.4
-        elif time < 80: return 1.6
-        elif time < 100: return 1.8
-        else: return 2.0
+        return self.config.multiplier_at(self.elapsed_time)
 
     def _spawn_blocking_pattern(self):
-        possible_lane_pairs = [[0, 2], [0, 3], [1, 3]]
-        lanes_to_spawn = random.choice(possible_lane_pairs)
+        num_lanes = self.config.num_lanes
+        possible_lane_pairs = self.config.blocking_lane_pairs
+        lanes_to_spawn = self.rng.choice(possible_lane_pairs)
         
         if self.lane_camping_mode and self.last_player_lane is not None:
-            player_lane = max(0, min(NUM_LANES - 1, self.last_player_lane))
-            other_lanes = [l for l in range(NUM_LANES) if l != player_lane]
+            player_lane = max(0, min(num_lanes - 1, self.last_player_lane))
+            other_lanes = [l for l in range(num_lanes) if l != player_lane]
             if other_lanes:
-                lanes_to_spawn = [player_lane, random.choice(other_lanes)]
+                lanes_to_spawn = [player_lane, self.rng.choice(other_lanes)]
         
-        pattern_cars = []
+        lane_index = self._indexed_opponents()
         any_spawned = False
         
         for i, lane in enumerate(lanes_to_spawn):
-            spawn_y = -100 - (i * 280)
-            min_spacing = OPPONENT_MIN_SPACING
-            lane_clear = True
-            
-            for opp in self.opponents:
-                if abs(opp.y - spawn_y) < min_spacing:
-                    lane_clear = False
-                    break
-            for pattern_car in pattern_cars:
-                if abs(pattern_car.y - spawn_y) < min_spacing:
-                    lane_clear = False
-                    break
+            spawn_y = -100 - (i * self.config.blocking_pattern_row_gap)
+            min_spacing = self.config.opponent_min_spacing
+            # Pattern cars already placed are indexed too
+            lane_clear = not lane_index.any_within(spawn_y, min_spacing)
             
             if lane_clear:
-                vertical_offset = -(i * 280)
+                vertical_offset = -(i * self.config.blocking_pattern_row_gap)
                 force_different_type = (self.consecutive_same_type >= 2)
                 
                 if force_different_type:
                     available_types = [t for t in ['green', 'yellow', 'red'] if t != self.last_spawned_type]
-                    forced_type = random.choice(available_types)
-                    new_car = OpponentCar(lane, vertical_offset, 0, force_type=forced_type)
+                    forced_type = self.rng.choice(available_types)
+                    new_car = self._new_opponent(lane, vertical_offset, force_type=forced_type)
                 else:
-                    new_car = OpponentCar(lane, vertical_offset, 0)
+                    new_car = self._new_opponent(lane, vertical_offset)
                 
                 if new_car.car_type == self.last_spawned_type:
                     self.consecutive_same_type += 1
@@ -411,82 +721,39 @@ class RoadFighterGame:
                 if new_car.car_type == 'red':
                     self.last_red_car_lane = lane
                 
-                self.opponents.append(new_car)
-                pattern_cars.append(new_car)
+                self._add_opponent(new_car)
                 any_spawned = True
         
         return any_spawned
 
     def _check_collisions(self):
-        player_rect = self.player.get_rect()
-        for opp in self.opponents:
-            if player_rect.colliderect(opp.get_rect()):
-                return opp
-        return None
+        # Only cars in the player's y-band and neighboring lanes are tested
+        return self._indexed_opponents().first_overlap(self.player)
+
+    def clone_state(self, out=None):
+        """
+        Snapshot the full engine state (player, opponents, spawn and camping
+        counters, reward flags, RNG) into a float64 array and return it.
+        The traffic schedule itself is shared, not copied: only the cursor is.
+        """
+        if out is None:
+            out = np.zeros(snapshot.STATE_SIZE)
+        return snapshot.pack(self, out)
+
+    def restore_state(self, state):
+        """Return the engine to a snapshot taken with clone_state()"""
+        snapshot.unpack(self, state)
+
+    def write_state(self, out):
+        """Write State V3 into a preallocated float32 array and return it"""
+        return self._obs_builder.write(self, out)
 
     def get_state(self):
         # State V3: Enhanced Object Awareness
         # Size: 32 (Player[4] + Global[3] + 5 * Car[5])
-        
-        state = []
-        player = self.player
-        
-        # 1. Player features [4]
-        state.extend([
-            player.x / SCREEN_WIDTH,                 # Normalized X
-            player.velocity_y / PLAYER_MAX_SPEED,    # Normalized Speed
-            player.current_lane / (NUM_LANES - 1),   # Lane Index
-            1.0 if player.is_changing_lane else 0.0  # Lane Change Flag
-        ])
-        
-        # 2. Global Progress [3]
-        current_mult = self._get_speed_multiplier()
-        state.extend([
-            self.time_remaining / RACE_TIME_LIMIT,
-            min(self.distance_traveled / TARGET_DISTANCE, 1.0),
-            current_mult / 2.0  # Normalized Multiplier (1.0-2.0 -> 0.5-1.0)
-        ])
-        
-        # 3. Nearest Opponents (KNN) [5 * 5 = 25]
-        opp_data = []
-        for opp in self.opponents:
-            if not opp.active: continue
-            
-            # Relative Position
-            dx = (opp.x - player.x) / SCREEN_WIDTH
-            dy = (opp.y - player.y) / SCREEN_HEIGHT
-            dist = (dx*dx + dy*dy)**0.5
-            
-            # Type Encoding
-            type_val = 0.0
-            if opp.car_type == 'yellow': type_val = 0.5
-            elif opp.car_type == 'red': type_val = 1.0
-            
-            # Direction/Vel X
-            dir_val = float(opp.movement_direction)
-            
-            # Relative Velocity Y (Opponent Screen Speed)
-            # Calculated as (120 * Mult) / Max_Speed_Reference (~300)
-            # Negative because they move "down" towards player? 
-            # Actually they move +Y (down screen). Player is fixed.
-            # So they effectively have speed +Y.
-            opp_speed_y = (120 * current_mult) / 300.0
-            
-            opp_data.append({
-                'dist': dist,
-                'features': [dx, dy, type_val, dir_val, opp_speed_y]
-            })
-            
-        # Sort by distance
-        opp_data.sort(key=lambda x: x['dist'])
-        
-        # Take nearest 5
-        k = 5
-        for i in range(k):
-            if i < len(opp_data):
-                state.extend(opp_data[i]['features'])
-            else:
-                # Padding: Far away, no speed
-                state.extend([0.0, -2.0, 0.0, 0.0, 0.0]) 
-                
-        return state
+        return self.write_state(self._state_buf).tolist()
+
+    def _state(self, out):
+        if out is None:
+            return self.get_state()
+        return self.write_state(out)
@@ -1,15 +1,21 @@
 """
 Road Fighter - Game Entities
+Pure logic: no pygame dependency. Drawing lives in renderer.py.
 """
 
-import pygame
-import random
 from .constants import *
+from .rng import BlockRandom
+from .config import DEFAULT_CONFIG
+
+# Cars built outside an engine (tests, tools) draw from here
+_default_rng = BlockRandom()
 
 
 class Car:
     """Base class for all cars with common attributes and methods"""
     
+    __slots__ = ('x', 'y', 'width', 'height', 'active')
+    
     def __init__(self, x, y, width, height):
         self.x = x
         self.y = y
@@ -17,25 +23,30 @@ class Car:
         self.height = height
         self.active = True
     
-    def get_rect(self):
-        """Get collision rectangle"""
-        return pygame.Rect(int(self.x), int(self.y), self.width, self.height)
+    def overlaps(self, other):
+        """Axis-aligned bounding box test against another car (no allocation)"""
+        return (self.x < other.x + other.width and other.x < self.x + self.width and
+                self.y < other.y + other.height and other.y < self.y + self.height)
 
 
 class PlayerCar(Car):
     """Player-controlled car"""
     
-    def __init__(self, x, y):
-        super().__init__(x, y, PLAYER_WIDTH, PLAYER_HEIGHT)
-        self.velocity_y = PLAYER_BASE_SPEED
+    __slots__ = ('velocity_y', 'is_changing_lane', 'target_x', 'start_x',
+                 'lane_change_progress', 'lane_change_speed', 'current_lane', 'config')
+    
+    def __init__(self, x, y, config=None):
+        self.config = config = DEFAULT_CONFIG if config is None else config
+        super().__init__(x, y, config.player_width, config.player_height)
+        self.velocity_y = config.player_base_speed
         
         # Lane changing
         self.is_changing_lane = False
         self.target_x = x
         self.start_x = x
         self.lane_change_progress = 0
-        self.lane_change_speed = 5.0
-        self.current_lane = 1
+        self.lane_change_speed = config.lane_change_speed
+        self.current_lane = config.player_start_lane
         
     def update(self, delta_time, left, right, brake):
         """Update car state"""
@@ -55,27 +66,28 @@ class PlayerCar(Car):
             # Allow continuous movement while holding keys
             if left:
                 # Move half lane left (50 pixels)
-                half_lane = LANE_WIDTH / 2.0
+                half_lane = self.config.lane_width / 2.0
                 new_x = self.x - half_lane
                 # Check boundaries
-                if new_x >= ROAD_LEFT_EDGE:
+                if new_x >= self.config.road_left_edge:
                     self._start_lane_change(new_x)
                     
             elif right:  # Changed to elif to prevent simultaneous left+right
                 # Move half lane right (50 pixels)
-                half_lane = LANE_WIDTH / 2.0
+                half_lane = self.config.lane_width / 2.0
                 new_x = self.x + half_lane
                 # Check boundaries
-                if new_x + self.width <= ROAD_RIGHT_EDGE:
+                if new_x + self.width <= self.config.road_right_edge:
                     self._start_lane_change(new_x)
         
         # Speed
+        config = self.config
         if brake:
-            self.velocity_y -= PLAYER_BRAKE_FORCE * delta_time
+            self.velocity_y -= config.player_brake_force * delta_time
         else:
-            self.velocity_y += PLAYER_ACCELERATION * delta_time
+            self.velocity_y += config.player_acceleration * delta_time
             
-        self.velocity_y = max(PLAYER_MIN_SPEED, min(PLAYER_MAX_SPEED, self.velocity_y))
+        self.velocity_y = max(config.player_min_speed, min(config.player_max_speed, self.velocity_y))
         self._update_current_lane()
         
     def _start_lane_change(self, new_x):
@@ -85,52 +97,48 @@ class PlayerCar(Car):
         self.lane_change_progress = 0
         
     def _update_current_lane(self):
-        car_center = self.x + self.width / 2.0
-        for i, lane_center in enumerate(LANE_CENTERS):
-            lane_start = ROAD_LEFT_EDGE + i * LANE_WIDTH
-            lane_end = lane_start + LANE_WIDTH
-            if lane_start <= car_center < lane_end:
-                self.current_lane = i
-                break
-                
-    def render(self, screen):
-        if not self.active:
-            return
-            
-        # Car body
-        pygame.draw.rect(screen, COLOR_PLAYER, 
-                        (int(self.x), int(self.y), self.width, self.height))
-        pygame.draw.rect(screen, (255, 255, 255),
-                        (int(self.x), int(self.y), self.width, self.height), 2)
-        
-        # Windshield
-        pygame.draw.rect(screen, (100, 150, 255),
-                        (int(self.x) + 5, int(self.y) + 5, 
-                         self.width - 10, self.height // 4))
-        
-        # Wheels
-        wheel_w, wheel_h = 8, 20
-        positions = [(int(self.x) - wheel_w//2, int(self.y) + 15),
-                     (int(self.x) - wheel_w//2, int(self.y) + self.height - 35),
-                     (int(self.x) + self.width - wheel_w//2, int(self.y) + 15),
-                     (int(self.x) + self.width - wheel_w//2, int(self.y) + self.height - 35)]
-        for pos in positions:
-            pygame.draw.rect(screen, (0, 0, 0), (*pos, wheel_w, wheel_h))
+        lane = self.config.lane_at(self.x + self.width / 2.0)
+        if lane is not None:
+            self.current_lane = lane
 
 
 class OpponentCar(Car):
-    """AI opponent car with different behaviors"""
+    """
+    AI opponent car with different behaviors.
+    Instances are pooled by the engine: reset() re-spawns a car in place.
+    """
+    
+    __slots__ = ('lane', 'start_lane', 'speed', 'color', 'car_type',
+                 'movement_timer', 'zig_zag_progress', 'target_adjacent_lane',
+                 'movement_direction', 'passed_counted', 'config')
+    
+    def __init__(self, lane, y_offset=0, x_variance=0, force_type=None, rng=None, side=None,
+                 config=None):
+        self.config = DEFAULT_CONFIG if config is None else config
+        self.reset(lane, y_offset, x_variance, force_type, rng, side)
     
-    def __init__(self, lane, y_offset=0, x_variance=0, force_type=None):
+    def reset(self, lane, y_offset=0, x_variance=0, force_type=None, rng=None, side=None):
+        """
+        (Re)spawn this car at the top of the given lane, drawing from rng (a BlockRandom).
+        side (-1/+1), if given, replaces the random pick of a yellow car's
+        adjacent lane and a red car's first direction.
+        """
+        if rng is None:
+            rng = _default_rng
+        config = self.config
+
         # Initialize base Car class with position and dimensions
-        x = LANE_CENTERS[lane] - OPPONENT_WIDTH // 2 + x_variance
-        y = -OPPONENT_HEIGHT + y_offset
-        super().__init__(x, y, OPPONENT_WIDTH, OPPONENT_HEIGHT)
+        x = config.lane_centers[lane] - config.opponent_width // 2 + x_variance
+        y = -config.opponent_height + y_offset
+        super().__init__(x, y, config.opponent_width, config.opponent_height)
+        
+        # Passing bonus is paid once per car
+        self.passed_counted = False
         
         # Opponent-specific attributes
         self.lane = lane
         self.start_lane = lane
-        self.speed = OPPONENT_SPEED
+        self.speed = config.opponent_speed
         
         # Choose color and behavior (or force a type)
         if force_type:
@@ -146,11 +154,11 @@ class OpponentCar(Car):
                 self.car_type = 'red'
         else:
             # Random selection based on probability
-            rand = random.random()
-            if rand < GREEN_CAR_PROBABILITY:
+            rand = rng.random()
+            if rand < config.green_car_probability:
                 self.color = COLOR_OPPONENT_GREEN
                 self.car_type = 'green'
-            elif rand < GREEN_CAR_PROBABILITY + YELLOW_CAR_PROBABILITY:
+            elif rand < config.green_car_probability + config.yellow_car_probability:
                 self.color = COLOR_OPPONENT_YELLOW
                 self.car_type = 'yellow'
             else:
@@ -171,18 +179,20 @@ class OpponentCar(Car):
             # Pick left or right adjacent lane
             if self.start_lane == 0:
                 self.target_adjacent_lane = 1  # Can only go right
-            elif self.start_lane == NUM_LANES - 1:
-                self.target_adjacent_lane = NUM_LANES - 2  # Can only go left
+            elif self.start_lane == config.num_lanes - 1:
+                self.target_adjacent_lane = config.num_lanes - 2  # Can only go left
             else:
                 # Pick randomly: left or right adjacent
-                self.target_adjacent_lane = self.start_lane + random.choice([-1, 1])
+                if side is None:
+                    side = rng.choice((-1, 1))
+                self.target_adjacent_lane = self.start_lane + side
             
             # IMPORTANT: Always start by moving TOWARDS target_adjacent_lane
             # This ensures yellow car starts moving immediately upon spawn
             self.movement_direction = 1
         elif self.car_type == 'red':
             # Red cars start with random direction
-            self.movement_direction = random.choice([-1, 1])
+            self.movement_direction = rng.choice((-1, 1)) if side is None else side
             self.target_adjacent_lane = None
         else:
             # Green cars don't move horizontally
@@ -194,9 +204,8 @@ class OpponentCar(Car):
             return
             
         # Move vertically - fixed speed downward with multiplier for progressive difficulty
-        # Base speed is 120 pixels/second, multiplied by difficulty factor
-        base_speed = 120
-        self.y += base_speed * speed_multiplier * delta_time
+        # Base speed is config.opponent_scroll_speed (120 px/s), multiplied by difficulty factor
+        self.y += self.config.opponent_scroll_speed * speed_multiplier * delta_time
         
         # Horizontal movement based on car type
         if self.car_type == 'green':
@@ -214,9 +223,9 @@ class OpponentCar(Car):
                 target_lane = self.start_lane
             
             # Move towards target lane center with speed multiplier
-            target_x = LANE_CENTERS[target_lane] - self.width // 2
+            target_x = self.config.lane_centers[target_lane] - self.width // 2
             if abs(self.x - target_x) > 2:
-                horizontal_speed = 100 * speed_multiplier  # Increased from 60 for faster visible movement
+                horizontal_speed = self.config.yellow_speed_x * speed_multiplier  # Increased from 60 for faster visible movement
                 if self.x < target_x:
                     self.x += horizontal_speed * delta_time  # Move right
                 else:
@@ -231,12 +240,12 @@ class OpponentCar(Car):
             self.movement_timer += delta_time
             
             # Move continuously at constant speed with multiplier
-            horizontal_speed = 70 * speed_multiplier  # Apply multiplier
+            horizontal_speed = self.config.red_speed_x * speed_multiplier  # Apply multiplier
             self.x += self.movement_direction * horizontal_speed * delta_time
             
             # Check boundaries and reverse when reaching edges
-            left_bound = ROAD_LEFT_EDGE
-            right_bound = ROAD_RIGHT_EDGE - self.width
+            left_bound = self.config.road_left_edge
+            right_bound = self.config.road_right_edge - self.width
             
             if self.x <= left_bound:
                 self.x = left_bound
@@ -246,56 +255,10 @@ class OpponentCar(Car):
                 self.movement_direction = -1  # Start moving left
         
         # Update current lane based on position
-        car_center = self.x + self.width / 2.0
-        for i, lane_center in enumerate(LANE_CENTERS):
-            lane_start = ROAD_LEFT_EDGE + i * LANE_WIDTH
-            lane_end = lane_start + LANE_WIDTH
-            if lane_start <= car_center < lane_end:
-                self.lane = i
-                break
+        lane = self.config.lane_at(self.x + self.width / 2.0)
+        if lane is not None:
+            self.lane = lane
         
         # Deactivate if off screen bottom
-        if self.y > SCREEN_HEIGHT + 100:
+        if self.y > self.config.opponent_despawn_y:
             self.active = False
-            
-    def render(self, screen):
-        if not self.active:
-            return
-            
-        # Car body
-        pygame.draw.rect(screen, self.color,
-                        (int(self.x), int(self.y), self.width, self.height))
-        pygame.draw.rect(screen, (255, 255, 255),
-                        (int(self.x), int(self.y), self.width, self.height), 2)
-        
-        # Windshield
-        pygame.draw.rect(screen, (150, 200, 255),
-                        (int(self.x) + 5, int(self.y) + 5,
-                         self.width - 10, self.height // 4))
-        
-        # Add blinkers for yellow and red cars to show movement direction
-        if self.car_type in ['yellow', 'red']:
-            # Blink timer - use movement_timer for animation
-            blink_on = int(self.movement_timer * 3) % 2 == 0  # Blink 3 times per second
-            
-            if blink_on:
-                # Yellow cars get red blinkers, red cars get yellow blinkers
-                if self.car_type == 'yellow':
-                    blinker_color = (255, 0, 0)  # Red blinkers for yellow cars
-                else:  # red car
-                    blinker_color = (255, 255, 0)  # Yellow blinkers for red cars
-                
-                blinker_size = 6
-                back_y = int(self.y) + self.height - 10  # Position at back of car
-                
-                # Show left blinker if moving left
-                if self.movement_direction < 0:
-                    # Left blinker at back
-                    pygame.draw.circle(screen, blinker_color,
-                                     (int(self.x) + 10, back_y), blinker_size)
-                
-                # Show right blinker if moving right
-                elif self.movement_direction > 0:
-                    # Right blinker at back
-                    pygame.draw.circle(screen, blinker_color,
-                                     (int(self.x) + self.width - 10, back_y), blinker_size)
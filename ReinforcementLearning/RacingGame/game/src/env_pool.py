@@ -0,0 +1,142 @@
+"""
+Road Fighter - Async Env Pool
+
+EnvPool-style asynchronous stepping on top of SharedMemoryVecEnv: send()
+hands actions to any subset of races, recv() returns the first batch_size
+races to finish, whichever they are. A race that just reset or hit a dense
+traffic step no longer holds up the others.
+
+Each worker steps the races flagged pending in its group and publishes every
+finished one to its own ring of race ids (no lock: one writer per ring); one
+semaphore counts published races for the main process.
+"""
+
+from collections import deque
+import numpy as np
+from .shm_vec_env import SharedMemoryVecEnv
+from .shm_worker import CMD_STEP, _pool_layout, _pool_worker
+
+
+class AsyncEnvPool(SharedMemoryVecEnv):
+    """
+    SharedMemoryVecEnv with EnvPool-style send/recv.
+
+        pool = AsyncEnvPool(64, batch_size=16)
+        obs, rewards, dones, infos, env_ids = pool.async_reset()
+        while ...:
+            pool.send(actions, env_ids)
+            obs, rewards, dones, infos, env_ids = pool.recv()
+
+    recv() returns the first batch_size races (fewer if fewer are in
+    flight) in finishing order; rows of obs/rewards/dones/infos belong to
+    env_ids. The synchronous VecEnv API (reset/step) still works, stepping
+    all races, so the pool can be handed to PPO; PoolPPO
+    (src/pool_ppo.py) collects rollouts through send/recv.
+    """
+
+    worker_target = staticmethod(_pool_worker)
+    array_layout = staticmethod(_pool_layout)
+
+    def __init__(self, num_envs, batch_size=None, num_workers=None, env_kwargs=None, start_method=None):
+        self.batch_size = num_envs if batch_size is None else max(1, min(batch_size, num_envs))
+        self._in_flight = np.zeros(num_envs, dtype=bool)
+        # Races reported by async_reset, handed out by recv before any stepped race
+        self._reset_ready = deque()
+        super().__init__(num_envs, num_workers=num_workers, env_kwargs=env_kwargs, start_method=start_method)
+        self._tails = [0] * self.num_workers
+
+    # ------------------------------------------------------------------
+    # Async interface
+    # ------------------------------------------------------------------
+    def async_reset(self):
+        """Reset every race; the first recv-sized batch is returned, the rest queue up"""
+        self.reset()
+        self._reset_ready.extend(range(self.num_envs))
+        return self.recv()
+
+    def send(self, actions, env_ids):
+        """Start stepping races env_ids with actions (one per race)"""
+        env_ids = np.asarray(env_ids, dtype=np.int64).reshape(-1)
+        if self._in_flight[env_ids].any():
+            raise RuntimeError("AsyncEnvPool.send: a race is already being stepped")
+        arrays = self._arrays
+        arrays['actions'][env_ids] = np.asarray(actions).reshape(len(env_ids))
+        arrays['pending'][env_ids] = True
+        self._in_flight[env_ids] = True
+        for worker, (start, stop) in enumerate(self._groups):
+            if ((env_ids >= start) & (env_ids < stop)).any():
+                self._commands[worker] = CMD_STEP
+                self._work[worker].release()
+
+    def recv(self, batch_size=None):
+        """
+        (obs, rewards, dones, infos, env_ids) of the next batch_size races
+        to finish, or of every race in flight if fewer are.
+        """
+        if batch_size is None:
+            batch_size = self.batch_size
+        env_ids = []
+        while self._reset_ready and len(env_ids) < batch_size:
+            env_ids.append(self._reset_ready.popleft())
+        num_reset = len(env_ids)
+        count = min(batch_size - num_reset, int(self._in_flight.sum()))
+        env_ids += self._collect(count)
+        env_ids = np.array(env_ids, dtype=np.int64)
+
+        arrays = self._arrays
+        rewards = arrays['rewards'][env_ids]
+        dones = arrays['dones'][env_ids]
+        # Races still fresh from async_reset have no step result yet
+        rewards[:num_reset] = 0.0
+        dones[:num_reset] = False
+        infos = [{} for _ in env_ids]
+        for row in np.flatnonzero(dones):
+            info = self._episode_info(env_ids[row])
+            info['terminal_observation'] = arrays['terminal_obs'][env_ids[row]].copy()
+            infos[row] = info
+        return arrays['obs'][env_ids], rewards, dones, infos, env_ids
+
+    def _collect(self, count):
+        """Wait for `count` published races and return their ids in order"""
+        arrays = self._arrays
+        ready, ready_head = arrays['ready'], arrays['ready_head']
+        env_ids = []
+        worker = 0
+        for _ in range(count):
+            # One release per published race: after acquiring, some ring has an unread id
+            self._wait(1)
+            while self._tails[worker] >= ready_head[worker]:
+                worker = (worker + 1) % self.num_workers
+            start, stop = self._groups[worker]
+            env_ids.append(int(ready[start + self._tails[worker] % (stop - start)]))
+            self._tails[worker] += 1
+        for remote in self._remotes:
+            if remote.poll():
+                self._raise(remote.recv())
+        self._in_flight[env_ids] = False
+        return env_ids
+
+    def _drain(self):
+        """Finish every step in flight (before resets and attribute calls)"""
+        self._reset_ready.clear()
+        self._collect(int(self._in_flight.sum()))
+
+    # ------------------------------------------------------------------
+    # Synchronous VecEnv interface
+    # ------------------------------------------------------------------
+    def reset(self):
+        self._drain()
+        return super().reset()
+
+    def step_async(self, actions):
+        self._drain()
+        self.send(actions, np.arange(self.num_envs))
+
+    def step_wait(self):
+        obs, rewards, dones, infos, env_ids = self.recv(self.num_envs)
+        order = np.argsort(env_ids)
+        return obs[order], rewards[order], dones[order], [infos[k] for k in order]
+
+    def _call(self, kind, name, args, kwargs, indices):
+        self._drain()
+        return super()._call(kind, name, args, kwargs, indices)
@@ -1,26 +1,58 @@
 import gymnasium as gym
 from gymnasium import spaces
+import time
 import numpy as np
-import pygame
 from .core import RoadFighterGame
+from .observation import OBS_SIZE
+from .traffic import TrafficSchedule
 
 class RacingGameEnv(gym.Env):
     """Gymnasium-compatible wrapper for RoadFighterGame"""
     
-    metadata = {"render_modes": ["human"], "render_fps": 60}
+    metadata = {"render_modes": ["human", "turbo"], "render_fps": 60}
     
-    def __init__(self, render_mode=None, frame_skip=4):
+    def __init__(self, render_mode=None, frame_skip=4, scheduled_traffic=False, fast_forward=False,
+                 macro_steps=False, adaptive_dt=False, copy_obs=True, obs_buffer=None,
+                 display_fps=15, renderer=None, config=None):
         super().__init__()
-        # Core Game Logic (Headless)
-        self.game = RoadFighterGame()
+        # Core Game Logic (Headless), on the GameConfig variant given (default: src/constants.py)
+        self.game = RoadFighterGame(config=config)
         self.render_mode = render_mode
         self.renderer = None
         self.frame_skip = frame_skip
         
-        # Initialize Renderer only if needed
-        if self.render_mode == "human":
-            from .renderer import GameRenderer
-            self.renderer = GameRenderer()
+        # Compile each race's traffic up front (see src/traffic.py)
+        self.scheduled_traffic = scheduled_traffic
+        
+        # Jump over empty-road frames in closed form (same rewards)
+        self.game.fast_forward = fast_forward
+        
+        # Also through traffic: opponents move in closed form, swept collision checks
+        self.game.macro_steps = macro_steps
+        
+        # Macro steps only while no car is near the player and no lane change runs
+        self.game.adaptive_dt = adaptive_dt
+        
+        # Persistent observation buffer, written in place by the engine.
+        # copy_obs=False hands out the buffer itself (valid until the next
+        # step/reset), for vec envs that copy observations into their own arrays.
+        # A race's last observation is always a copy: vec envs keep it as
+        # terminal_observation and then reset(), which rewrites the buffer.
+        # obs_buffer supplies that buffer (e.g. a row of a shared-memory array)
+        self._obs = np.zeros(OBS_SIZE, dtype=np.float32) if obs_buffer is None else obs_buffer
+        self.copy_obs = copy_obs
+        
+        # Initialize Renderer only if needed. "turbo" runs the simulation
+        # uncapped and draws at most display_fps frames per wall-clock second.
+        # A renderer passed in (e.g. kept across envs) stays open on close()
+        self.display_fps = display_fps
+        self._next_draw = 0.0
+        self._owns_renderer = renderer is None
+        if self.render_mode in ("human", "turbo"):
+            if renderer is None:
+                from .renderer import GameRenderer
+                renderer = GameRenderer()
+            self.renderer = renderer
         
         # Define action space: 0=nothing, 1=left, 2=right, 3=brake
         self.action_space = spaces.Discrete(4)
@@ -29,13 +61,25 @@ class RacingGameEnv(gym.Env):
         # Player[4] + Global[3] + 5 * Objects[5]
         # Range includes negative relative coordinates, so use ample bounds
         self.observation_space = spaces.Box(
-            low=-3.0, high=3.0, shape=(32,), dtype=np.float32
+            low=-3.0, high=3.0, shape=(OBS_SIZE,), dtype=np.float32
         )
     
     def reset(self, seed=None, options=None):
         super().reset(seed=seed)
-        state_vec = self.game.reset()
-        return np.array(state_vec, dtype=np.float32), {}
+        if seed is not None:
+            # Traffic comes from the engine's own stream, not gym's np_random
+            self.game.seed(seed)
+        if options and options.get('traffic_schedule') is not None:
+            # Replay a given schedule (e.g. the same traffic for every policy), for this race only
+            self.game.set_traffic_schedule(options['traffic_schedule'])
+        elif self.scheduled_traffic:
+            self.game.set_traffic_schedule(TrafficSchedule.compile(self.game.rng.generator, self.game.config))
+        elif self.game.traffic is not None:
+            # Later resets (e.g. a vec env's auto-resets) go back to live traffic
+            self.game.set_traffic_schedule(None)
+        self.game.reset()
+        self.game.write_state(self._obs)
+        return self._observation(), {}
     
     def step(self, action):
         # Convert discrete action to game controls
@@ -43,55 +87,57 @@ class RacingGameEnv(gym.Env):
         right = (action == 2)
         brake = (action == 3)
         
-        total_reward = 0.0
-        terminated = False
+        # Frame Skipping: the engine runs up to frame_skip frames with the
+        # same controls, accumulating reward and the lane-change penalty, and
+        # builds the observation and info once at the end
+        _, total_reward, terminated, info = self.game.step_n(
+            self.frame_skip, left, right, brake, out=self._obs
+        )
         truncated = False
-        final_info = {}
         
-        # Frame Skipping Loop
-        # If frame_skip=1, this loop runs once (Standard 60Hz)
-        # If frame_skip=4, this loop runs 4 times (15Hz)
-        for _ in range(self.frame_skip):
-            # Step the core logic
-            state, raw_reward, done, info = self.game.step(left, right, brake)
-            
-            # 1. Base reward from engine
-            reward = raw_reward
+        if terminated:
+            # Termination Rewards/Penalties, on top of the final frame reward
+            reward = self.game.last_frame_reward
+            if self.game.end_reason == 'collision':
+                reward -= 100.0
+            elif self.game.end_reason == 'victory':
+                reward += 100.0
+            # Timeout gets no special penalty, just ends the episode
             
-            # 2. Penalties from core tracking     
-            if self.game.player.is_changing_lane:
-                reward -= 0.05
-                
             total_reward += reward
-            final_info = info # Keep latest info
             
-            if done:
-                terminated = True
-                
-                # 3. Termination Rewards/Penalties
-                if self.game.end_reason == 'collision':
-                    reward -= 100.0
-                elif self.game.end_reason == 'victory':
-                    reward += 100.0
-                # Timeout gets no special penalty, just ends the episode
-                
-                total_reward += reward
-                break
+            # Per-step infos stay lazy (StepInfo); the episode's last one is a full dict
+            if not isinstance(info, dict):
+                info = info.to_dict()
         
         return (
-            np.array(state, dtype=np.float32),
+            self._obs.copy() if terminated else self._observation(),
             float(total_reward),
             terminated,
             truncated,
-            final_info
+            info
         )
     
+    def _observation(self):
+        return self._obs.copy() if self.copy_obs else self._obs
+    
     def render(self):
         if self.render_mode == "human" and self.renderer:
+            import pygame
             # Process window events to keep UI responsive
             pygame.event.pump()
             self.renderer.render(self.game)
+        elif self.render_mode == "turbo" and self.renderer:
+            # Drop frames down to display_fps, but always show how a race ends
+            now = time.perf_counter()
+            if now < self._next_draw and not self.game.game_over:
+                return
+            self._next_draw = now + 1.0 / self.display_fps
+            import pygame
+            pygame.event.pump()
+            self.renderer.render(self.game, fps=None)
     
     def close(self):
-        if pygame.get_init():
-            pygame.quit()
+        # Headless envs never touch pygame
+        if self.renderer is not None and self._owns_renderer:
+            self.renderer.close()
@@ -0,0 +1,269 @@
+"""
+Road Fighter - Batched Policy Inference Server
+
+One process holds the policy; env workers and evaluators in other processes
+ask it for actions. Each client owns a fixed block of rows in a shared
+observation/action array: it writes its observations, raises its request
+flag and waits. The server gathers requests until every client has asked or
+max_latency has passed since the first one, runs a single batched forward
+pass over all their rows and scatters the actions back in place.
+
+evaluate_episodes() is the ready-made consumer: seeded episodes fanned out
+over worker processes, all acting through one server.
+"""
+
+import os
+import queue
+import threading
+import time
+import numpy as np
+from multiprocessing import shared_memory
+from .observation import OBS_SIZE
+from .shm_worker import _offsets, _attach, mp_context
+
+# Seconds a blocked server or client waits before re-checking for shutdown
+INFERENCE_POLL_INTERVAL = 0.5
+
+
+def _inference_layout(num_rows, num_clients):
+    return (
+        ('obs', (num_rows, OBS_SIZE), np.float32),
+        ('actions', (num_rows,), np.int64),
+        ('counts', (num_clients,), np.int64),      # Rows in client c's current request
+        ('requested', (num_clients,), np.bool_),
+    )
+
+
+class InferenceClient:
+    """
+    A client's handle: act(obs) returns the policy's actions for up to
+    `size` observations. Pass it to a worker process as a Process argument
+    (it carries semaphores); it attaches to the shared block on first use.
+    """
+
+    def __init__(self, index, start, size, shm_name, layout, request, response):
+        self.index = index
+        self.start = start
+        self.size = size
+        self._shm_name = shm_name
+        self._layout = layout
+        self._request = request
+        self._response = response
+        self._shm = None
+        self._arrays = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_shm'] = state['_arrays'] = None
+        return state
+
+    def act(self, obs):
+        """Actions for obs (n <= size rows), computed in the server's next batch"""
+        if self._arrays is None:
+            self._shm = shared_memory.SharedMemory(name=self._shm_name)
+            self._arrays = _attach(self._shm.buf, self._layout)
+        arrays = self._arrays
+        n = len(obs)
+        rows = slice(self.start, self.start + n)
+        arrays['obs'][rows] = obs
+        arrays['counts'][self.index] = n
+        arrays['requested'][self.index] = True
+        self._request.release()
+        self._response.acquire()
+        return arrays['actions'][rows].copy()
+
+    def close(self):
+        if self._shm is not None:
+            self._arrays = None
+            self._shm.close()
+            self._shm = None
+
+
+class InferenceServer:
+    """
+    Batched action server for `model` (anything with SB3's
+    predict(obs, deterministic=...), e.g. a PPO model or its policy).
+
+    client_sizes lists how many observations each client sends at most; make
+    the server, hand its clients to the worker processes, then start() it.
+    Statistics: batches, rows (total observations served), mean_batch_rows.
+    """
+
+    def __init__(self, model, client_sizes, max_latency=0.002, deterministic=True, start_method=None):
+        ctx = mp_context(start_method)
+        self.model = model
+        self.max_latency = max_latency
+        self.deterministic = deterministic
+        self.batches = 0
+        self.rows = 0
+
+        # 1. Shared rows, one contiguous block per client
+        self._layout = _inference_layout(sum(client_sizes), len(client_sizes))
+        _, size = _offsets(self._layout)
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self._arrays = _attach(self._shm.buf, self._layout)
+        self._request = ctx.Semaphore(0)
+        self._responses = [ctx.Semaphore(0) for _ in client_sizes]
+        starts = np.concatenate([[0], np.cumsum(client_sizes)[:-1]]).astype(int)
+        self._starts = [int(start) for start in starts]
+        self.clients = [
+            InferenceClient(c, self._starts[c], int(client_sizes[c]), self._shm.name, self._layout,
+                            self._request, self._responses[c])
+            for c in range(len(client_sizes))
+        ]
+        self._running = False
+        self._thread = None
+
+    @property
+    def mean_batch_rows(self):
+        return self.rows / self.batches if self.batches else 0.0
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        return self
+
+    def _serve(self):
+        requested, counts = self._arrays['requested'], self._arrays['counts']
+        num_clients = len(self.clients)
+        while self._running:
+            if not self._request.acquire(timeout=INFERENCE_POLL_INTERVAL):
+                continue
+            # 1. Gather: wait for the other clients until the deadline
+            deadline = time.perf_counter() + self.max_latency
+            asked = 1
+            while asked < num_clients:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0 or not self._request.acquire(timeout=remaining):
+                    break
+                asked += 1
+            # A flag can be seen before its release is consumed: that client is
+            # served now and its stray release later finds no flags
+            clients = np.flatnonzero(requested)
+            if len(clients) == 0:
+                continue
+            self._forward(clients, counts)
+
+    def _forward(self, clients, counts):
+        # 2. One forward pass over every waiting client's rows
+        obs, actions = self._arrays['obs'], self._arrays['actions']
+        rows = np.concatenate([
+            np.arange(self._starts[c], self._starts[c] + counts[c]) for c in clients
+        ])
+        batch_actions, _ = self.model.predict(obs[rows], deterministic=self.deterministic)
+        # 3. Scatter the actions back and wake the clients
+        actions[rows] = batch_actions
+        self.batches += 1
+        self.rows += len(rows)
+        for c in clients:
+            self._arrays['requested'][c] = False
+            self._responses[c].release()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self):
+        self.stop()
+        self._arrays = None
+        self._shm.close()
+        self._shm.unlink()
+
+
+# ----------------------------------------------------------------------
+# Evaluation through the server
+# ----------------------------------------------------------------------
+def _eval_worker(client, env_kwargs, episodes, results):
+    """
+    Play `episodes` ((index, seed) pairs), client.size races at a time,
+    putting (index, final info) on results as each one ends.
+    """
+    from .gym_env import RacingGameEnv
+
+    envs = [RacingGameEnv(**env_kwargs) for _ in range(client.size)]
+    todo = list(episodes)
+    active = []  # [env, index, seed, episode_return, length] per running race
+    obs = np.zeros((client.size, OBS_SIZE), dtype=np.float32)
+
+    def start(env):
+        index, seed = todo.pop(0)
+        obs[len(active)] = env.reset(seed=seed)[0]
+        active.append([env, index, seed, 0.0, 0])
+
+    try:
+        for env in envs[:len(todo)]:
+            start(env)
+        while active:
+            actions = client.act(obs[:len(active)])
+            running = active
+            active = []
+            for race, action in zip(running, actions):
+                env = race[0]
+                ob, reward, terminated, truncated, info = env.step(int(action))
+                race[3] += reward
+                race[4] += 1
+                if terminated or truncated:
+                    results.put((race[1], dict(info, seed=race[2], reward=race[3], length=race[4],
+                                               collision_car_type=env.game.collision_car_type)))
+                    if todo:
+                        start(env)
+                    continue
+                obs[len(active)] = ob
+                active.append(race)
+    finally:
+        client.close()
+        for env in envs:
+            env.close()
+
+
+def evaluate_episodes(model, seeds, num_workers=None, envs_per_worker=4, env_kwargs=None,
+                      deterministic=True, max_latency=0.002, start_method=None):
+    """
+    Play one episode per seed with model's policy, in num_workers processes
+    (default: one per CPU) of envs_per_worker races each, every action
+    coming from one InferenceServer. Returns the episodes' final info dicts
+    (plus 'seed', 'reward', 'length' and 'collision_car_type', None unless
+    the race ended in a collision) in seed order.
+    """
+    seeds = list(seeds)
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    num_workers = max(1, min(num_workers, -(-len(seeds) // envs_per_worker)))
+    ctx = mp_context(start_method)
+
+    episodes = list(enumerate(seeds))
+    shares = [episodes[w::num_workers] for w in range(num_workers)]
+    server = InferenceServer(model, [min(envs_per_worker, len(share)) for share in shares],
+                             max_latency=max_latency, deterministic=deterministic,
+                             start_method=start_method)
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=_eval_worker, args=(client, dict(env_kwargs or {}), share, results), daemon=True)
+        for client, share in zip(server.clients, shares)
+    ]
+    server.start()
+    try:
+        for process in processes:
+            process.start()
+        infos = [None] * len(seeds)
+        for _ in seeds:
+            while True:
+                try:
+                    index, info = results.get(timeout=INFERENCE_POLL_INTERVAL)
+                    break
+                except queue.Empty:
+                    dead = [p.pid for p in processes if p.exitcode not in (None, 0)]
+                    if dead:
+                        raise RuntimeError(f"Evaluation worker process(es) {dead} died")
+            infos[index] = info
+        for process in processes:
+            process.join()
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        server.close()
+    return infos
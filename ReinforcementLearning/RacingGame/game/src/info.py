@@ -0,0 +1,98 @@
+"""
+Road Fighter - Step Info
+"""
+
+from collections.abc import MutableMapping
+
+INFO_KEYS = ('victory', 'distance', 'score', 'end_reason', 'cars_passed')
+
+
+class StepInfo(MutableMapping):
+    """
+    The info mapping returned by RoadFighterGame.step / step_n.
+
+    The end-of-step values sit in slots: one small object per step instead
+    of a dict plus a nested cars_passed dict, which is only built when read.
+    It reads like the old dict; keys written by wrappers ('episode',
+    'terminal_observation', ...) go to a side dict created on first write.
+    Deleting an engine key unsets its slot, so it is absent afterwards just
+    as in a dict. to_dict() (or copy()) materializes everything.
+    """
+
+    __slots__ = ('victory', 'distance', 'score', 'end_reason', 'green', 'yellow', 'red', '_extra')
+
+    def __init__(self, game):
+        self.victory = game.victory
+        self.distance = game.distance_traveled
+        self.score = game.score
+        self.end_reason = game.end_reason
+        self.green = game.green_cars_passed
+        self.yellow = game.yellow_cars_passed
+        self.red = game.red_cars_passed
+        self._extra = None
+
+    def get(self, key, default=None):
+        # Called for absent keys on every step by SB3 ('episode', 'is_success'): no KeyError round trip
+        extra = self._extra
+        if extra is not None and key in extra:
+            return extra[key]
+        if key == 'cars_passed':
+            try:
+                return {'green': self.green, 'yellow': self.yellow, 'red': self.red}
+            except AttributeError:
+                return default
+        if key in INFO_KEYS:
+            return getattr(self, key, default)
+        return default
+
+    def __getitem__(self, key):
+        value = self.get(key, self)
+        if value is self:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        if self._extra is not None:
+            self._extra.pop(key, None)
+        if key == 'cars_passed':
+            for name in ('green', 'yellow', 'red'):
+                if hasattr(self, name):
+                    delattr(self, name)
+        elif key in INFO_KEYS and hasattr(self, key):
+            delattr(self, key)
+
+    def _has_slot(self, key):
+        return hasattr(self, 'green' if key == 'cars_passed' else key)
+
+    def __contains__(self, key):
+        if self._extra is not None and key in self._extra:
+            return True
+        return key in INFO_KEYS and self._has_slot(key)
+
+    def __iter__(self):
+        extra = self._extra
+        for key in INFO_KEYS:
+            if self._has_slot(key) or (extra is not None and key in extra):
+                yield key
+        if extra is not None:
+            for key in extra:
+                if key not in INFO_KEYS:
+                    yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def to_dict(self):
+        return {key: self[key] for key in self}
+
+    copy = to_dict
+
+    def __repr__(self):
+        return repr(self.to_dict())
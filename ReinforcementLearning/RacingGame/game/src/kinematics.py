@@ -0,0 +1,185 @@
+"""
+Road Fighter - Opponent Kinematics
+
+Closed-form opponent motion over whole numbers of 60Hz frames, and swept
+AABB tests against the player. OpponentCar.update moves every car along a
+piecewise-linear path (yellow cars ramp between two lane centers and snap,
+red cars bounce between the road edges), so any number of frames can be
+advanced with one step per straight piece instead of one per frame. Used by
+RoadFighterGame's macro steps (see RoadFighterGame._advance_closed_form).
+"""
+
+from math import ceil
+# Opponent speeds in px/s at multiplier 1.0 come from each car's GameConfig (see OpponentCar.update)
+from .constants import FRAME_DT
+
+YELLOW_SNAP_DISTANCE = 2.0
+
+# Slack added to the swept boxes: covers the <= 2px yellow snap, the red
+# clamp at the edges (less than one frame of motion) and float rounding
+SWEEP_MARGIN = 4.0
+
+
+def scroll_per_frame(config, speed_multiplier):
+    """Vertical distance every opponent of a config covers in one frame"""
+    return config.opponent_scroll_speed * speed_multiplier * FRAME_DT
+
+
+def advance(value, delta, frames):
+    """value after `frames` additions of delta, rounded exactly like a per-frame loop"""
+    for _ in range(frames):
+        value += delta
+    return value
+
+
+def lateral_per_frame(car, speed_multiplier):
+    """Top horizontal distance car can cover in one frame"""
+    if car.car_type == 'yellow':
+        return car.config.yellow_speed_x * speed_multiplier * FRAME_DT
+    if car.car_type == 'red':
+        return car.config.red_speed_x * speed_multiplier * FRAME_DT
+    return 0.0
+
+
+def near_player(player, car, frames, speed_multiplier):
+    """
+    Cheap proximity test: whether car could come within SWEEP_MARGIN of the
+    player in the next `frames` frames, judged from its top speeds alone
+    (no path). Cars already behind the player are never near.
+    """
+    if car.y >= player.y + player.height:
+        return False
+    reach = car.y + car.height + scroll_per_frame(car.config, speed_multiplier) * frames
+    if reach <= player.y - SWEEP_MARGIN:
+        return False
+    gap = max(car.x - (player.x + player.width), player.x - (car.x + car.width))
+    return gap <= lateral_per_frame(car, speed_multiplier) * frames + SWEEP_MARGIN
+
+
+def x_pieces(car, frames, speed_multiplier):
+    """
+    Horizontal path of car over the next `frames` frames.
+
+    Yields (first_frame, last_frame, x_first, x_last, direction) per straight
+    piece: the car is at x_first after first_frame frames and at x_last after
+    last_frame frames, moving in a straight line in between, with
+    movement_direction == direction from last_frame on. Where a piece ends
+    (snap, bounce) is solved for directly; positions are summed frame by
+    frame so they round exactly as OpponentCar.update does, and a piece end
+    that lands on a frame boundary is settled the same way the engine would.
+    """
+    x = car.x
+    direction = car.movement_direction
+    if car.car_type == 'yellow':
+        step = car.config.yellow_speed_x * speed_multiplier * FRAME_DT
+        half_width = car.width // 2
+        lane_centers = car.config.lane_centers
+        frame = 0
+        while frame < frames:
+            lane = car.target_adjacent_lane if direction > 0 else car.start_lane
+            target = lane_centers[lane] - half_width
+            gap = abs(x - target)
+            if gap > YELLOW_SNAP_DISTANCE:
+                # Frames moving before the car is within snapping distance
+                delta = step if x < target else -step
+                moves = max(1, ceil((gap - YELLOW_SNAP_DISTANCE) / step))
+                if moves > 1 and abs(advance(x, delta, moves - 1) - target) <= YELLOW_SNAP_DISTANCE:
+                    moves -= 1
+                moves = min(moves, frames - frame)
+                end = advance(x, delta, moves)
+                if frame + moves < frames and abs(end - target) > YELLOW_SNAP_DISTANCE:
+                    end += delta
+                    moves += 1
+                yield frame, frame + moves, x, end, direction
+                x = end
+                frame += moves
+            else:
+                # Snap frame: jump onto the lane center and turn around
+                direction = -direction
+                yield frame, frame + 1, x, target, direction
+                x = target
+                frame += 1
+    elif car.car_type == 'red':
+        step = car.config.red_speed_x * speed_multiplier * FRAME_DT
+        left_bound = car.config.road_left_edge
+        right_bound = car.config.road_right_edge - car.width
+        frame = 0
+        while frame < frames:
+            delta = direction * step
+            room = right_bound - x if direction > 0 else x - left_bound
+            # Frame on which the edge is reached (clamped) and the car turns
+            hit = max(1, ceil(room / step))
+            if hit > 1:
+                before = advance(x, delta, hit - 1)
+                if before >= right_bound if direction > 0 else before <= left_bound:
+                    hit -= 1
+            if frame + hit > frames:
+                end = advance(x, delta, frames - frame)
+                yield frame, frames, x, end, direction
+                return
+            end = advance(x, delta, hit)
+            if end < right_bound if direction > 0 else end > left_bound:
+                # One frame short after rounding: the edge is reached on the next one
+                if frame + hit == frames:
+                    yield frame, frames, x, end, direction
+                    return
+                hit += 1
+            end = right_bound if direction > 0 else left_bound
+            direction = -direction
+            yield frame, frame + hit, x, end, direction
+            x = end
+            frame += hit
+    else:
+        yield 0, frames, x, x, direction
+
+
+def x_after(car, frames, speed_multiplier):
+    """(x, movement_direction) of car after `frames` frames"""
+    x, direction = car.x, car.movement_direction
+    for _, _, _, x, direction in x_pieces(car, frames, speed_multiplier):
+        pass
+    return x, direction
+
+
+def _window(start, velocity, low, high, t0, t1):
+    """Sub-interval of [t0, t1] where low < start + velocity * (t - t0) < high, or None"""
+    if velocity == 0.0:
+        return (t0, t1) if low < start < high else None
+    a = t0 + (low - start) / velocity
+    b = t0 + (high - start) / velocity
+    if a > b:
+        a, b = b, a
+    a = max(a, t0)
+    b = min(b, t1)
+    return (a, b) if a <= b else None
+
+
+def first_contact(player, car, frames, speed_multiplier):
+    """
+    Earliest time (in frames, possibly fractional) at which car may overlap
+    the player during the next `frames` frames, or None.
+
+    The player is held still (no lane change) and the car follows its
+    closed-form path; both boxes are padded by SWEEP_MARGIN, so a None
+    guarantees that no frame in the interval ends in a collision, including
+    thin overlaps that a single large time step would jump over.
+    """
+    dy = scroll_per_frame(car.config, speed_multiplier)
+    y_low = player.y - car.height - SWEEP_MARGIN
+    y_high = player.y + player.height + SWEEP_MARGIN
+    y_span = _window(car.y, dy, y_low, y_high, 0, frames)
+    if y_span is None:
+        return None
+    x_low = player.x - car.width - SWEEP_MARGIN
+    x_high = player.x + player.width + SWEEP_MARGIN
+    for first, last, x_first, x_last, _ in x_pieces(car, frames, speed_multiplier):
+        if last < y_span[0]:
+            continue
+        if first > y_span[1]:
+            return None
+        x_span = _window(x_first, (x_last - x_first) / (last - first), x_low, x_high, first, last)
+        if x_span is not None:
+            start = max(x_span[0], y_span[0])
+            if start <= min(x_span[1], y_span[1]):
+                return start
+    return None
@@ -0,0 +1,268 @@
+"""
+Road Fighter - Pipelined PPO
+
+PPO whose next rollout is collected while the previous one is being trained
+on. A background thread steps the envs (their workers run in other
+processes) with a snapshot of the policy weights, while the learner runs its
+gradient epochs; the two only meet to swap rollout buffers.
+
+Rollout k+1 is therefore collected by the policy from before the update on
+rollout k. When it is trained on, the current policy first re-scores it:
+values and GAE come from the current critic, the PPO clip is centred on the
+current policy, and each advantage is weighted by the truncated importance
+ratio min(pi_current / pi_behaviour, lag_clip) of the action actually taken.
+
+Callbacks run on the collector thread while train() updates the policy, so
+they must read acting_policy (the behaviour copy then) rather than
+self.policy. The collector's step count and episode infos are kept aside
+and merged into num_timesteps and ep_info_buffer after it is joined, so
+callbacks see num_timesteps as of the start of an overlapped rollout.
+"""
+
+import copy
+import threading
+import time
+import numpy as np
+import torch as th
+from gymnasium import spaces
+from stable_baselines3.common.utils import obs_as_tensor
+from .env_pool import AsyncEnvPool
+from .pool_ppo import PoolPPO
+
+
+class PipelinedPPO(PoolPPO):
+    """
+    PoolPPO with an opt-in pipelined learn() (pipelined=True); by default
+    it learns exactly as PoolPPO.
+
+    lag_clip caps the importance weights of the lagged rollouts. Overlap
+    statistics accumulate in env_seconds (collection wall time),
+    learner_seconds (train() wall time) and overlap_seconds (time both ran at
+    once), and are logged under pipeline/ every iteration.
+    """
+
+    def __init__(self, *args, pipelined=False, lag_clip=1.0, **kwargs):
+        self.pipelined = pipelined
+        self.lag_clip = lag_clip
+        self.env_seconds = 0.0
+        self.learner_seconds = 0.0
+        self.overlap_seconds = 0.0
+        self._train_lock = threading.RLock()
+        self._behaviour = None
+        self._pending = None
+        super().__init__(*args, **kwargs)
+
+    def _excluded_save_params(self):
+        return super()._excluded_save_params() + ["_train_lock", "_behaviour", "_pending"]
+
+    @property
+    def acting_policy(self):
+        """The policy acting in the envs: the behaviour copy during pipelined learn()"""
+        return self.policy if self._behaviour is None else self._behaviour
+
+    def save(self, *args, **kwargs):
+        # Callbacks run on the collector thread: never save mid-update
+        # (re-entrant, so a signal handler on the learner thread can still save)
+        with self._train_lock:
+            super().save(*args, **kwargs)
+
+    def learn(self, total_timesteps, callback=None, log_interval=1, tb_log_name="PPO",
+              reset_num_timesteps=True, progress_bar=False):
+        if not self.pipelined:
+            return super().learn(total_timesteps, callback, log_interval, tb_log_name,
+                                 reset_num_timesteps, progress_bar)
+        total_timesteps, callback = self._setup_learn(
+            total_timesteps, callback, reset_num_timesteps, tb_log_name, progress_bar)
+        callback.on_training_start(locals(), globals())
+        assert self.env is not None
+
+        # 1. A behaviour copy of the policy for the collector, and a spare buffer
+        behaviour = self._behaviour = copy.deepcopy(self.policy)
+        spare = copy.deepcopy(self.rollout_buffer)
+        try:
+            self._learn_pipelined(total_timesteps, callback, log_interval, behaviour, spare)
+        finally:
+            self._behaviour = self._pending = None
+        callback.on_training_end()
+        return self
+
+    def _learn_pipelined(self, total_timesteps, callback, log_interval, behaviour, spare):
+        continue_training, (collect_start, collect_end) = self._collect_timed(
+            behaviour, self.rollout_buffer, callback)
+        self.env_seconds += collect_end - collect_start
+        iteration = 0
+        lagged = False
+
+        while continue_training:
+            iteration += 1
+            self._update_current_progress_remaining(self.num_timesteps, total_timesteps)
+
+            # 2. Start the next rollout with the weights from before this update;
+            #    its steps and episode infos are kept aside until it is joined
+            collector = None
+            if self.num_timesteps < total_timesteps:
+                behaviour.load_state_dict(self.policy.state_dict())
+                result = {}
+                self._pending = {'steps': 0, 'infos': []}
+
+                def collect(buffer=spare):
+                    try:
+                        result['value'] = self._collect_timed(behaviour, buffer, callback)
+                    except BaseException as error:
+                        result['error'] = error
+
+                collector = threading.Thread(target=collect, daemon=True)
+                collector.start()
+
+            # 3. Train on the finished rollout meanwhile
+            if lagged:
+                self._correct_lag(self.rollout_buffer)
+            with self._train_lock:
+                train_start = time.perf_counter()
+                self.train()
+                train_end = time.perf_counter()
+            self.learner_seconds += train_end - train_start
+
+            if collector is None:
+                if log_interval is not None and iteration % log_interval == 0:
+                    self._dump_logs(iteration)
+                break
+            collector.join()
+            pending, self._pending = self._pending, None
+            self.num_timesteps += pending['steps']
+            for infos, dones in pending['infos']:
+                super()._update_info_buffer(infos, dones)
+            if 'error' in result:
+                raise result['error']
+            continue_training, (collect_start, collect_end) = result['value']
+            self.env_seconds += collect_end - collect_start
+            self.overlap_seconds += max(0.0, min(collect_end, train_end) - max(collect_start, train_start))
+
+            # 4. Logs only once both are done (the collector appends episode infos)
+            if log_interval is not None and iteration % log_interval == 0:
+                self._dump_logs(iteration)
+            self.rollout_buffer, spare = spare, self.rollout_buffer
+            lagged = True
+
+    @property
+    def overlap_fraction(self):
+        """Share of learner time that env collection ran alongside"""
+        return self.overlap_seconds / self.learner_seconds if self.learner_seconds else 0.0
+
+    def _dump_logs(self, iteration):
+        if self.pipelined:
+            self.logger.record("pipeline/env_seconds", round(self.env_seconds, 2))
+            self.logger.record("pipeline/learner_seconds", round(self.learner_seconds, 2))
+            self.logger.record("pipeline/overlap_seconds", round(self.overlap_seconds, 2))
+            self.logger.record("pipeline/overlap_fraction", round(self.overlap_fraction, 3))
+        super()._dump_logs(iteration)
+
+    # ------------------------------------------------------------------
+    # Collection with the behaviour policy
+    # ------------------------------------------------------------------
+    def _collect_timed(self, policy, rollout_buffer, callback):
+        """Fill rollout_buffer acting with `policy`; returns (ok, (start, end))"""
+        start = time.perf_counter()
+        env = self.env
+        if isinstance(env, AsyncEnvPool) and env.batch_size < env.num_envs:
+            ok = self._collect_from_pool(env, callback, rollout_buffer, self.n_steps, policy)
+        else:
+            ok = self._collect_sync(env, callback, rollout_buffer, self.n_steps, policy)
+        # Where the rollout ended, for re-scoring it later
+        rollout_buffer.last_obs = self._last_obs.copy()
+        rollout_buffer.last_episode_starts = self._last_episode_starts.copy()
+        return ok, (start, time.perf_counter())
+
+    def _count_steps(self, n):
+        if self._pending is None:
+            self.num_timesteps += n
+        else:
+            self._pending['steps'] += n
+
+    def _update_info_buffer(self, infos, dones=None):
+        if self._pending is None:
+            super()._update_info_buffer(infos, dones)
+        else:
+            self._pending['infos'].append((infos, dones))
+
+    def _collect_sync(self, env, callback, rollout_buffer, n_rollout_steps, policy):
+        """SB3's collect_rollouts for a synchronous VecEnv, acting with `policy`"""
+        assert self._last_obs is not None, "No previous observation was provided"
+        assert isinstance(self.action_space, spaces.Discrete), "Road Fighter uses Discrete actions"
+        policy.set_training_mode(False)
+        n_steps = 0
+        rollout_buffer.reset()
+        callback.on_rollout_start()
+
+        while n_steps < n_rollout_steps:
+            with th.no_grad():
+                obs_tensor = obs_as_tensor(self._last_obs, self.device)
+                actions, values, log_probs = policy(obs_tensor)
+            actions = actions.cpu().numpy()
+            new_obs, rewards, dones, infos = env.step(actions)
+            self._count_steps(env.num_envs)
+
+            # Give access to local variables
+            callback.update_locals(locals())
+            if not callback.on_step():
+                return False
+            self._update_info_buffer(infos, dones)
+            n_steps += 1
+
+            # Handle timeout by bootstraping with value function (as PPO does)
+            for idx, done in enumerate(dones):
+                if (
+                    done
+                    and infos[idx].get("terminal_observation") is not None
+                    and infos[idx].get("TimeLimit.truncated", False)
+                ):
+                    terminal_obs = policy.obs_to_tensor(infos[idx]["terminal_observation"])[0]
+                    with th.no_grad():
+                        terminal_value = policy.predict_values(terminal_obs)[0]
+                    rewards[idx] += self.gamma * terminal_value
+
+            rollout_buffer.add(self._last_obs, actions.reshape(-1, 1), rewards,
+                               self._last_episode_starts, values, log_probs)
+            self._last_obs = new_obs
+            self._last_episode_starts = dones
+
+        with th.no_grad():
+            # Compute value for the last timestep
+            values = policy.predict_values(obs_as_tensor(new_obs, self.device))
+        rollout_buffer.compute_returns_and_advantage(last_values=values, dones=dones)
+
+        callback.update_locals(locals())
+        callback.on_rollout_end()
+        return True
+
+    # ------------------------------------------------------------------
+    # Lag correction
+    # ------------------------------------------------------------------
+    def _correct_lag(self, rollout_buffer):
+        """
+        Re-score a rollout collected by the previous policy with the current
+        one, before train() consumes it.
+        """
+        shape = rollout_buffer.log_probs.shape
+        self.policy.set_training_mode(False)
+        with th.no_grad():
+            obs = obs_as_tensor(rollout_buffer.observations.reshape(-1, *self.observation_space.shape),
+                                self.device)
+            actions = th.as_tensor(rollout_buffer.actions.reshape(-1), device=self.device).long()
+            values, log_probs, _ = self.policy.evaluate_actions(obs, actions)
+            last_values = self.policy.predict_values(obs_as_tensor(rollout_buffer.last_obs, self.device))
+        log_probs = log_probs.cpu().numpy().reshape(shape)
+
+        # 1. Truncated importance weights of the taken actions
+        weights = np.minimum(np.exp(log_probs - rollout_buffer.log_probs), self.lag_clip)
+
+        # 2. Current critic's values and GAE, clip centred on the current policy
+        rollout_buffer.values = values.cpu().numpy().reshape(shape)
+        rollout_buffer.log_probs = log_probs
+        rollout_buffer.compute_returns_and_advantage(last_values=last_values,
+                                                     dones=rollout_buffer.last_episode_starts)
+        rollout_buffer.advantages *= weights
+
+        self.logger.record("pipeline/lag_weight_mean", float(weights.mean()))
+        self.logger.record("pipeline/lag_weight_clipped", float((weights >= self.lag_clip).mean()))
+        return weights
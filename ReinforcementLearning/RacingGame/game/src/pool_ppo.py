@@ -0,0 +1,123 @@
+"""
+Road Fighter - PPO over an Async Env Pool
+
+PPO whose rollout collection consumes AsyncEnvPool batches: every recv()
+completes the transitions of whichever races finished first, and those races
+are sent their next actions straight away, while slower ones keep stepping.
+"""
+
+import numpy as np
+import torch as th
+from gymnasium import spaces
+from stable_baselines3 import PPO
+from stable_baselines3.common.utils import obs_as_tensor
+from .env_pool import AsyncEnvPool
+
+
+class PoolPPO(PPO):
+    """
+    PPO that collects rollouts through AsyncEnvPool.send/recv.
+
+    The rollout buffer keeps one column per race, as with a synchronous
+    VecEnv: each race fills its own column with n_steps consecutive
+    transitions at its own pace, so GAE sees unbroken trajectories. Only the
+    end of a rollout waits for the slowest race. With any other env (or a
+    pool whose batch_size covers every race) this is plain PPO.
+    """
+
+    def collect_rollouts(self, env, callback, rollout_buffer, n_rollout_steps):
+        if not isinstance(env, AsyncEnvPool) or env.batch_size >= env.num_envs:
+            return super().collect_rollouts(env, callback, rollout_buffer, n_rollout_steps)
+        return self._collect_from_pool(env, callback, rollout_buffer, n_rollout_steps, self.policy)
+
+    def _count_steps(self, n):
+        """Add n collected transitions to num_timesteps"""
+        self.num_timesteps += n
+
+    def _collect_from_pool(self, env, callback, rollout_buffer, n_rollout_steps, policy):
+        """collect_rollouts through send/recv, acting with `policy`"""
+        assert self._last_obs is not None, "No previous observation was provided"
+        assert isinstance(self.action_space, spaces.Discrete), "AsyncEnvPool races use Discrete actions"
+        policy.set_training_mode(False)
+        rollout_buffer.reset()
+        callback.on_rollout_start()
+
+        # 1. The step each race is running: its action, value and log-prob
+        num_envs = env.num_envs
+        filled = np.zeros(num_envs, dtype=np.int64)
+        sent_actions = np.zeros(num_envs, dtype=np.int64)
+        sent_values = np.zeros(num_envs, dtype=np.float32)
+        sent_log_probs = np.zeros(num_envs, dtype=np.float32)
+
+        def act(env_ids):
+            with th.no_grad():
+                obs_tensor = obs_as_tensor(self._last_obs[env_ids], self.device)
+                actions, values, log_probs = policy(obs_tensor)
+            sent_actions[env_ids] = actions.cpu().numpy()
+            sent_values[env_ids] = values.cpu().numpy().flatten()
+            sent_log_probs[env_ids] = log_probs.cpu().numpy()
+            env.send(sent_actions[env_ids], env_ids)
+
+        act(np.arange(num_envs))
+        while True:
+            # 2. Next races to finish (none left in flight: every column is full)
+            new_obs, rewards, dones, infos, env_ids = env.recv()
+            if len(env_ids) == 0:
+                break
+            self._count_steps(len(env_ids))
+
+            # Give access to local variables
+            callback.update_locals(locals())
+            if not callback.on_step():
+                # Stop with no race mid-step, so a later learn() can resume
+                self._last_obs[env_ids] = new_obs
+                self._last_episode_starts[env_ids] = dones
+                new_obs, _, dones, _, env_ids = env.recv(num_envs)
+                self._last_obs[env_ids] = new_obs
+                self._last_episode_starts[env_ids] = dones
+                return False
+            self._update_info_buffer(infos, dones)
+
+            # Handle timeout by bootstraping with value function (as PPO does)
+            for row, done in enumerate(dones):
+                if (
+                    done
+                    and infos[row].get("terminal_observation") is not None
+                    and infos[row].get("TimeLimit.truncated", False)
+                ):
+                    terminal_obs = policy.obs_to_tensor(infos[row]["terminal_observation"])[0]
+                    with th.no_grad():
+                        terminal_value = policy.predict_values(terminal_obs)[0]
+                    rewards[row] += self.gamma * terminal_value
+
+            # 3. Complete their transitions, each in its race's column
+            steps = filled[env_ids]
+            rollout_buffer.observations[steps, env_ids] = self._last_obs[env_ids]
+            rollout_buffer.actions[steps, env_ids, 0] = sent_actions[env_ids]
+            rollout_buffer.rewards[steps, env_ids] = rewards
+            rollout_buffer.episode_starts[steps, env_ids] = self._last_episode_starts[env_ids]
+            rollout_buffer.values[steps, env_ids] = sent_values[env_ids]
+            rollout_buffer.log_probs[steps, env_ids] = sent_log_probs[env_ids]
+            filled[env_ids] += 1
+            self._last_obs[env_ids] = new_obs
+            self._last_episode_starts[env_ids] = dones
+
+            # 4. Send them on right away unless their column is full
+            more = env_ids[filled[env_ids] < n_rollout_steps]
+            if len(more):
+                act(more)
+
+        rollout_buffer.pos = rollout_buffer.buffer_size
+        rollout_buffer.full = True
+
+        with th.no_grad():
+            # Compute value for the last timestep
+            values = policy.predict_values(obs_as_tensor(self._last_obs, self.device))
+
+        rollout_buffer.compute_returns_and_advantage(last_values=values, dones=self._last_episode_starts)
+
+        callback.update_locals(locals())
+
+        callback.on_rollout_end()
+
+        return True
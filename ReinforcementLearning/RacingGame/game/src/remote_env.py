@@ -0,0 +1,377 @@
+"""
+Road Fighter - Remote Env Server and Client
+
+EnvServer hosts a batch of RacingGameEnv races (stepped by a
+SharedMemoryVecEnv, so on all of the host's cores) behind a TCP or Unix
+socket. RemoteVecEnv is an SB3 VecEnv that aggregates any number of servers,
+so rollout collection can spread over several machines.
+
+Addresses are "host:port" (TCP) or "unix:/path/to.sock".
+
+Wire format: every frame is HEADER (command, payload bytes) + payload, all
+little-endian with fixed layouts:
+
+    HELLO   ->  -                       <-  num_envs u32, obs_size u32
+    RESET   ->  seeds i64[n] (-1: none) <-  obs f32[n, 32]
+    STEP    ->  actions u8[n]           <-  obs f32[n, 32], rewards f32[n], dones u8[n],
+                                            count u32, EPISODE_RECORD[count]
+    CALL    ->  JSON {kind, name, args, kwargs, indices}  <-  JSON result
+    CLOSE   ->  -                       (client leaves, the server waits for the next one)
+    SHUTDOWN -> -                       (server exits)
+
+Any request may be answered with ERROR + a UTF-8 traceback. CALL only
+reaches the attributes and methods listed in REMOTE_GET_ATTRS,
+REMOTE_SET_ATTRS and REMOTE_METHODS. The protocol has no authentication:
+bind servers to loopback, a Unix socket or a trusted network only.
+"""
+
+import json
+import os
+import socket
+import struct
+import time
+import traceback
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.vec_env.base_vec_env import VecEnv
+from .observation import OBS_SIZE
+from .shm_vec_env import SharedMemoryVecEnv
+from .shm_worker import NUM_STATS, stats_info, info_stats
+
+CMD_HELLO, CMD_RESET, CMD_STEP, CMD_CALL, CMD_CLOSE, CMD_SHUTDOWN, CMD_ERROR = range(7)
+
+HEADER = struct.Struct('<BxxxI')
+HELLO = struct.Struct('<II')
+COUNT = struct.Struct('<I')
+SEED_NONE = -1
+
+# What a CALL may touch: the attributes SB3 reads (render_mode, spec,
+# metadata), the env settings a trainer adjusts, and render
+REMOTE_GET_ATTRS = frozenset({'render_mode', 'spec', 'metadata', 'frame_skip'})
+REMOTE_SET_ATTRS = frozenset({'frame_skip'})
+REMOTE_METHODS = frozenset({'render'})
+
+# One finished race in a STEP reply
+EPISODE_RECORD = np.dtype([
+    ('index', '<u4'),
+    ('stats', '<f8', (NUM_STATS,)),
+    ('terminal_obs', '<f4', (OBS_SIZE,)),
+])
+
+
+# ----------------------------------------------------------------------
+# Framing
+# ----------------------------------------------------------------------
+def _parse(address):
+    """(family, sockaddr) of a 'host:port' or 'unix:/path' address"""
+    if address.startswith('unix:'):
+        return socket.AF_UNIX, address[len('unix:'):]
+    host, _, port = address.rpartition(':')
+    return socket.AF_INET, (host or '127.0.0.1', int(port))
+
+
+def _connect(address):
+    family, sockaddr = _parse(address)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.connect(sockaddr)
+    if family == socket.AF_INET:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+
+def _send(sock, command, *parts):
+    payload = b''.join(bytes(part) for part in parts)
+    sock.sendall(HEADER.pack(command, len(payload)) + payload)
+
+
+def _recv_exact(sock, size):
+    buf = bytearray(size)
+    view = memoryview(buf)
+    got = 0
+    while got < size:
+        n = sock.recv_into(view[got:])
+        if n == 0:
+            raise ConnectionError("remote env connection closed")
+        got += n
+    return buf
+
+
+def _recv(sock):
+    """(command, payload) of the next frame"""
+    command, size = HEADER.unpack(_recv_exact(sock, HEADER.size))
+    return command, _recv_exact(sock, size)
+
+
+def _json_default(value):
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return repr(value)
+
+
+# ----------------------------------------------------------------------
+# Server
+# ----------------------------------------------------------------------
+class EnvServer:
+    """
+    Serves num_envs races to one RemoteVecEnv client at a time.
+
+    num_workers and env_kwargs go to the SharedMemoryVecEnv that steps the
+    races. Bind to port 0 to get a free port (see .address).
+    """
+
+    def __init__(self, address, num_envs, num_workers=None, env_kwargs=None):
+        family, sockaddr = _parse(address)
+        if family == socket.AF_UNIX and os.path.exists(sockaddr):
+            os.unlink(sockaddr)
+        self._listener = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind(sockaddr)
+        self._listener.listen(1)
+        if family == socket.AF_INET:
+            host, port = self._listener.getsockname()[:2]
+            self.address = f"{host}:{port}"
+        else:
+            self.address = address
+        self.num_envs = num_envs
+        self.env = SharedMemoryVecEnv(num_envs, num_workers=num_workers, env_kwargs=env_kwargs)
+        self._running = True
+
+    def serve_forever(self):
+        """Serve clients one after another until SHUTDOWN"""
+        try:
+            while self._running:
+                try:
+                    conn, _ = self._listener.accept()
+                except OSError:
+                    if not self._running:
+                        break
+                    raise
+                with conn:
+                    if conn.family == socket.AF_INET:
+                        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                    self._serve_client(conn)
+        finally:
+            self.close()
+
+    def _serve_client(self, conn):
+        while True:
+            try:
+                command, payload = _recv(conn)
+            except ConnectionError:
+                return
+            try:
+                if command == CMD_STEP:
+                    self._step(conn, payload)
+                elif command == CMD_RESET:
+                    seeds = np.frombuffer(payload, dtype='<i8')
+                    self.env._seeds = [None if seed == SEED_NONE else int(seed) for seed in seeds]
+                    _send(conn, CMD_RESET, self.env.reset().astype('<f4'))
+                elif command == CMD_HELLO:
+                    _send(conn, CMD_HELLO, HELLO.pack(self.num_envs, OBS_SIZE))
+                elif command == CMD_CALL:
+                    request = json.loads(bytes(payload))
+                    result = self._call(**request)
+                    _send(conn, CMD_CALL, json.dumps(result, default=_json_default).encode())
+                elif command == CMD_CLOSE:
+                    return
+                elif command == CMD_SHUTDOWN:
+                    self._running = False
+                    return
+                else:
+                    raise ValueError(f"unknown command {command}")
+            except Exception:
+                _send(conn, CMD_ERROR, traceback.format_exc().encode())
+
+    def _step(self, conn, payload):
+        actions = np.frombuffer(payload, dtype=np.uint8).astype(np.int64)
+        obs, rewards, dones, infos = self.env.step(actions)
+        finished = np.flatnonzero(dones)
+        records = np.zeros(len(finished), dtype=EPISODE_RECORD)
+        for row, i in enumerate(finished):
+            info = infos[i]
+            episode = info['episode']
+            records[row] = (i, info_stats(info, episode['r'], episode['l']), info['terminal_observation'])
+        _send(conn, CMD_STEP, obs.astype('<f4'), rewards.astype('<f4'), dones.astype(np.uint8),
+              COUNT.pack(len(finished)), records)
+
+    def _call(self, kind, name, args, kwargs, indices):
+        allowed = {'get': REMOTE_GET_ATTRS, 'set': REMOTE_SET_ATTRS, 'method': REMOTE_METHODS}.get(kind, ())
+        if name not in allowed:
+            raise PermissionError(f"remote {kind} of {name!r} is not allowed")
+        if kind == 'get':
+            return self.env.get_attr(name, indices)
+        if kind == 'set':
+            return self.env.set_attr(name, args, indices)
+        return self.env.env_method(name, *args, indices=indices, **kwargs)
+
+    def close(self):
+        self._running = False
+        self._listener.close()
+        self.env.close()
+
+
+def serve(address, num_envs, num_workers=None, env_kwargs=None):
+    """Run an EnvServer until a client sends SHUTDOWN"""
+    server = EnvServer(address, num_envs, num_workers=num_workers, env_kwargs=env_kwargs)
+    print(f"🛰️  Serving {num_envs} races on {server.address}")
+    server.serve_forever()
+
+
+# ----------------------------------------------------------------------
+# Client
+# ----------------------------------------------------------------------
+class RemoteVecEnv(VecEnv):
+    """
+    SB3 VecEnv over one or more EnvServers, races in address order.
+
+    step_async sends every server its actions before any reply is read, so
+    the servers step concurrently. Every server's reply is read before an
+    ERROR from any of them is raised, so the connections stay in step for
+    the next request. Finished races report the same info as
+    SharedMemoryVecEnv ('episode', 'terminal_observation', engine keys).
+    Reset options are not sent over the wire.
+    """
+
+    def __init__(self, addresses):
+        if isinstance(addresses, str):
+            addresses = [addresses]
+        self._socks = []
+        self._slices = []
+        start = 0
+        for address in addresses:
+            sock = _connect(address)
+            _send(sock, CMD_HELLO)
+            num_envs, obs_size = HELLO.unpack(self._reply(sock, CMD_HELLO))
+            if obs_size != OBS_SIZE:
+                raise ValueError(f"{address} serves {obs_size}-feature observations, expected {OBS_SIZE}")
+            self._socks.append(sock)
+            self._slices.append((start, start + num_envs))
+            start += num_envs
+        self.closed = False
+        self._t_start = time.time()
+
+        observation_space = spaces.Box(low=-3.0, high=3.0, shape=(OBS_SIZE,), dtype=np.float32)
+        action_space = spaces.Discrete(4)
+        super().__init__(start, observation_space, action_space)
+
+    def _reply(self, sock, command):
+        reply, payload = _recv(sock)
+        if reply == CMD_ERROR:
+            raise RuntimeError(f"Remote env server failed:\n{bytes(payload).decode()}")
+        if reply != command:
+            raise RuntimeError(f"Remote env server answered {reply} to {command}")
+        return payload
+
+    def _replies(self, socks, command):
+        """Payload of every sock's reply; raises the first error once all were read"""
+        payloads = []
+        error = None
+        for sock in socks:
+            try:
+                payloads.append(self._reply(sock, command))
+            except (RuntimeError, OSError) as exc:
+                payloads.append(None)
+                if error is None:
+                    error = exc
+        if error is not None:
+            raise error
+        return payloads
+
+    # ------------------------------------------------------------------
+    # VecEnv interface
+    # ------------------------------------------------------------------
+    def reset(self):
+        if any(self._options):
+            raise ValueError("RemoteVecEnv does not send reset options")
+        seeds = np.array([SEED_NONE if seed is None else seed for seed in self._seeds], dtype='<i8')
+        for sock, (start, stop) in zip(self._socks, self._slices):
+            _send(sock, CMD_RESET, seeds[start:stop])
+        obs = np.concatenate([
+            np.frombuffer(payload, dtype='<f4').reshape(-1, OBS_SIZE)
+            for payload in self._replies(self._socks, CMD_RESET)
+        ])
+        self._reset_seeds()
+        self._reset_options()
+        return obs
+
+    def step_async(self, actions):
+        actions = np.asarray(actions).reshape(self.num_envs).astype(np.uint8)
+        for sock, (start, stop) in zip(self._socks, self._slices):
+            _send(sock, CMD_STEP, actions[start:stop])
+
+    def step_wait(self):
+        obs = np.empty((self.num_envs, OBS_SIZE), dtype=np.float32)
+        rewards = np.empty(self.num_envs, dtype=np.float32)
+        dones = np.empty(self.num_envs, dtype=bool)
+        infos = [{} for _ in range(self.num_envs)]
+        elapsed = time.time() - self._t_start
+        payloads = self._replies(self._socks, CMD_STEP)
+        for payload, (start, stop) in zip(payloads, self._slices):
+            n = stop - start
+            offset = 0
+            obs[start:stop] = np.frombuffer(payload, dtype='<f4', count=n * OBS_SIZE).reshape(n, OBS_SIZE)
+            offset += 4 * n * OBS_SIZE
+            rewards[start:stop] = np.frombuffer(payload, dtype='<f4', count=n, offset=offset)
+            offset += 4 * n
+            dones[start:stop] = np.frombuffer(payload, dtype=np.uint8, count=n, offset=offset)
+            offset += n
+            (count,) = COUNT.unpack_from(payload, offset)
+            offset += COUNT.size
+            records = np.frombuffer(payload, dtype=EPISODE_RECORD, count=count, offset=offset)
+            for record in records:
+                info = stats_info(record['stats'], elapsed)
+                info['terminal_observation'] = record['terminal_obs'].astype(np.float32)
+                infos[start + int(record['index'])] = info
+        return obs, rewards, dones, infos
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for sock in self._socks:
+            try:
+                _send(sock, CMD_CLOSE)
+            except OSError:
+                pass
+            sock.close()
+
+    def shutdown_servers(self):
+        """Stop every server (they otherwise wait for the next client)"""
+        for sock in self._socks:
+            _send(sock, CMD_SHUTDOWN)
+            sock.close()
+        self.closed = True
+
+    def get_attr(self, attr_name, indices=None):
+        return self._call('get', attr_name, None, None, indices)
+
+    def set_attr(self, attr_name, value, indices=None):
+        self._call('set', attr_name, value, None, indices)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        return self._call('method', method_name, list(method_args), method_kwargs, indices)
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        # Servers hold bare RacingGameEnv instances
+        return [False for _ in self._get_indices(indices)]
+
+    def _call(self, kind, name, args, kwargs, indices):
+        """get/set/method call on the selected races, answered as JSON by their servers"""
+        indices = list(self._get_indices(indices))
+        socks, targets = [], []
+        for sock, (start, stop) in zip(self._socks, self._slices):
+            local = [i - start for i in indices if start <= i < stop]
+            if not local:
+                continue
+            request = {'kind': kind, 'name': name, 'args': args, 'kwargs': kwargs, 'indices': local}
+            _send(sock, CMD_CALL, json.dumps(request, default=_json_default).encode())
+            socks.append(sock)
+            targets.append([start + j for j in local])
+        payloads = self._replies(socks, CMD_CALL)
+        if kind == 'set':
+            return None
+        results = {}
+        for payload, races in zip(payloads, targets):
+            results.update(zip(races, json.loads(bytes(payload))))
+        return [results[i] for i in indices]
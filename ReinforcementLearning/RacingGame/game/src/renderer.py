@@ -45,20 +45,25 @@ class GameRenderer:
             self.player_img = None
             self.opponent_imgs = None
 
-    def render(self, core_game):
-        """Draw the current state of the CoreGame"""
+    def render(self, core_game, fps=60):
+        """
+        Draw the current state of the CoreGame, at most fps times a second
+        (None: uncapped). The road comes from core_game.config.
+        """
+        config = core_game.config
+        
         # Clear screen
         self.screen.fill(COLOR_GRASS)
         
         # Draw road
         pygame.draw.rect(self.screen, COLOR_ROAD,
-                        (ROAD_LEFT_EDGE, 0, ROAD_WIDTH, SCREEN_HEIGHT))
+                        (config.road_left_edge, 0, config.road_width, SCREEN_HEIGHT))
         
         # Draw road edges
         pygame.draw.line(self.screen, COLOR_ROAD_EDGE,
-                        (ROAD_LEFT_EDGE, 0), (ROAD_LEFT_EDGE, SCREEN_HEIGHT), 3)
+                        (config.road_left_edge, 0), (config.road_left_edge, SCREEN_HEIGHT), 3)
         pygame.draw.line(self.screen, COLOR_ROAD_EDGE,
-                        (ROAD_RIGHT_EDGE, 0), (ROAD_RIGHT_EDGE, SCREEN_HEIGHT), 3)
+                        (config.road_right_edge, 0), (config.road_right_edge, SCREEN_HEIGHT), 3)
         
         # Draw lane markers
         self._draw_lane_markers(core_game)
@@ -78,7 +83,10 @@ class GameRenderer:
         pygame.display.flip()
         
         # Cap frame rate
-        self.clock.tick(60)
+        if fps:
+            self.clock.tick(fps)
+        else:
+            self.clock.tick()
 
     def _draw_car(self, entity, is_player):
         # Note: entity.x/y are top-left coordinates (defined in entities.py)
@@ -95,22 +103,23 @@ class GameRenderer:
                 # Use the entity's own color if available, otherwise fallback
                 color = getattr(entity, 'color', COLOR_OPPONENT)
                 
+            width, height = entity.width, entity.height
             pygame.draw.rect(self.screen, color, 
-                           (entity.x, entity.y, CAR_WIDTH, CAR_HEIGHT))
+                           (entity.x, entity.y, width, height))
                            
             # Draw simple details to distinguish front/back
             # Windshield (light blue)
             pygame.draw.rect(self.screen, (150, 200, 255),
-                           (entity.x + 5, entity.y + 5, CAR_WIDTH - 10, CAR_HEIGHT // 4))
+                           (entity.x + 5, entity.y + 5, width - 10, height // 4))
                            
             # Wheels (black)
             wheel_w, wheel_h = 6, 14
             wheel_color = (0, 0, 0)
             # FL, FR, RL, RR
             pygame.draw.rect(self.screen, wheel_color, (entity.x - 2, entity.y + 10, wheel_w, wheel_h))
-            pygame.draw.rect(self.screen, wheel_color, (entity.x + CAR_WIDTH - 4, entity.y + 10, wheel_w, wheel_h))
-            pygame.draw.rect(self.screen, wheel_color, (entity.x - 2, entity.y + CAR_HEIGHT - 24, wheel_w, wheel_h))
-            pygame.draw.rect(self.screen, wheel_color, (entity.x + CAR_WIDTH - 4, entity.y + CAR_HEIGHT - 24, wheel_w, wheel_h))
+            pygame.draw.rect(self.screen, wheel_color, (entity.x + width - 4, entity.y + 10, wheel_w, wheel_h))
+            pygame.draw.rect(self.screen, wheel_color, (entity.x - 2, entity.y + height - 24, wheel_w, wheel_h))
+            pygame.draw.rect(self.screen, wheel_color, (entity.x + width - 4, entity.y + height - 24, wheel_w, wheel_h))
 
             # Draw Blinkers (for Red/Yellow opponents)
             if not is_player and hasattr(entity, 'car_type') and entity.car_type in ['yellow', 'red']:
@@ -122,34 +131,35 @@ class GameRenderer:
                         # Yellow cars -> Red blinkers, Red cars -> Yellow blinkers
                         blinker_color = (255, 0, 0) if entity.car_type == 'yellow' else (255, 255, 0)
                         blinker_size = 6
-                        back_y = int(entity.y) + CAR_HEIGHT - 10
+                        back_y = int(entity.y) + height - 10
                         
                         if entity.movement_direction < 0: # Moving Left
                              pygame.draw.circle(self.screen, blinker_color,
                                               (int(entity.x) + 10, back_y), blinker_size)
                         elif entity.movement_direction > 0: # Moving Right
                              pygame.draw.circle(self.screen, blinker_color,
-                                              (int(entity.x) + CAR_WIDTH - 10, back_y), blinker_size)
+                                              (int(entity.x) + width - 10, back_y), blinker_size)
 
     def _draw_lane_markers(self, core_game):
         # Determine speed for marker animation
+        config = core_game.config
         player_speed = core_game.player.velocity_y if core_game.player else 0
-        speed_factor = player_speed / PLAYER_MAX_SPEED
+        speed_factor = player_speed / config.player_max_speed
         
         # Update offset based on speed
         self.lane_marker_offset += (5 + 15 * speed_factor)
         if self.lane_marker_offset >= 40:
             self.lane_marker_offset = 0
             
-        for i in range(1, NUM_LANES):
-            x = ROAD_LEFT_EDGE + i * LANE_WIDTH
+        for x in config.lane_starts[1:]:
             for y in range(int(-40 + self.lane_marker_offset), SCREEN_HEIGHT, 40):
                 pygame.draw.line(self.screen, COLOR_LANE_MARKER, (x, y), (x, y + 20), 2)
 
     def _draw_hud(self, core_game):
         # HUD Area (Right side)
-        hud_x = ROAD_RIGHT_EDGE + 20
-        hud_width = SCREEN_WIDTH - ROAD_RIGHT_EDGE - 40
+        config = core_game.config
+        hud_x = config.road_right_edge + 20
+        hud_width = SCREEN_WIDTH - config.road_right_edge - 40
         
         # Draw HUD Background Panel
         panel_rect = pygame.Rect(hud_x, 20, hud_width, SCREEN_HEIGHT - 40)
@@ -182,7 +192,7 @@ class GameRenderer:
         
         # Distance (Current / Total (Percentage%))
         dist_current = int(core_game.distance_traveled)
-        dist_total = TARGET_DISTANCE
+        dist_total = config.target_distance
         percent = min(100, int((dist_current / dist_total) * 100))
         # Removed size=24 to use default size
         self._draw_text(f"DISTANCE: {dist_current}/{dist_total}m ({percent}%)", COLOR_TEXT, hud_x + 20, y)
@@ -231,6 +241,11 @@ class GameRenderer:
         self.screen.blit(bg_surface, bg_rect)
         self.screen.blit(surface, (x, y))
 
+    def close(self):
+        """Shut down pygame (window, mixer, fonts)"""
+        if pygame.get_init():
+            pygame.quit()
+
     def _draw_center_text(self, text, color, y_offset=0, size=72):
         font_large = pygame.font.Font(None, size)
         surface = font_large.render(text, True, color)
@@ -0,0 +1,172 @@
+"""
+Road Fighter - CPU Resource Plan
+
+Splits the machine's cores between the env worker processes and the torch
+learner, so neither oversubscribes the other: which cores each may run on
+(CPU affinity) and how many torch threads the learner uses in each phase.
+
+Without pipelining the phases alternate: env workers are idle while the
+learner trains, so the learner may use every core for its update and a
+single thread for the small forward passes of a rollout, while the workers
+keep off the core the learner collects on. With pipelining both run at once
+and get disjoint cores.
+"""
+
+import os
+import time
+from dataclasses import dataclass, field
+import torch
+from stable_baselines3.common.callbacks import BaseCallback
+
+
+def available_cpus():
+    """Cores this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+@dataclass
+class ResourcePlan:
+    """
+    Core and thread layout for one training run.
+
+    worker_cpus lists, per local env worker process, the cores it may run
+    on. train_threads / collect_threads are the learner's torch threads
+    during updates and during rollouts.
+    """
+
+    cpus: list
+    learner_cpus: list
+    worker_cpus: list = field(default_factory=list)
+    train_threads: int = 1
+    collect_threads: int = 1
+    pipelined: bool = False
+
+    def describe(self):
+        worker_cores = sorted({cpu for cpus in self.worker_cpus for cpu in cpus})
+        workers = (f"{len(self.worker_cpus)} env workers on cores {_ranges(worker_cores)}"
+                   if self.worker_cpus else "no local env workers")
+        return (f"{len(self.cpus)} cores: learner on {_ranges(self.learner_cpus)} "
+                f"({self.train_threads} train / {self.collect_threads} rollout threads), {workers}")
+
+
+def _ranges(cpus):
+    """[0, 1, 2, 5] -> '0-2,5'"""
+    spans = []
+    for cpu in cpus:
+        if spans and cpu == spans[-1][1] + 1:
+            spans[-1][1] = cpu
+        else:
+            spans.append([cpu, cpu])
+    return ",".join(str(a) if a == b else f"{a}-{b}" for a, b in spans)
+
+
+def plan_resources(num_workers=0, pipelined=False, learner_threads=None, cpus=None):
+    """
+    Plan for num_workers local env worker processes (0 for in-process or
+    remote envs) on cpus (default: the cores this process may use).
+    learner_threads overrides the learner's update thread count.
+    """
+    cpus = sorted(available_cpus() if cpus is None else cpus)
+    n = len(cpus)
+
+    # 1. Learner cores: everything, or what the workers leave when both run at once
+    if pipelined and num_workers and n > 1:
+        learner_count = max(1, n - num_workers)
+        learner_cpus = cpus[n - learner_count:]
+        env_cpus = cpus[:n - learner_count]
+    else:
+        learner_cpus = list(cpus)
+        # Keep the workers off the core the learner collects on
+        env_cpus = cpus[1:] if n > 1 else list(cpus)
+
+    # 2. Workers round-robin over their cores, one core each
+    worker_cpus = [[env_cpus[w % len(env_cpus)]] for w in range(num_workers)]
+
+    # 3. Torch threads: a pipelined learner leaves a core to the collector thread
+    if learner_threads:
+        train_threads = learner_threads
+    elif pipelined:
+        train_threads = max(1, len(learner_cpus) - 1)
+    else:
+        train_threads = len(learner_cpus)
+    return ResourcePlan(cpus=cpus, learner_cpus=learner_cpus, worker_cpus=worker_cpus,
+                        train_threads=train_threads, collect_threads=1, pipelined=pipelined)
+
+
+def _pin_threads(cpus):
+    """
+    Pin every thread of this process to cpus. sched_setaffinity(0) only pins
+    the calling thread, so each thread listed in /proc/self/task is pinned
+    (where there is no /proc, only the calling thread). Threads started
+    later inherit the affinity of the thread that starts them.
+    """
+    try:
+        tids = [int(tid) for tid in os.listdir("/proc/self/task")]
+    except OSError:
+        tids = [0]
+    for tid in tids:
+        try:
+            os.sched_setaffinity(tid, cpus)
+        except ProcessLookupError:
+            pass  # The thread exited meanwhile
+
+
+def apply_plan(plan, env=None):
+    """
+    Pin every thread of this process (torch's pools, data loaders and
+    collector threads already running included) to the learner cores, set
+    its torch threads and pin the worker processes of env (a
+    SharedMemoryVecEnv or AsyncEnvPool). Returns False where CPU affinity is
+    unsupported (threads are still set).
+    """
+    torch.set_num_threads(plan.train_threads)
+    if not hasattr(os, "sched_setaffinity"):
+        return False
+    _pin_threads(plan.learner_cpus)
+    for pid, cpus in zip(getattr(env, "worker_pids", []), plan.worker_cpus):
+        os.sched_setaffinity(pid, cpus)
+    return True
+
+
+class ResourcePlanCallback(BaseCallback):
+    """
+    Switches the learner's torch threads between rollout and update (unless
+    pipelined, when both run at once) and logs the layout with measured
+    rollout and update seconds under resources/ (PipelinedPPO logs its own
+    update time as pipeline/learner_seconds).
+    """
+
+    def __init__(self, plan, verbose=0):
+        super().__init__(verbose)
+        self.plan = plan
+        self.rollout_seconds = 0.0
+        self.update_seconds = 0.0
+        self._rollout_start = None
+        self._rollout_end = None
+
+    def _on_training_start(self):
+        self.logger.record("resources/layout", self.plan.describe(), exclude="tensorboard")
+        self.logger.record("resources/learner_cores", len(self.plan.learner_cpus))
+        self.logger.record("resources/worker_processes", len(self.plan.worker_cpus))
+        self.logger.record("resources/train_threads", self.plan.train_threads)
+
+    def _on_rollout_start(self):
+        now = time.perf_counter()
+        if self._rollout_end is not None and not self.plan.pipelined:
+            self.update_seconds = now - self._rollout_end
+            self.logger.record("resources/update_seconds", round(self.update_seconds, 3))
+        if not self.plan.pipelined:
+            torch.set_num_threads(self.plan.collect_threads)
+        self._rollout_start = now
+
+    def _on_rollout_end(self):
+        self._rollout_end = time.perf_counter()
+        self.rollout_seconds = self._rollout_end - self._rollout_start
+        self.logger.record("resources/rollout_seconds", round(self.rollout_seconds, 3))
+        if not self.plan.pipelined:
+            torch.set_num_threads(self.plan.train_threads)
+
+    def _on_step(self):
+        return True
@@ -0,0 +1,74 @@
+"""
+Road Fighter - Random Numbers
+"""
+
+import numpy as np
+
+# Uniforms pulled from the generator per refill
+RNG_BLOCK_SIZE = 256
+
+
+class BlockRandom:
+    """
+    Per-engine random source backed by a numpy.random.Generator.
+
+    Uniforms are drawn from the generator a block at a time and handed out
+    one by one, so a spawn decision costs a list index instead of a
+    Generator call. Exposes the part of the `random` module API the engine
+    uses (random, randint, choice).
+    """
+
+    __slots__ = ('generator', '_block', '_pos', '_block_start')
+
+    def __init__(self, seed=None):
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        """Restart the stream; seed=None draws fresh OS entropy"""
+        self.generator = np.random.default_rng(seed)
+        self._block = []
+        self._pos = 0
+        self._block_start = None
+
+    def random(self):
+        """Uniform float in [0, 1)"""
+        pos = self._pos
+        if pos == len(self._block):
+            self._refill()
+            pos = 0
+        self._pos = pos + 1
+        return self._block[pos]
+
+    def randint(self, a, b):
+        """Integer in [a, b], both ends included"""
+        return a + int(self.random() * (b - a + 1))
+
+    def choice(self, seq):
+        return seq[int(self.random() * len(seq))]
+
+    def _refill(self):
+        # Remember where the block came from, so get_state() need not copy it
+        self._block_start = self.generator.bit_generator.state
+        self._block = self.generator.random(RNG_BLOCK_SIZE).tolist()
+
+    def get_state(self):
+        """
+        (bit generator state, position): the state the current block was
+        drawn from and how many uniforms of it were used (-1: no block yet)
+        """
+        if not self._block:
+            return self.generator.bit_generator.state, -1
+        return self._block_start, self._pos
+
+    def set_state(self, bit_state, pos):
+        """Inverse of get_state(): redraws the block and skips the used part"""
+        if pos < 0:
+            self.generator.bit_generator.state = bit_state
+            self._block = []
+            self._pos = 0
+            return
+        if not self._block or bit_state != self._block_start:
+            self.generator.bit_generator.state = bit_state
+            self._refill()
+        # else: same block as now, and the generator already sits past it
+        self._pos = pos
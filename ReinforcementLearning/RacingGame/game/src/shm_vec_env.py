@@ -0,0 +1,205 @@
+"""
+Road Fighter - Shared-Memory Vector Env
+
+Steps RacingGameEnv races in worker processes. Each worker owns a
+contiguous group of engines whose observation buffers live in one
+shared-memory block, next to the actions, rewards, dones and a compact
+episode-stats row per race. The main process and the workers wake each
+other with semaphores, so a step moves no pickled data; pipes are only used
+for resets with options and attribute calls.
+
+Implements the Stable-Baselines3 VecEnv interface (train.py: VEC_ENV_BACKEND = "shm").
+"""
+
+import os
+import time
+import numpy as np
+from multiprocessing import shared_memory
+from gymnasium import spaces
+from stable_baselines3.common.vec_env.base_vec_env import VecEnv
+from .observation import OBS_SIZE
+from .shm_worker import CMD_STEP, CMD_RESET, CMD_CALL, CMD_CLOSE, _layout, _offsets, _attach, _worker, stats_info, mp_context
+
+# Seconds between worker liveness checks while waiting for a step
+WORKER_POLL_INTERVAL = 1.0
+
+
+class SharedMemoryVecEnv(VecEnv):
+    """
+    RacingGameEnv races stepped by a pool of worker processes.
+
+    num_envs races are split into num_workers contiguous groups (default:
+    one worker per CPU, at most one per race). env_kwargs go to every
+    RacingGameEnv (frame_skip, scheduled_traffic, adaptive_dt, ...). Races
+    auto-reset; finished ones report Monitor-style 'episode' stats plus the
+    engine's end-of-race info, like BatchedRoadFighter.
+    """
+
+    # Worker entry point and shared-array layout (AsyncEnvPool extends both)
+    worker_target = staticmethod(_worker)
+    array_layout = staticmethod(_layout)
+
+    def __init__(self, num_envs, num_workers=None, env_kwargs=None, start_method=None):
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        num_workers = max(1, min(num_workers, num_envs))
+        ctx = mp_context(start_method)
+
+        self.num_workers = num_workers
+        self.closed = False
+        self._t_start = time.time()
+
+        # 1. Shared block
+        self._layout = self.array_layout(num_envs, num_workers)
+        _, size = _offsets(self._layout)
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self._arrays = _attach(self._shm.buf, self._layout)
+        self._commands = self._arrays['commands']
+
+        # 2. Workers, each with a wake-up semaphore; one shared "finished" semaphore
+        bounds = np.linspace(0, num_envs, num_workers + 1).astype(int)
+        self._groups = [(int(bounds[w]), int(bounds[w + 1])) for w in range(num_workers)]
+        self._done = ctx.Semaphore(0)
+        self._work = []
+        self._remotes = []
+        self._processes = []
+        for index, (start, stop) in enumerate(self._groups):
+            work = ctx.Semaphore(0)
+            remote, worker_remote = ctx.Pipe()
+            process = ctx.Process(
+                target=self.worker_target,
+                args=(index, self._shm.name, self._layout, start, stop, dict(env_kwargs or {}),
+                      work, self._done, worker_remote),
+                daemon=True,
+            )
+            process.start()
+            worker_remote.close()
+            self._work.append(work)
+            self._remotes.append(remote)
+            self._processes.append(process)
+
+        observation_space = spaces.Box(low=-3.0, high=3.0, shape=(OBS_SIZE,), dtype=np.float32)
+        action_space = spaces.Discrete(4)
+        super().__init__(num_envs, observation_space, action_space)
+
+    @property
+    def worker_pids(self):
+        """Process ids of the workers, in race-group order (e.g. for CPU pinning)"""
+        return [process.pid for process in self._processes]
+
+    # ------------------------------------------------------------------
+    # VecEnv interface
+    # ------------------------------------------------------------------
+    def reset(self):
+        payloads = [
+            (self._seeds[start:stop], self._options[start:stop]) for start, stop in self._groups
+        ]
+        self._call_all(CMD_RESET, payloads)
+        self._reset_seeds()
+        self._reset_options()
+        return self._arrays['obs'].copy()
+
+    def step_async(self, actions):
+        self._arrays['actions'][:] = np.asarray(actions).reshape(self.num_envs)
+        self._commands[:] = CMD_STEP
+        for work in self._work:
+            work.release()
+
+    def step_wait(self):
+        self._wait()
+        for remote in self._remotes:
+            if remote.poll():
+                self._raise(remote.recv())
+
+        arrays = self._arrays
+        dones = arrays['dones'].copy()
+        infos = [{} for _ in range(self.num_envs)]
+        for idx in np.flatnonzero(dones):
+            info = self._episode_info(idx)
+            info['terminal_observation'] = arrays['terminal_obs'][idx].copy()
+            infos[idx] = info
+        return arrays['obs'].copy(), arrays['rewards'].copy(), dones, infos
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._commands[:] = CMD_CLOSE
+        for work in self._work:
+            work.release()
+        for process in self._processes:
+            process.join(timeout=5.0)
+            if process.is_alive():
+                process.terminate()
+        for remote in self._remotes:
+            remote.close()
+        self._arrays = self._commands = None
+        self._shm.close()
+        self._shm.unlink()
+
+    def get_attr(self, attr_name, indices=None):
+        return self._call('get', attr_name, None, None, indices)
+
+    def set_attr(self, attr_name, value, indices=None):
+        self._call('set', attr_name, value, None, indices)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        return self._call('method', method_name, method_args, method_kwargs, indices)
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        # Workers hold bare RacingGameEnv instances
+        return [False for _ in self._get_indices(indices)]
+
+    # ------------------------------------------------------------------
+    # Worker signalling
+    # ------------------------------------------------------------------
+    def _wait(self, count=None):
+        """Block until `count` workers (default: all) have signalled"""
+        for _ in range(self.num_workers if count is None else count):
+            while not self._done.acquire(timeout=WORKER_POLL_INTERVAL):
+                dead = [p.pid for p in self._processes if not p.is_alive()]
+                if dead:
+                    raise RuntimeError(f"SharedMemoryVecEnv worker process(es) {dead} died")
+
+    def _raise(self, message):
+        status, payload = message
+        raise RuntimeError(f"SharedMemoryVecEnv worker failed:\n{payload}")
+
+    def _call_all(self, command, payloads):
+        """Run a piped command on every worker and return their results"""
+        self._commands[:] = command
+        for work, remote, payload in zip(self._work, self._remotes, payloads):
+            remote.send(payload)
+            work.release()
+        self._wait()
+        results = []
+        for remote in self._remotes:
+            status, payload = remote.recv()
+            if status != 'ok':
+                self._raise((status, payload))
+            results.append(payload)
+        return results
+
+    def _call(self, kind, name, args, kwargs, indices):
+        """get/set/method call on the selected races, in index order"""
+        indices = list(self._get_indices(indices))
+        results = {}
+        for worker, (start, stop) in enumerate(self._groups):
+            local = [i - start for i in indices if start <= i < stop]
+            if not local:
+                continue
+            self._commands[worker] = CMD_CALL
+            self._remotes[worker].send((kind, name, args, kwargs, local))
+            self._work[worker].release()
+            self._wait(1)
+            status, payload = self._remotes[worker].recv()
+            if status != 'ok':
+                self._raise((status, payload))
+            if kind != 'set':
+                results.update(zip((start + j for j in local), payload))
+        if kind == 'set':
+            return None
+        return [results[i] for i in indices]
+
+    def _episode_info(self, idx):
+        return stats_info(self._arrays['stats'][idx], time.time() - self._t_start)
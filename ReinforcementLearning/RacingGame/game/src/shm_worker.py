@@ -0,0 +1,239 @@
+"""
+Road Fighter - Shared-Memory Workers
+
+The worker-process side of SharedMemoryVecEnv and AsyncEnvPool: the shared
+block layout and the loops that step groups of RacingGameEnv races in it.
+Kept free of Stable-Baselines3 and torch, so a worker process starts in a
+fraction of a second (it imports only this module and the engine).
+"""
+
+import multiprocessing as mp
+import traceback
+import numpy as np
+from multiprocessing import shared_memory
+from .observation import OBS_SIZE
+from .snapshot import END_REASONS, CAR_TYPES
+
+# Worker commands
+CMD_STEP, CMD_RESET, CMD_CALL, CMD_CLOSE = range(4)
+
+# Episode stats row, written by a worker when one of its races ends
+(STAT_RETURN, STAT_LENGTH, STAT_DISTANCE, STAT_SCORE, STAT_END_REASON,
+ STAT_GREEN, STAT_YELLOW, STAT_RED) = range(8)
+NUM_STATS = 8
+
+
+def mp_context(start_method=None):
+    """
+    Multiprocessing context for worker processes: forkserver where available,
+    else spawn. Forking a process that already runs torch threads is unsafe.
+    """
+    if start_method is None:
+        start_method = 'forkserver' if 'forkserver' in mp.get_all_start_methods() else 'spawn'
+    return mp.get_context(start_method)
+
+
+def _layout(num_envs, num_workers):
+    """(name, shape, dtype) of every array in the shared block"""
+    return (
+        ('obs', (num_envs, OBS_SIZE), np.float32),
+        ('terminal_obs', (num_envs, OBS_SIZE), np.float32),
+        ('rewards', (num_envs,), np.float32),
+        ('dones', (num_envs,), np.bool_),
+        ('actions', (num_envs,), np.int64),
+        ('stats', (num_envs, NUM_STATS), np.float64),
+        ('commands', (num_workers,), np.int64),
+    )
+
+
+def _offsets(layout):
+    """Byte offset of each array (8-byte aligned) and the block size"""
+    offsets = []
+    size = 0
+    for _, shape, dtype in layout:
+        size = -(-size // 8) * 8
+        offsets.append(size)
+        size += int(np.prod(shape)) * np.dtype(dtype).itemsize
+    return offsets, max(size, 1)
+
+
+def _attach(buf, layout):
+    """NumPy views of the shared arrays over buf"""
+    offsets, _ = _offsets(layout)
+    return {
+        name: np.ndarray(shape, dtype=dtype, buffer=buf, offset=offset)
+        for (name, shape, dtype), offset in zip(layout, offsets)
+    }
+
+
+def stats_info(row, elapsed):
+    """End-of-race info dict (engine keys + Monitor-style 'episode') from a stats row"""
+    end_reason = END_REASONS[int(row[STAT_END_REASON])]
+    return {
+        'victory': end_reason == 'victory',
+        'distance': float(row[STAT_DISTANCE]),
+        'score': int(row[STAT_SCORE]),
+        'end_reason': end_reason,
+        'cars_passed': {
+            name: int(row[STAT_GREEN + code]) for code, name in enumerate(CAR_TYPES)
+        },
+        'episode': {
+            'r': round(float(row[STAT_RETURN]), 6),
+            'l': int(row[STAT_LENGTH]),
+            't': round(elapsed, 6),
+        },
+        'TimeLimit.truncated': False,
+    }
+
+
+def info_stats(info, episode_return, length):
+    """Stats row of a race that just ended with the engine info dict `info`"""
+    cars = info['cars_passed']
+    return (episode_return, length, info['distance'], info['score'],
+            END_REASONS.index(info['end_reason']),
+            cars['green'], cars['yellow'], cars['red'])
+
+
+class _RaceGroup:
+    """A worker's contiguous slice start..stop-1 of races, stepped into shared memory"""
+
+    def __init__(self, arrays, start, stop, env_kwargs):
+        from .gym_env import RacingGameEnv
+
+        self.start = start
+        self.obs = arrays['obs']
+        self.terminal_obs = arrays['terminal_obs']
+        self.rewards = arrays['rewards']
+        self.dones = arrays['dones']
+        self.actions = arrays['actions']
+        self.stats = arrays['stats']
+        # Observations are written by the engines straight into shared memory,
+        # and step() hands back that row instead of a copy
+        self.envs = [RacingGameEnv(**dict(env_kwargs, obs_buffer=self.obs[i], copy_obs=False))
+                     for i in range(start, stop)]
+        self.returns = [0.0] * len(self.envs)
+        self.lengths = [0] * len(self.envs)
+
+    def step(self, i):
+        """Step race i with its shared action; auto-reset and write stats when it ends"""
+        j = i - self.start
+        env = self.envs[j]
+        _, reward, terminated, truncated, info = env.step(int(self.actions[i]))
+        self.rewards[i] = reward
+        self.returns[j] += reward
+        self.lengths[j] += 1
+        if terminated or truncated:
+            self.terminal_obs[i] = self.obs[i]
+            self.stats[i] = info_stats(info, self.returns[j], self.lengths[j])
+            self.returns[j] = 0.0
+            self.lengths[j] = 0
+            env.reset()
+            self.dones[i] = True
+        else:
+            self.dones[i] = False
+
+    def reset(self, seeds, options):
+        for j, env in enumerate(self.envs):
+            env.reset(seed=seeds[j], options=options[j])
+            self.returns[j] = 0.0
+            self.lengths[j] = 0
+
+    def call(self, kind, name, args, kwargs, local):
+        """get/set/method call on the group's races local (indices within the group)"""
+        results = []
+        for j in local:
+            if kind == 'get':
+                results.append(getattr(self.envs[j], name))
+            elif kind == 'set':
+                setattr(self.envs[j], name, args)
+            else:
+                results.append(getattr(self.envs[j], name)(*args, **kwargs))
+        return results
+
+    def close(self):
+        for env in self.envs:
+            env.close()
+        self.envs = []
+        self.obs = self.terminal_obs = self.rewards = self.dones = self.actions = self.stats = None
+
+
+def _serve(index, shm_name, layout, start, stop, env_kwargs, work, done, remote, on_step):
+    """
+    Worker loop shared by the vector envs: wait for a command, run it, signal
+    done. Piped commands (reset, attribute calls, errors) answer on remote;
+    on_step(group, arrays) handles CMD_STEP.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    arrays = _attach(shm.buf, layout)
+    commands = arrays['commands']
+    group = None
+    try:
+        group = _RaceGroup(arrays, start, stop, env_kwargs)
+        while True:
+            work.acquire()
+            command = int(commands[index])
+            try:
+                if command == CMD_STEP:
+                    on_step(group, arrays)
+                    continue
+                if command == CMD_RESET:
+                    group.reset(*remote.recv())
+                    remote.send(('ok', None))
+                elif command == CMD_CALL:
+                    remote.send(('ok', group.call(*remote.recv())))
+                elif command == CMD_CLOSE:
+                    break
+            except Exception:
+                remote.send(('error', traceback.format_exc()))
+            done.release()
+    finally:
+        if group is not None:
+            group.close()
+        del commands, arrays
+        shm.close()
+        done.release()
+
+
+def _worker(index, shm_name, layout, start, stop, env_kwargs, work, done, remote):
+    """Synchronous worker: step the whole group, then signal once"""
+    def step_all(group, arrays):
+        try:
+            for i in range(start, stop):
+                group.step(i)
+        except Exception:
+            remote.send(('error', traceback.format_exc()))
+        done.release()
+
+    _serve(index, shm_name, layout, start, stop, env_kwargs, work, done, remote, step_all)
+
+
+def _pool_layout(num_envs, num_workers):
+    return _layout(num_envs, num_workers) + (
+        ('pending', (num_envs,), np.bool_),
+        ('ready', (num_envs,), np.int64),         # Worker w's ring is ready[start:stop]
+        ('ready_head', (num_workers,), np.int64),  # Races published by worker w so far
+    )
+
+
+def _pool_worker(index, shm_name, layout, start, stop, env_kwargs, work, done, remote):
+    """Async worker: step each pending race and publish it as soon as it is done"""
+    size = stop - start
+    head = 0
+
+    def step_pending(group, arrays):
+        nonlocal head
+        pending, ready, ready_head = arrays['pending'], arrays['ready'], arrays['ready_head']
+        for i in range(start, stop):
+            if not pending[i]:
+                continue
+            pending[i] = False
+            try:
+                group.step(i)
+            except Exception:
+                remote.send(('error', traceback.format_exc()))
+            ready[start + head % size] = i
+            head += 1
+            ready_head[index] = head
+            done.release()
+
+    _serve(index, shm_name, layout, start, stop, env_kwargs, work, done, remote, step_pending)
@@ -0,0 +1,185 @@
+"""
+Road Fighter - Engine Snapshots
+
+Packs the full RoadFighterGame state into a fixed-layout float64 buffer and
+back (see RoadFighterGame.clone_state / restore_state). The buffer is a
+plain NumPy array: copy it, stack it, or send it between processes as bytes.
+"""
+
+from operator import attrgetter
+from .constants import *
+from .entities import OpponentCar
+
+# Fixed opponent capacity of a snapshot
+SNAPSHOT_MAX_OPPONENTS = OPPONENT_POOL_SIZE
+
+END_REASONS = (None, 'collision', 'timeout', 'victory')
+CAR_TYPES = ('green', 'yellow', 'red')
+CAR_COLORS = (COLOR_OPPONENT_GREEN, COLOR_OPPONENT_YELLOW, COLOR_OPPONENT_RED)
+
+# Engine scalars, grouped by how they are restored
+ENGINE_FLOAT_FIELDS = (
+    'weighted_distance_score', 'distance_traveled', 'time_remaining',
+    'elapsed_time', 'time_since_last_spawn', 'spawn_interval',
+    'passing_bonus', 'collision_penalty', 'last_frame_reward',
+    '_next_traffic_time',
+)
+ENGINE_INT_FIELDS = (
+    'score', 'player_current_lane_cars_passed', 'green_cars_passed',
+    'yellow_cars_passed', 'red_cars_passed', 'total_cars_spawned',
+    'consecutive_same_type', 'consecutive_same_lane', '_traffic_cursor',
+)
+ENGINE_BOOL_FIELDS = ('running', 'game_over', 'victory', 'lane_camping_mode', 'rewards_active')
+# Lane numbers that may be None (stored as -1)
+ENGINE_LANE_FIELDS = ('last_player_lane', 'last_spawned_lane_for_consecutive', 'last_red_car_lane')
+
+PLAYER_FLOAT_FIELDS = ('x', 'y', 'velocity_y', 'target_x', 'start_x',
+                       'lane_change_progress', 'lane_change_speed')
+
+OPPONENT_FLOAT_FIELDS = ('x', 'y', 'speed', 'movement_timer', 'zig_zag_progress')
+OPPONENT_INT_FIELDS = ('lane', 'start_lane', 'movement_direction')
+# Per car: floats, ints, target_adjacent_lane, type, passed_counted, active
+OPPONENT_STRIDE = len(OPPONENT_FLOAT_FIELDS) + len(OPPONENT_INT_FIELDS) + 4
+
+# Layout offsets
+_ENGINE_SIZE = (len(ENGINE_FLOAT_FIELDS) + len(ENGINE_INT_FIELDS) + len(ENGINE_BOOL_FIELDS)
+                + len(ENGINE_LANE_FIELDS) + 3)  # + end_reason, collision_car_type, last_spawned_type
+_PLAYER_SIZE = len(PLAYER_FLOAT_FIELDS) + 3  # + current_lane, is_changing_lane, active
+PLAYER_OFFSET = _ENGINE_SIZE
+OPPONENTS_OFFSET = PLAYER_OFFSET + _PLAYER_SIZE  # [count, cars...]
+RNG_OFFSET = OPPONENTS_OFFSET + 1 + SNAPSHOT_MAX_OPPONENTS * OPPONENT_STRIDE
+# PCG64 state and increment as 4 x 32-bit words each, has_uint32, uinteger, block position
+_RNG_SIZE = 11
+STATE_SIZE = RNG_OFFSET + _RNG_SIZE
+
+_get_engine_floats = attrgetter(*ENGINE_FLOAT_FIELDS)
+_get_engine_ints = attrgetter(*ENGINE_INT_FIELDS)
+_get_engine_bools = attrgetter(*ENGINE_BOOL_FIELDS)
+_get_engine_lanes = attrgetter(*ENGINE_LANE_FIELDS)
+_get_player = attrgetter(*PLAYER_FLOAT_FIELDS, 'current_lane', 'is_changing_lane', 'active')
+_get_opponent = attrgetter(*OPPONENT_FLOAT_FIELDS, *OPPONENT_INT_FIELDS)
+
+_WORD = 0xFFFFFFFF
+
+
+def _code(value, names):
+    return -1 if value is None else names.index(value)
+
+
+def _lane(value):
+    return -1 if value is None else value
+
+
+def _split128(value):
+    return [value & _WORD, (value >> 32) & _WORD, (value >> 64) & _WORD, (value >> 96) & _WORD]
+
+
+def _join128(words):
+    return int(words[0]) | (int(words[1]) << 32) | (int(words[2]) << 64) | (int(words[3]) << 96)
+
+
+def pack(game, out):
+    """Write game's state into out (float64, length STATE_SIZE) and return it"""
+    opponents = game.opponents
+    if len(opponents) > SNAPSHOT_MAX_OPPONENTS:
+        raise ValueError(f"snapshot holds at most {SNAPSHOT_MAX_OPPONENTS} opponents, got {len(opponents)}")
+
+    # 1. Engine scalars
+    values = list(_get_engine_floats(game))
+    values += _get_engine_ints(game)
+    values += _get_engine_bools(game)
+    values += [_lane(lane) for lane in _get_engine_lanes(game)]
+    values.append(_code(game.end_reason, END_REASONS))
+    values.append(_code(game.collision_car_type, CAR_TYPES))
+    values.append(_code(game.last_spawned_type, CAR_TYPES))
+
+    # 2. Player
+    values += _get_player(game.player)
+
+    # 3. Opponents (unused slots are left as they are)
+    values.append(len(opponents))
+    for opp in opponents:
+        values += _get_opponent(opp)
+        values += [_lane(opp.target_adjacent_lane), CAR_TYPES.index(opp.car_type),
+                   opp.passed_counted, opp.active]
+    out[:len(values)] = values
+
+    # 4. RNG: the bit generator state its current block was drawn from, and the position in it
+    bit_state, pos = game.rng.get_state()
+    words = _split128(bit_state['state']['state']) + _split128(bit_state['state']['inc'])
+    words += [bit_state['has_uint32'], bit_state['uinteger'], pos]
+    out[RNG_OFFSET:STATE_SIZE] = words
+    return out
+
+
+def unpack(game, buf):
+    """Restore game's state from a buffer written by pack()"""
+    # Only the occupied opponent slots are read
+    used = OPPONENTS_OFFSET + 1 + int(buf[OPPONENTS_OFFSET]) * OPPONENT_STRIDE
+    values = buf[:used].tolist()
+
+    # 1. Engine scalars
+    i = 0
+    for name in ENGINE_FLOAT_FIELDS:
+        setattr(game, name, values[i])
+        i += 1
+    for name in ENGINE_INT_FIELDS:
+        setattr(game, name, int(values[i]))
+        i += 1
+    for name in ENGINE_BOOL_FIELDS:
+        setattr(game, name, values[i] != 0.0)
+        i += 1
+    for name in ENGINE_LANE_FIELDS:
+        lane = int(values[i])
+        setattr(game, name, None if lane < 0 else lane)
+        i += 1
+    end_reason, collision_type, spawned_type = (int(v) for v in values[i:i + 3])
+    game.end_reason = END_REASONS[end_reason] if end_reason >= 0 else None
+    game.collision_car_type = CAR_TYPES[collision_type] if collision_type >= 0 else None
+    game.last_spawned_type = CAR_TYPES[spawned_type] if spawned_type >= 0 else None
+
+    # 2. Player
+    player = game.player
+    i = PLAYER_OFFSET
+    for name in PLAYER_FLOAT_FIELDS:
+        setattr(player, name, values[i])
+        i += 1
+    player.current_lane = int(values[i])
+    player.is_changing_lane = values[i + 1] != 0.0
+    player.active = values[i + 2] != 0.0
+
+    # 3. Opponents, rebuilt from pooled slots
+    for opp in game.opponents:
+        game._release_opponent(opp)
+    pool = game._free_opponents
+    opponents = []
+    i = OPPONENTS_OFFSET + 1
+    for _ in range(int(values[OPPONENTS_OFFSET])):
+        car_type = CAR_TYPES[int(values[i + 9])]
+        opp = pool.pop() if pool else OpponentCar(0, force_type='green', config=game.config)
+        for name in OPPONENT_FLOAT_FIELDS:
+            setattr(opp, name, values[i])
+            i += 1
+        for name in OPPONENT_INT_FIELDS:
+            setattr(opp, name, int(values[i]))
+            i += 1
+        adjacent = int(values[i])
+        opp.target_adjacent_lane = None if adjacent < 0 else adjacent
+        opp.car_type = car_type
+        opp.color = CAR_COLORS[CAR_TYPES.index(car_type)]
+        opp.passed_counted = values[i + 2] != 0.0
+        opp.active = values[i + 3] != 0.0
+        i += 4
+        opponents.append(opp)
+    game.opponents = opponents
+    game._lane_index.rebuild(opponents)
+
+    # 4. RNG
+    header = buf[RNG_OFFSET:STATE_SIZE].tolist()
+    bit_state = {
+        'bit_generator': 'PCG64',
+        'state': {'state': _join128(header[0:4]), 'inc': _join128(header[4:8])},
+        'has_uint32': int(header[8]),
+        'uinteger': int(header[9]),
+    }
+    game.rng.set_state(bit_state, int(header[10]))
@@ -0,0 +1,89 @@
+"""
+Road Fighter - Spatial Index
+Opponents bucketed by lane and kept sorted by y, for spacing and collision queries.
+"""
+
+from bisect import bisect_right, insort
+from .config import DEFAULT_CONFIG
+
+
+def _car_y(car):
+    return car.y
+
+
+class LaneIndex:
+    """
+    Per-lane, y-sorted view of RoadFighterGame.opponents.
+
+    Every opponent scrolls down at the same speed, so the y order inside a
+    bucket never changes on its own: only spawns, despawns and lane changes
+    (yellow and red cars drift sideways) touch the index. The engine reports
+    those incrementally; if the opponents list is replaced or grown from the
+    outside, sync() rebuilds the buckets.
+    """
+
+    __slots__ = ('lanes', 'source', 'count', 'config')
+
+    def __init__(self, config=None):
+        self.config = DEFAULT_CONFIG if config is None else config
+        self.lanes = [[] for _ in range(self.config.num_lanes)]
+        self.source = None
+        self.count = 0
+
+    def sync(self, opponents):
+        """Rebuild from the opponents list if it is not the one being tracked"""
+        if opponents is not self.source or len(opponents) != self.count:
+            self.rebuild(opponents)
+
+    def rebuild(self, opponents):
+        for bucket in self.lanes:
+            bucket.clear()
+        for opp in opponents:
+            insort(self.lanes[opp.lane], opp, key=_car_y)
+        self.source = opponents
+        self.count = len(opponents)
+
+    def add(self, car):
+        insort(self.lanes[car.lane], car, key=_car_y)
+        self.count += 1
+
+    def remove(self, car):
+        self.lanes[car.lane].remove(car)
+        self.count -= 1
+
+    def move(self, car, old_lane):
+        """Re-bucket a car whose lane changed from old_lane to car.lane"""
+        self.lanes[old_lane].remove(car)
+        insort(self.lanes[car.lane], car, key=_car_y)
+
+    def any_within(self, y, spacing):
+        """True if any car, in any lane, has |car.y - y| < spacing"""
+        for bucket in self.lanes:
+            i = bisect_right(bucket, y - spacing, key=_car_y)
+            if i < len(bucket) and bucket[i].y < y + spacing:
+                return True
+        return False
+
+    def first_overlap(self, player):
+        """First car whose box overlaps the player's, or None"""
+        # A car's center lies in its lane, so its box reaches half a car width past it
+        config = self.config
+        reach = config.opponent_width / 2.0
+        first_lane = int((player.x - reach - config.road_left_edge) // config.lane_width)
+        last_lane = int((player.x + player.width + reach - config.road_left_edge) // config.lane_width)
+        if first_lane < 0:
+            first_lane = 0
+        if last_lane > config.num_lanes - 1:
+            last_lane = config.num_lanes - 1
+        top = player.y - config.opponent_height
+        bottom = player.y + player.height
+        for lane in range(first_lane, last_lane + 1):
+            bucket = self.lanes[lane]
+            # The player sits near the bottom of the screen: walk up from the end
+            for i in range(len(bucket) - 1, -1, -1):
+                opp = bucket[i]
+                if opp.y <= top:
+                    break
+                if opp.y < bottom and player.overlaps(opp):
+                    return opp
+        return None
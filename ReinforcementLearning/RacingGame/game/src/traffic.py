@@ -0,0 +1,208 @@
+"""
+Road Fighter - Traffic Schedule
+
+Compiles a whole race's spawn schedule (time, lane, type, y-offset) up front
+from a seed and a GameConfig, so RoadFighterGame can pop due entries in O(1)
+per frame and several policies can be evaluated against identical traffic.
+"""
+
+import numpy as np
+from .constants import *
+from .config import DEFAULT_CONFIG
+
+CAR_TYPE_NAMES = ('green', 'yellow', 'red')
+
+# Entry roles: the camping override treats pattern cars differently
+SINGLE, PATTERN_LEAD, PATTERN_TRAIL = 0, 1, 2
+
+# Uniform draws consumed by one spawn attempt (columns of the draw matrix)
+(U_PATTERN, U_PAIR, U_LANE, U_RULE1_LANE, U_RED_LANE,
+ U_SINGLE_FORCED, U_SINGLE_TYPE, U_SINGLE_SIDE,
+ U_LEAD_FORCED, U_LEAD_TYPE, U_LEAD_SIDE,
+ U_TRAIL_FORCED, U_TRAIL_TYPE, U_TRAIL_SIDE) = range(14)
+DRAWS_PER_ATTEMPT = 14
+DRAW_BLOCK_ROWS = 256
+
+
+class TrafficSchedule:
+    """
+    Immutable list of spawn entries for one race, sorted by time.
+
+    Each entry is a tuple (time, lane, car_type, y_offset, side, role, alt_lane):
+    side (-1/+1) fixes the yellow car's adjacent lane or the red car's first
+    direction; role and alt_lane let the engine apply the lane-camping
+    override when the entry is popped, since that rule depends on the player.
+
+    Build one with TrafficSchedule.compile(seed, config). Engines keep
+    their own cursor, so one schedule can be shared by many engines of the
+    config it was compiled for.
+    """
+
+    __slots__ = ('entries', 'times', 'config')
+
+    def __init__(self, entries, config=None):
+        self.entries = entries
+        self.times = [entry[0] for entry in entries]
+        self.config = DEFAULT_CONFIG if config is None else config
+
+    def __len__(self):
+        return len(self.entries)
+
+    @classmethod
+    def compile(cls, seed=None, config=None):
+        """
+        Run the spawning rules of RoadFighterGame for a whole race without a
+        player: timer, spacing, blocking patterns, consecutive type/lane and
+        red lane separation, on the road, spawn interval, race length and
+        difficulty steps of config (default: DEFAULT_CONFIG). `seed` may be
+        an int, None or a numpy Generator.
+        """
+        config = DEFAULT_CONFIG if config is None else config
+        rng = np.random.default_rng(seed)
+
+        # 1. Per-frame clocks, vectorized: elapsed time, difficulty and the
+        #    scroll applied to every opponent before each frame's spawn check
+        num_frames = int(config.race_time_limit / FRAME_DT) + 2
+        frames = np.arange(num_frames + 1)
+        elapsed = frames * FRAME_DT
+        steps = np.searchsorted(config.multiplier_thresholds, elapsed, side='right')
+        mult = np.array(config.multiplier_values)[steps]
+        scroll = np.zeros(num_frames + 1)
+        np.cumsum(config.opponent_scroll_speed * mult[1:-1] * FRAME_DT, out=scroll[2:])
+        # A spawn is allowed once the timer reaches interval / multiplier
+        due_after = config.spawn_interval / mult
+
+        compiler = _Compiler(rng, config)
+        last_spawn = 0
+        frame = 1
+        while frame <= num_frames:
+            # 2. Jump straight to the next frame whose timer is due
+            waited = (frames[frame:] - last_spawn) * FRAME_DT
+            ready = np.flatnonzero(waited >= due_after[frame:])
+            if len(ready) == 0:
+                break
+            frame += int(ready[0])
+
+            # 3. Attempt every frame until something spawns
+            if compiler.attempt(frame, elapsed[frame], scroll[frame]):
+                last_spawn = frame
+            frame += 1
+
+        return cls(compiler.entries, config)
+
+
+class _Compiler:
+    """Spawn rule state while compiling a schedule (mirrors RoadFighterGame)"""
+
+    def __init__(self, rng, config):
+        self.rng = rng
+        self.config = config
+        self.spawn_y = -config.opponent_height
+        self.draws = rng.random((DRAW_BLOCK_ROWS, DRAWS_PER_ATTEMPT)).tolist()
+        self.row = 0
+        self.entries = []
+        # Cars on the road, as y minus the scroll at spawn time
+        self.bases = []
+
+        self.last_spawned_type = None
+        self.consecutive_same_type = 0
+        self.last_spawned_lane_for_consecutive = None
+        self.consecutive_same_lane = 0
+        self.last_red_car_lane = None
+
+    def attempt(self, frame, time, scroll):
+        if self.row == len(self.draws):
+            self.draws = self.rng.random((DRAW_BLOCK_ROWS, DRAWS_PER_ATTEMPT)).tolist()
+            self.row = 0
+        u = self.draws[self.row]
+        self.row += 1
+
+        # Cull cars that have left the screen
+        despawn_y = self.config.opponent_despawn_y
+        self.bases = [base for base in self.bases if base + scroll < despawn_y]
+
+        spawned = False
+        if (u[U_PATTERN] < self.config.blocking_pattern_chance and len(self.bases) < 3
+                and self.config.blocking_lane_pairs):
+            spawned = self._pattern(u, time, scroll)
+        if not spawned:
+            spawned = self._single(u, time, scroll)
+        return spawned
+
+    def _clear(self, y, scroll):
+        min_spacing = self.config.opponent_min_spacing
+        for base in self.bases:
+            if abs(base + scroll - y) < min_spacing:
+                return False
+        return True
+
+    def _pick_type(self, u_forced, u_type):
+        if self.consecutive_same_type >= 2:
+            available = [t for t in CAR_TYPE_NAMES if t != self.last_spawned_type]
+            return available[int(u_forced * len(available))]
+        config = self.config
+        if u_type < config.green_car_probability:
+            return 'green'
+        if u_type < config.green_car_probability + config.yellow_car_probability:
+            return 'yellow'
+        return 'red'
+
+    def _place(self, time, scroll, lane, car_type, y_offset, u_side, role, alt_lane):
+        if car_type == self.last_spawned_type:
+            self.consecutive_same_type += 1
+        else:
+            self.consecutive_same_type = 1
+        if lane == self.last_spawned_lane_for_consecutive:
+            self.consecutive_same_lane += 1
+        else:
+            self.consecutive_same_lane = 1
+        self.last_spawned_type = car_type
+        self.last_spawned_lane_for_consecutive = lane
+        if car_type == 'red':
+            self.last_red_car_lane = lane
+
+        side = -1 if u_side < 0.5 else 1
+        self.entries.append((time, lane, car_type, y_offset, side, role, alt_lane))
+        self.bases.append(self.spawn_y + y_offset - scroll)
+
+    def _single(self, u, time, scroll):
+        config = self.config
+        lane = int(u[U_LANE] * config.num_lanes)
+        if not self._clear(self.spawn_y, scroll):
+            return False
+
+        # RULE 1: No more than 2 cars in same lane consecutively
+        if self.last_spawned_lane_for_consecutive == lane and self.consecutive_same_lane >= 2:
+            available_lanes = [l for l in range(config.num_lanes) if l != lane]
+            lane = available_lanes[int(u[U_RULE1_LANE] * len(available_lanes))]
+
+        # Red car horizontal spacing: a lane in the other half of the road
+        if self.last_spawned_type == 'red' and self.last_red_car_lane is not None:
+            if abs(lane - self.last_red_car_lane) < 2:
+                if self.last_red_car_lane in config.lower_lanes:
+                    far_lanes = config.upper_lanes
+                else:
+                    far_lanes = config.lower_lanes
+                lane = far_lanes[int(u[U_RED_LANE] * len(far_lanes))]
+
+        # RULE 2: No more than 2 consecutive same color
+        car_type = self._pick_type(u[U_SINGLE_FORCED], u[U_SINGLE_TYPE])
+        self._place(time, scroll, lane, car_type, 0, u[U_SINGLE_SIDE], SINGLE, lane)
+        return True
+
+    def _pattern(self, u, time, scroll):
+        pairs = self.config.blocking_lane_pairs
+        lanes = pairs[int(u[U_PAIR] * len(pairs))]
+        columns = ((U_LEAD_FORCED, U_LEAD_TYPE, U_LEAD_SIDE, PATTERN_LEAD),
+                   (U_TRAIL_FORCED, U_TRAIL_TYPE, U_TRAIL_SIDE, PATTERN_TRAIL))
+        any_spawned = False
+        for i, lane in enumerate(lanes):
+            y_offset = -i * self.config.blocking_pattern_row_gap
+            # Pattern cars already placed count for spacing too
+            if not self._clear(self.spawn_y + y_offset, scroll):
+                continue
+            u_forced, u_type, u_side, role = columns[i]
+            car_type = self._pick_type(u[u_forced], u[u_type])
+            self._place(time, scroll, lane, car_type, y_offset, u[u_side], role, lanes[1 - i])
+            any_spawned = True
+        return any_spawned
@@ -0,0 +1,250 @@
+"""
+Road Fighter - Hyperparameter Sweep
+
+Successive halving over short PPO runs, each trial in its own process,
+within a fixed budget of CPU cores:
+
+1. Sample NUM_TRIALS configurations from SEARCH_SPACE.
+2. Train every live trial to the next milestone (MIN_STEPS, then ETA times
+   more at each rung), as many at once as the budget allows; each process
+   is pinned to its share of the cores and sizes its torch threads to it.
+3. Rank the trials on the mean reward and mean distance of their last
+   STATS_WINDOW episodes (the CSVLoggingCallback log every trial writes),
+   keep the top 1/ETA and share the freed cores among the survivors, which
+   resume from their checkpoints.
+
+Trials live in SWEEP_DIR/trial_XX (model.zip, training_log.csv); the
+leaderboard is written to SWEEP_DIR/sweep_results.json.
+
+Usage: python sweep.py [--trials N] [--cpus N] [--min-steps N]
+"""
+
+import argparse
+import csv
+import datetime
+import itertools
+import json
+import os
+from multiprocessing.connection import wait
+import numpy as np
+from stable_baselines3 import PPO
+import train
+from src.batched_env import BatchedRoadFighter
+from src.shm_worker import mp_context
+from src.resources import available_cpus, plan_resources, apply_plan
+
+# =========================================================
+# CONFIGURATION
+# =========================================================
+SWEEP_DIR = os.path.join(train.BASE_DIR, "sweep")
+SEARCH_SPACE = {
+    'learning_rate': (1e-4, 3e-4, 1e-3),
+    'ent_coef': (0.01, 0.05, 0.1),
+    'n_epochs': (5, 10, 20),
+    'frame_skip': (4, 8),
+}
+NUM_TRIALS = 16
+MIN_STEPS = 250_000  # First milestone; each rung trains ETA times longer
+ETA = 2  # Keep the top 1/ETA trials at every milestone
+STATS_WINDOW = 50  # Episodes per trial the ranking averages
+N_ENVS = 8  # Races per trial (batched engine)
+N_STEPS = 2048  # PPO steps per race per rollout
+
+
+def sample_configs(num_trials=NUM_TRIALS, seed=0, space=SEARCH_SPACE):
+    """num_trials distinct configurations (all of them if the grid is smaller), each with its own seed"""
+    grid = [dict(zip(space, values)) for values in itertools.product(*space.values())]
+    rng = np.random.default_rng(seed)
+    picks = rng.permutation(len(grid))[:num_trials]
+    return [dict(grid[p], seed=trial) for trial, p in enumerate(picks)]
+
+
+def milestones(num_trials, min_steps=MIN_STEPS, eta=ETA):
+    """Total timesteps per trial at each rung, until one trial is left"""
+    steps = [min_steps]
+    while num_trials > 1:
+        num_trials = max(1, num_trials // eta)
+        steps.append(steps[-1] * eta)
+    return steps
+
+
+# ----------------------------------------------------------------------
+# One trial (runs in its own process)
+# ----------------------------------------------------------------------
+def run_trial(trial_dir, config, steps, cpus, n_envs=N_ENVS, n_steps=N_STEPS):
+    """Train (or resume) one trial to `steps` total timesteps on `cpus`"""
+    # 1. Stay inside this trial's share of the budget
+    apply_plan(plan_resources(0, cpus=cpus))
+
+    # 2. Resume from the last milestone's checkpoint
+    env = BatchedRoadFighter(n_envs, frame_skip=config['frame_skip'])
+    model_path = os.path.join(trial_dir, "model.zip")
+    if os.path.exists(model_path):
+        model = PPO.load(model_path, env=env)
+    else:
+        model = PPO(
+            "MlpPolicy", env, verbose=0,
+            learning_rate=config['learning_rate'],
+            ent_coef=config['ent_coef'],
+            n_epochs=config['n_epochs'],
+            n_steps=n_steps,
+            batch_size=min(train.PPO_BATCH_SIZE, n_steps * n_envs),
+            seed=config['seed'],
+        )
+
+    # 3. Episodes go to trial_dir/training_log.csv, as in train.py
+    model.learn(total_timesteps=max(0, steps - model.num_timesteps),
+                callback=train.CSVLoggingCallback(log_dir=trial_dir),
+                reset_num_timesteps=False)
+    model.save(model_path)
+    env.close()
+
+
+def trial_stats(trial_dir, window=STATS_WINDOW):
+    """Mean reward and distance over the trial's last `window` logged episodes"""
+    path = os.path.join(trial_dir, "training_log.csv")
+    rows = []
+    if os.path.exists(path):
+        with open(path, newline='') as f:
+            rows = list(csv.DictReader(f))[-window:]
+    if not rows:
+        return {'episodes': 0, 'reward': None, 'distance': None}
+    return {
+        'episodes': len(rows),
+        'reward': float(np.mean([float(row['Reward']) for row in rows])),
+        'distance': float(np.mean([float(row['Distance']) for row in rows])),
+    }
+
+
+def rank_trials(stats):
+    """
+    Trial ids best first: by the mean of their reward rank and distance
+    rank, ties going to the higher reward. Trials without episodes go last.
+    """
+    def value(trial, key):
+        return float('-inf') if stats[trial][key] is None else stats[trial][key]
+
+    ids = list(stats)
+    by_reward = sorted(ids, key=lambda t: -value(t, 'reward'))
+    by_distance = sorted(ids, key=lambda t: -value(t, 'distance'))
+    score = {t: by_reward.index(t) + by_distance.index(t) for t in ids}
+    return sorted(ids, key=lambda t: (score[t], -value(t, 'reward')))
+
+
+# ----------------------------------------------------------------------
+# Scheduling
+# ----------------------------------------------------------------------
+def core_shares(num_trials, num_cpus):
+    """Cores per concurrent trial: an even split, or one each if trials outnumber cores"""
+    slots = min(num_trials, num_cpus)
+    return [len(part) for part in np.array_split(np.arange(num_cpus), slots)]
+
+
+def run_rung(sweep_dir, configs, trial_ids, steps, cpus, ctx, n_envs=N_ENVS, n_steps=N_STEPS):
+    """
+    Train trial_ids to `steps`, each process on its share of cpus, starting
+    queued trials as running ones free their cores. Returns {trial id:
+    stats} (failed trials rank last).
+    """
+    shares = core_shares(len(trial_ids), len(cpus))
+    free = list(cpus)
+    queue = list(trial_ids)
+    running = {}  # sentinel -> (trial id, process, cores)
+    used = {}
+    failed = set()
+    while queue or running:
+        # 1. Start trials while their share of cores is free
+        while queue and len(free) >= shares[len(used) % len(shares)]:
+            share = shares[len(used) % len(shares)]
+            trial = queue.pop(0)
+            cores, free = free[:share], free[share:]
+            process = ctx.Process(target=run_trial,
+                                  args=(trial_dir(sweep_dir, trial), configs[trial], steps, cores,
+                                        n_envs, n_steps))
+            process.start()
+            running[process.sentinel] = (trial, process, cores)
+            used[trial] = len(cores)
+        # 2. Reclaim the cores of whichever finish first
+        for sentinel in wait(list(running)):
+            trial, process, cores = running.pop(sentinel)
+            process.join()
+            if process.exitcode != 0:
+                failed.add(trial)
+                print(f"  ❌ trial {trial:02d} exited with code {process.exitcode}")
+            free.extend(cores)
+        free.sort()
+
+    stats = {}
+    for trial in trial_ids:
+        stats[trial] = dict(trial_stats(trial_dir(sweep_dir, trial)), cores=used[trial])
+        if trial in failed:
+            stats[trial] = dict(stats[trial], reward=None, distance=None, failed=True)
+    return stats
+
+
+def trial_dir(sweep_dir, trial):
+    return os.path.join(sweep_dir, f"trial_{trial:02d}")
+
+
+def run_sweep(sweep_dir=SWEEP_DIR, num_trials=NUM_TRIALS, cpus=None, min_steps=MIN_STEPS, eta=ETA,
+              seed=0, n_envs=N_ENVS, n_steps=N_STEPS, start_method=None):
+    """Run the whole sweep, write sweep_results.json and return it"""
+    cpus = available_cpus() if cpus is None else list(cpus)
+    ctx = mp_context(start_method)
+    configs = sample_configs(num_trials, seed)
+    num_trials = len(configs)
+    for trial in range(num_trials):
+        os.makedirs(trial_dir(sweep_dir, trial), exist_ok=True)
+
+    trials = [{'trial': t, 'config': configs[t], 'rungs': [], 'eliminated_at': None} for t in range(num_trials)]
+    alive = list(range(num_trials))
+    for steps in milestones(num_trials, min_steps, eta):
+        print(f"🏁 {len(alive)} trial(s) to {steps:,} steps, {max(core_shares(len(alive), len(cpus)))} core(s) each")
+        stats = run_rung(sweep_dir, configs, alive, steps, cpus, ctx, n_envs, n_steps)
+        ranked = rank_trials(stats)
+        for place, trial in enumerate(ranked):
+            trials[trial]['rungs'].append(dict(stats[trial], steps=steps, place=place + 1))
+            if stats[trial]['episodes']:
+                result = f"reward {stats[trial]['reward']:8.2f}  distance {stats[trial]['distance']:7.1f}"
+            else:
+                result = "no finished episodes"
+            print(f"  {place + 1:>2}. trial {trial:02d} {result}  {configs[trial]}")
+        # Keep the top 1/eta; the rest's cores go to the survivors next rung
+        keep = max(1, len(alive) // eta)
+        for trial in ranked[keep:]:
+            trials[trial]['eliminated_at'] = steps
+        alive = ranked[:keep]
+        if len(ranked) == 1:
+            break
+
+    best = trials[alive[0]]
+    results = {
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'cpus': len(cpus),
+        'milestones': milestones(num_trials, min_steps, eta),
+        'best': {'trial': best['trial'], 'config': best['config'],
+                 'model': os.path.join(trial_dir(sweep_dir, best['trial']), "model.zip")},
+        'trials': trials,
+    }
+    with open(os.path.join(sweep_dir, "sweep_results.json"), "w") as f:
+        json.dump(results, f, indent=2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Successive-halving PPO hyperparameter sweep")
+    parser.add_argument("--trials", type=int, default=NUM_TRIALS)
+    parser.add_argument("--cpus", type=int, default=None, help="Core budget (default: every available core)")
+    parser.add_argument("--min-steps", type=int, default=MIN_STEPS, help="First milestone, in timesteps")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    cpus = available_cpus()[:args.cpus] if args.cpus else available_cpus()
+    print(f"🔍 Sweeping {args.trials} configurations on {len(cpus)} core(s)...")
+    results = run_sweep(num_trials=args.trials, cpus=cpus, min_steps=args.min_steps, seed=args.seed)
+    print(f"\n✅ Best: trial {results['best']['trial']:02d} {results['best']['config']}")
+    print(f"💾 Leaderboard in {os.path.join(SWEEP_DIR, 'sweep_results.json')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core import RoadFighterGame
+from src.entities import OpponentCar
+from src.gym_env import RacingGameEnv
+from src.constants import *
+
+
+def count_frames(game):
+    """Wrap the engine's 60Hz frame to count how often it runs"""
+    frames = []
+    game._frame = lambda *args, frame=game._frame: frames.append(1) or frame(*args)
+    return frames
+
+
+def rollout(adaptive_dt, steps=2500, seed=6):
+    env = RacingGameEnv(frame_skip=8, adaptive_dt=adaptive_dt)
+    env.reset(seed=seed)
+    actions = np.random.default_rng(seed).choice([0, 0, 0, 0, 3, 1, 2], size=steps)
+    trace = []
+    for action in actions:
+        obs, reward, terminated, _, info = env.step(int(action))
+        trace.append((obs, reward, terminated, info['score'], info['distance']))
+        if terminated:
+            env.reset()
+    return trace
+
+
+class TestAdaptiveDt(unittest.TestCase):
+    def test_same_race_as_fixed_dt(self):
+        """Observations, rewards, score and distance match 60Hz stepping"""
+        for (obs_a, reward_a, done_a, score_a, dist_a), (obs_b, reward_b, done_b, score_b, dist_b) in zip(
+                rollout(False), rollout(True)):
+            np.testing.assert_allclose(obs_b, obs_a, atol=1e-5)
+            self.assertAlmostEqual(reward_b, reward_a, places=6)
+            self.assertAlmostEqual(dist_b, dist_a, places=6)
+            self.assertEqual((done_b, score_b), (done_a, score_a))
+
+    def test_long_stretches_are_coarse(self):
+        """Ten seconds of held controls take far fewer than 600 single frames"""
+        exact = RoadFighterGame(seed=2)
+        exact.step_n(600, False, False, False)
+        game = RoadFighterGame(seed=2)
+        game.adaptive_dt = True
+        frames = count_frames(game)
+        game.step_n(600, False, False, False)
+        self.assertLess(len(frames), 200)
+        self.assertAlmostEqual(game.elapsed_time, exact.elapsed_time)
+        self.assertEqual(game.score, exact.score)
+
+    def test_refines_near_the_player(self):
+        """A car about to reach the player's lane forces 1/60 frames"""
+        game = RoadFighterGame(seed=0)
+        game.adaptive_dt = True
+        car = OpponentCar(game.player.current_lane, force_type='green')
+        car.y = game.player.y - car.height - 10
+        game._add_opponent(car)
+        self.assertEqual(game._coarse_frames(8), 0)
+        car.x += 2 * LANE_WIDTH  # Two lanes over: never near
+        self.assertEqual(game._coarse_frames(8), 8)
+
+    def test_refines_during_lane_change(self):
+        game = RoadFighterGame(seed=0)
+        game.adaptive_dt = True
+        game.step_n(1, False, True, False)
+        self.assertTrue(game.player.is_changing_lane)
+        self.assertEqual(game._coarse_frames(8), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import sys
+import os
+import time
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from stable_baselines3 import PPO
+from src.batched_env import BatchedRoadFighter
+from src.async_eval import AsyncEvaluator, AsyncEvalCallback, play_round, episode_metrics, make_eval_env
+
+
+def wait_for_results(evaluator, count=1, timeout=60.0):
+    results = []
+    deadline = time.time() + timeout
+    while len(results) < count and time.time() < deadline:
+        results.extend(evaluator.results())
+        time.sleep(0.05)
+    return results
+
+
+class TestAsyncEvaluator(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.model = PPO("MlpPolicy", BatchedRoadFighter(2, frame_skip=8), n_steps=32, batch_size=64, seed=0)
+
+    def test_round_quotas_and_metrics(self):
+        env = BatchedRoadFighter(2, frame_skip=8)
+        env.seed(3)
+        infos = play_round(self.model.policy, env, 5)
+        self.assertEqual(len(infos), 5)
+        metrics = episode_metrics(infos)
+        self.assertEqual(metrics['episodes'], 5)
+        self.assertAlmostEqual(metrics['mean_reward'], np.mean([info['episode']['r'] for info in infos]))
+        self.assertLessEqual(metrics['win_rate'] + metrics['collision_rate'], 1.0)
+        # Seeded rounds repeat exactly
+        env.seed(3)
+        self.assertEqual(episode_metrics(play_round(self.model.policy, env, 5)), metrics)
+
+    def test_published_weights_are_evaluated_out_of_process(self):
+        evaluator = AsyncEvaluator(self.model.policy, n_episodes=3, seed=7, frame_skip=8, max_parallel=2)
+        try:
+            start = time.perf_counter()
+            self.assertTrue(evaluator.publish(self.model.policy, 1234))
+            self.assertLess(time.perf_counter() - start, 0.5)
+            results = wait_for_results(evaluator)
+            self.assertEqual(len(results), 1)
+            self.assertEqual(results[0]['timesteps'], 1234)
+
+            env = BatchedRoadFighter(2, frame_skip=8)
+            env.seed(7)
+            expected = episode_metrics(play_round(self.model.policy, env, 3))
+            for key, value in expected.items():
+                self.assertAlmostEqual(results[0][key], value, places=4)
+        finally:
+            evaluator.close()
+
+    def test_evaluates_on_the_training_backend(self):
+        """Reference-engine backends are evaluated on RacingGameEnv races"""
+        with self.assertRaises(ValueError):
+            AsyncEvaluator(self.model.policy, n_episodes=2)
+        with self.assertRaises(ValueError):
+            AsyncEvaluator(self.model.policy, n_episodes=2, frame_skip=8, backend="no_such_backend")
+        evaluator = AsyncEvaluator(self.model.policy, n_episodes=2, seed=5, frame_skip=8, backend="shm")
+        try:
+            self.assertTrue(evaluator.publish(self.model.policy, 32))
+            results = wait_for_results(evaluator)
+            self.assertEqual(len(results), 1)
+            env = make_eval_env(2, 8, "shm")
+            env.seed(5)
+            expected = episode_metrics(play_round(self.model.policy, env, 2))
+            for key, value in expected.items():
+                self.assertAlmostEqual(results[0][key], value, places=4)
+        finally:
+            evaluator.close()
+
+    def test_callback_publishes_during_learn(self):
+        model = PPO("MlpPolicy", BatchedRoadFighter(2, frame_skip=8), n_steps=32, batch_size=64, seed=0)
+        evaluator = AsyncEvaluator(model.policy, n_episodes=2, frame_skip=8)
+        try:
+            callback = AsyncEvalCallback(evaluator, eval_freq=16, verbose=0)
+            model.learn(total_timesteps=128, callback=callback)
+            results = callback.history + wait_for_results(evaluator)
+            self.assertGreaterEqual(len(results), 1)
+            self.assertIn(results[0]['timesteps'], (32, 64, 96, 128))
+        finally:
+            evaluator.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.batched_env import BatchedRoadFighter, YELLOW, CAR_TYPE_NAMES
+from src.gym_env import RacingGameEnv
+from src.config import GameConfig
+from src.constants import PLAYER_Y, OPPONENT_MIN_SPACING
+
+
+class TestBatchedRoadFighter(unittest.TestCase):
+    def test_vec_env_contract(self):
+        """Verify reset/step shapes and dtypes follow the SB3 VecEnv API"""
+        env = BatchedRoadFighter(16, frame_skip=4, seed=0)
+        obs = env.reset()
+        self.assertEqual(obs.shape, (16, 32))
+        self.assertEqual(obs.dtype, np.float32)
+
+        obs, rewards, dones, infos = env.step(np.zeros(16, dtype=np.int64))
+        self.assertEqual(obs.shape, (16, 32))
+        self.assertEqual(rewards.shape, (16,))
+        self.assertEqual(dones.dtype, bool)
+        self.assertEqual(len(infos), 16)
+
+    def test_matches_single_env_without_traffic(self):
+        """Player physics, time, score and rewards match RacingGameEnv frame for frame"""
+        batched = BatchedRoadFighter(1, frame_skip=8, seed=0)
+        batched.spawn_interval = 1e9
+        single = RacingGameEnv(frame_skip=8)
+        single.reset()
+        single.game.spawn_interval = 1e9
+        batched.reset()
+
+        rng = np.random.default_rng(1)
+        for _ in range(300):
+            action = int(rng.integers(0, 4))
+            obs_b, reward_b, _, _ = batched.step(np.array([action]))
+            obs_s, reward_s, _, _, _ = single.step(action)
+            np.testing.assert_allclose(obs_b[0], obs_s, atol=1e-6)
+            self.assertAlmostEqual(float(reward_b[0]), reward_s, places=5)
+
+    def test_matches_single_env_with_traffic(self):
+        """Seeded traffic of every car type moves, is passed and collides as in RacingGameEnv"""
+        for seed in range(6):
+            self._check_traffic_parity(seed, None)
+
+    def test_matches_single_env_with_variant_speeds(self):
+        """Opponent speeds of a GameConfig variant reach both engines"""
+        config = GameConfig(opponent_scroll_speed=180.0, yellow_speed_x=150.0, red_speed_x=40.0)
+        for seed in range(3):
+            self._check_traffic_parity(seed, config)
+
+    def _check_traffic_parity(self, seed, config):
+        batched = BatchedRoadFighter(1, frame_skip=4, seed=0, config=config)
+        batched.spawn_interval = 1e9
+        single = RacingGameEnv(frame_skip=4, config=config)
+        single.reset()
+        single.game.spawn_interval = 1e9
+        batched.reset()
+
+        # Same cars in both engines, one row every 280px above the screen
+        rng = np.random.default_rng(seed)
+        game = single.game
+        for slot in range(8):
+            lane = int(rng.integers(0, game.config.num_lanes))
+            car = game._new_opponent(lane, -280 * slot, force_type=CAR_TYPE_NAMES[rng.integers(0, 3)],
+                                     side=int(rng.choice((-1, 1))))
+            game._add_opponent(car)
+            batched.opp_active[0, slot] = True
+            batched.opp_x[0, slot] = car.x
+            batched.opp_y[0, slot] = car.y
+            batched.opp_type[0, slot] = CAR_TYPE_NAMES.index(car.car_type)
+            batched.opp_lane[0, slot] = batched.opp_start_lane[0, slot] = car.start_lane
+            batched.opp_adjacent_lane[0, slot] = car.target_adjacent_lane or 0
+            batched.opp_direction[0, slot] = car.movement_direction
+        batched._write_obs(batched._obs)
+        np.testing.assert_allclose(batched._obs[0], game.get_state(), atol=1e-6)
+
+        for _ in range(400):
+            action = int(rng.integers(0, 4))
+            obs_b, reward_b, done_b, infos = batched.step(np.array([action]))
+            obs_s, reward_s, terminated, _, info_s = single.step(action)
+            self.assertAlmostEqual(float(reward_b[0]), reward_s, places=4)
+            self.assertEqual(bool(done_b[0]), terminated)
+            if terminated:
+                self.assertEqual(infos[0]['end_reason'], info_s['end_reason'])
+                self.assertEqual(infos[0]['cars_passed'], info_s['cars_passed'])
+                break
+            np.testing.assert_allclose(obs_b[0], obs_s, atol=1e-5)
+
+    def test_follows_game_config(self):
+        """A three-lane GameConfig moves the player, spawns and bounds like RoadFighterGame"""
+        config = GameConfig(num_lanes=3, spawn_interval=1.0)
+        env = BatchedRoadFighter(32, frame_skip=8, seed=5, config=config)
+        env.reset()
+        self.assertTrue(np.all(env.player_x == config.player_start_x))
+        lanes = set()
+        for _ in range(150):
+            env.step(np.full(32, 2, dtype=np.int64))
+            lanes.update(env.opp_lane[env.opp_active].tolist())
+            self.assertLessEqual(env.player_x.max() + config.player_width, config.road_right_edge)
+        self.assertEqual(lanes, {0, 1, 2})
+
+    def test_collision_terminates_and_resets(self):
+        """A car on top of the player ends the race, reports stats and auto-resets"""
+        env = BatchedRoadFighter(2, frame_skip=4, seed=0)
+        env.reset()
+        env.opp_active[0, 0] = True
+        env.opp_x[0, 0] = env.player_x[0]
+        env.opp_y[0, 0] = PLAYER_Y
+        env.opp_type[0, 0] = YELLOW
+        env.opp_direction[0, 0] = 0.0
+        env.opp_start_lane[0, 0] = env.opp_adjacent_lane[0, 0] = env.player_lane[0]
+
+        _, rewards, dones, infos = env.step(np.zeros(2, dtype=np.int64))
+
+        self.assertTrue(dones[0])
+        self.assertFalse(dones[1])
+        self.assertEqual(infos[0]['end_reason'], 'collision')
+        self.assertIn('terminal_observation', infos[0])
+        self.assertIn('episode', infos[0])
+        self.assertLess(rewards[0], -100.0)
+        # Auto-reset: race 0 is back at the start line
+        self.assertEqual(env.end_reason[0], 0)
+        self.assertEqual(env.distance_traveled[0], 0.0)
+        self.assertFalse(env.opp_active[0].any())
+
+    def test_spawn_spacing(self):
+        """Traffic respects the minimum vertical spacing at spawn time"""
+        env = BatchedRoadFighter(64, frame_skip=8, seed=3)
+        env.reset()
+        for _ in range(200):
+            env.step(np.zeros(64, dtype=np.int64))
+            # All cars drift at the same speed, so spawn gaps are preserved
+            for race in range(64):
+                ys = np.sort(env.opp_y[race, env.opp_active[race]])
+                if len(ys) > 1:
+                    self.assertGreaterEqual(np.diff(ys).min(), OPPONENT_MIN_SPACING - 1e-6)
+
+    def test_seed_reproducibility(self):
+        """Same seed -> same traffic"""
+        runs = []
+        for _ in range(2):
+            env = BatchedRoadFighter(8, frame_skip=8)
+            env.seed(42)
+            obs = env.reset()
+            for _ in range(100):
+                obs, _, _, _ = env.step(np.zeros(8, dtype=np.int64))
+            runs.append(obs)
+        np.testing.assert_array_equal(runs[0], runs[1])
+
+    def test_ppo_can_train(self):
+        """PPO accepts the batched engine as its VecEnv"""
+        from stable_baselines3 import PPO
+        env = BatchedRoadFighter(4, frame_skip=4, seed=0)
+        model = PPO("MlpPolicy", env, n_steps=64, batch_size=64, n_epochs=1, verbose=0)
+        model.learn(total_timesteps=256)
+        self.assertGreaterEqual(model.num_timesteps, 256)
+
+
+if __name__ == '__main__':
+    unittest.main()
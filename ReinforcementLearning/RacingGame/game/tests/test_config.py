@@ -0,0 +1,96 @@
+import unittest
+import sys
+import os
+import dataclasses
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.config import GameConfig, DEFAULT_CONFIG
+from src.core import RoadFighterGame
+from src.batched_env import BatchedRoadFighter
+from src.constants import *
+
+
+def stepped_multiplier(time):
+    """The original if-chain"""
+    if time < 30: return 1.0
+    elif time < 46: return 1.2
+    elif time < 60: return 1.4
+    elif time < 80: return 1.6
+    elif time < 100: return 1.8
+    else: return 2.0
+
+
+class TestGameConfig(unittest.TestCase):
+    def test_defaults_match_constants(self):
+        config = DEFAULT_CONFIG
+        self.assertEqual(list(config.lane_centers), LANE_CENTERS)
+        self.assertEqual(config.road_right_edge, ROAD_RIGHT_EDGE)
+        self.assertEqual(config.player_start_x, PLAYER_START_X)
+        self.assertEqual(config.blocking_lane_pairs, ((0, 2), (0, 3), (1, 3)))
+
+    def test_lane_lookup_matches_boundary_scan(self):
+        for tenth in range(1000, 6000):
+            x = tenth / 10.0
+            expected = None
+            for i in range(NUM_LANES):
+                lane_start = ROAD_LEFT_EDGE + i * LANE_WIDTH
+                if lane_start <= x < lane_start + LANE_WIDTH:
+                    expected = i
+            self.assertEqual(DEFAULT_CONFIG.lane_at(x), expected)
+
+    def test_multiplier_table_matches_steps(self):
+        """Same values as the if-chain, for frame-accumulated clocks and exact thresholds"""
+        elapsed = 0.0
+        for _ in range(int(RACE_TIME_LIMIT * 60) + 100):
+            self.assertEqual(DEFAULT_CONFIG.multiplier_at(elapsed), stepped_multiplier(elapsed))
+            elapsed += 1 / 60.0
+        for threshold in (30.0, 46.0, 60.0, 80.0, 100.0):
+            for time in (threshold - 1e-9, threshold, threshold + 1e-9):
+                self.assertEqual(DEFAULT_CONFIG.multiplier_at(time), stepped_multiplier(time))
+
+    def test_immutable(self):
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            DEFAULT_CONFIG.num_lanes = 3
+        with self.assertRaises(ValueError):
+            GameConfig(multiplier_values=(1.0, 2.0))
+        with self.assertRaises(ValueError):
+            GameConfig(num_lanes=1, player_start_lane=0)
+
+    def test_two_lane_road_skips_blocking_patterns(self):
+        """With no lane pair to block, due patterns fall back to single cars in both engines"""
+        config = GameConfig(num_lanes=2, spawn_interval=0.5, blocking_pattern_chance=1.0)
+        self.assertEqual(config.blocking_lane_pairs, ())
+        game = RoadFighterGame(seed=2, config=config)
+        lanes_seen = set()
+        for _ in range(1500):
+            game.player.x = 0  # Off the road: no collisions
+            game.step(False, False, False)
+            lanes_seen.update(opp.lane for opp in game.opponents)
+        self.assertEqual(lanes_seen, {0, 1})
+
+        env = BatchedRoadFighter(8, frame_skip=8, seed=2, config=config)
+        env.reset()
+        for _ in range(200):
+            env.step(np.random.default_rng(0).integers(0, 4, 8))
+        self.assertGreater(env.opp_active.sum(), 0)
+        self.assertTrue(set(env.opp_lane[env.opp_active].tolist()) <= {0, 1})
+
+    def test_variants_side_by_side(self):
+        """A 3-lane engine and a default engine run in one process without interfering"""
+        narrow = RoadFighterGame(seed=1, config=GameConfig(num_lanes=3, spawn_interval=1.0))
+        default = RoadFighterGame(seed=1)
+        lanes_seen = set()
+        for _ in range(1500):
+            narrow.player.x = 0  # Off the road: no collisions
+            narrow.step(False, False, False)
+            default.step(False, False, False)
+            lanes_seen.update(opp.lane for opp in narrow.opponents)
+        self.assertEqual(lanes_seen, {0, 1, 2})
+        self.assertEqual(len(narrow.player.config.lane_centers), 3)
+        self.assertEqual(len(default._lane_index.lanes), NUM_LANES)
+
+
+if __name__ == '__main__':
+    unittest.main()
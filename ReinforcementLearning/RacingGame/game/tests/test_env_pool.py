@@ -0,0 +1,107 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.gym_env import RacingGameEnv
+from src.env_pool import AsyncEnvPool
+from src.pool_ppo import PoolPPO
+from stable_baselines3.common.callbacks import BaseCallback
+
+
+class RolloutCapture(BaseCallback):
+    """Copies the rollout buffer before PPO's update flattens it"""
+
+    def _on_step(self):
+        return True
+
+    def _on_rollout_end(self):
+        buffer = self.model.rollout_buffer
+        self.actions = buffer.actions.copy()
+        self.observations = buffer.observations.copy()
+        self.episode_starts = buffer.episode_starts.copy()
+        self.full = buffer.full
+
+
+class TestAsyncEnvPool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = AsyncEnvPool(4, batch_size=2, num_workers=2, env_kwargs={'frame_skip': 4})
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+
+    def test_recv_returns_batches_of_ready_races(self):
+        self.pool.seed(5)
+        obs, rewards, dones, infos, env_ids = self.pool.async_reset()
+        self.assertEqual(len(env_ids), 2)
+        self.assertEqual(obs.shape, (2, 32))
+        self.assertFalse(dones.any())
+
+        refs = [RacingGameEnv(frame_skip=4) for _ in range(4)]
+        for i, ref in enumerate(refs):
+            ref.reset(seed=5 + i)
+        # The queued reset races come next, then stepped ones
+        self.pool.send(np.zeros(2, dtype=int), env_ids)
+        seen = set(env_ids.tolist())
+        for _ in range(50):
+            obs, rewards, dones, infos, env_ids = self.pool.recv()
+            self.assertEqual(len(env_ids), 2)
+            for row, i in enumerate(env_ids):
+                if i in seen:
+                    ref_obs, ref_reward, terminated, _, _ = refs[i].step(0)
+                    self.assertAlmostEqual(float(rewards[row]), ref_reward, places=4)
+                    self.assertEqual(bool(dones[row]), terminated)
+                    if terminated:
+                        ref_obs = refs[i].reset()[0]
+                    np.testing.assert_array_equal(obs[row], ref_obs)
+                seen.add(int(i))
+            self.pool.send(np.zeros(2, dtype=int), env_ids)
+        self.assertEqual(seen, {0, 1, 2, 3})
+        self.pool.recv(4)
+
+    def test_send_rejects_a_race_in_flight(self):
+        _, _, _, _, env_ids = self.pool.async_reset()
+        self.pool.send(np.zeros(2, dtype=int), env_ids)
+        with self.assertRaises(RuntimeError):
+            self.pool.send(np.zeros(1, dtype=int), env_ids[:1])
+
+    def test_sync_step_drains_and_steps_every_race(self):
+        _, _, _, _, env_ids = self.pool.async_reset()
+        self.pool.send(np.zeros(2, dtype=int), env_ids)
+        obs = self.pool.reset()
+        self.assertEqual(obs.shape, (4, 32))
+        obs, rewards, dones, infos = self.pool.step(np.zeros(4, dtype=int))
+        self.assertEqual(obs.shape, (4, 32))
+        self.assertEqual(len(infos), 4)
+        self.assertEqual(self.pool.get_attr('frame_skip'), [4] * 4)
+
+
+class TestPoolPPO(unittest.TestCase):
+    def test_rollout_columns_are_race_trajectories(self):
+        pool = AsyncEnvPool(4, batch_size=2, num_workers=2, env_kwargs={'frame_skip': 4})
+        try:
+            model = PoolPPO("MlpPolicy", pool, n_steps=16, batch_size=32, n_epochs=1, seed=3)
+            capture = RolloutCapture()
+            model.learn(total_timesteps=64, callback=capture)
+            self.assertEqual(model.num_timesteps, 64)
+            self.assertTrue(capture.full)
+            # Replay each column on its own env: observations chain step by step
+            for i in range(4):
+                ref = RacingGameEnv(frame_skip=4)
+                ref.reset(seed=3 + i)
+                for t in range(15):
+                    obs, _, terminated, _, _ = ref.step(int(capture.actions[t, i, 0]))
+                    if terminated:
+                        obs = ref.reset()[0]
+                    np.testing.assert_array_equal(capture.observations[t + 1, i], obs)
+                    self.assertEqual(capture.episode_starts[t + 1, i], float(terminated))
+        finally:
+            pool.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
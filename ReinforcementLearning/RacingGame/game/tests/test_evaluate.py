@@ -0,0 +1,57 @@
+import unittest
+import sys
+import os
+import json
+import subprocess
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from stable_baselines3 import PPO
+from src.gym_env import RacingGameEnv
+import evaluate
+
+
+def final_info(end_reason, score, car=None, distance=100.0):
+    return {'victory': end_reason == 'victory', 'end_reason': end_reason, 'score': score,
+            'distance': distance, 'reward': float(score), 'length': 10, 'collision_car_type': car,
+            'cars_passed': {'green': 1, 'yellow': 0, 'red': 2}}
+
+
+class TestEvaluate(unittest.TestCase):
+    def test_summary(self):
+        infos = [final_info('victory', 400, distance=9500.0), final_info('collision', 100, 'red'),
+                 final_info('collision', 200, 'red'), final_info('timeout', 300)]
+        report = evaluate.summarize(infos)
+        self.assertEqual(report['episodes'], 4)
+        self.assertEqual(report['win_rate'], 0.25)
+        self.assertEqual(report['timeout_rate'], 0.25)
+        self.assertEqual(report['collision_rate'], 0.5)
+        self.assertEqual(report['collision_rate_by_car'], {'green': 0.0, 'yellow': 0.0, 'red': 0.5})
+        self.assertEqual(report['mean_distance'], (9500.0 + 300.0) / 4)
+        self.assertEqual(report['mean_cars_passed'], {'green': 1.0, 'yellow': 0.0, 'red': 2.0})
+        self.assertEqual(report['score']['p50'], 250.0)
+        self.assertEqual(report['score']['mean'], 250.0)
+        self.assertEqual(set(report['score']), {'mean', 'p5', 'p25', 'p50', 'p75', 'p95'})
+
+    def test_checkpoint_report_from_the_command_line(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "road_fighter_ppo_test.zip")
+            PPO("MlpPolicy", RacingGameEnv(), seed=0).save(path)
+            output = os.path.join(tmp, "report.json")
+            game_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            subprocess.run([sys.executable, "evaluate.py", path, "--episodes", "6", "--seed", "3",
+                            "--workers", "2", "--envs-per-worker", "2", "--output", output],
+                           cwd=game_dir, check=True, capture_output=True, timeout=300)
+            with open(output) as f:
+                report = json.load(f)
+        self.assertEqual(report['checkpoint'], path)
+        self.assertEqual(report['episodes'], 6)
+        self.assertEqual(report['seeds'], [3, 8])
+        self.assertAlmostEqual(report['win_rate'] + report['timeout_rate'] + report['collision_rate'], 1.0)
+        self.assertAlmostEqual(sum(report['collision_rate_by_car'].values()), report['collision_rate'])
+        self.assertLessEqual(report['score']['p5'], report['score']['p95'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core import RoadFighterGame
+from src.gym_env import RacingGameEnv
+
+
+def rollout(fast_forward, steps=3000, **env_kwargs):
+    env = RacingGameEnv(frame_skip=8, fast_forward=fast_forward, **env_kwargs)
+    env.reset(seed=4)
+    actions = np.random.default_rng(2).choice([0, 0, 0, 3, 1, 2], size=steps)
+    trace = []
+    for action in actions:
+        obs, reward, terminated, _, info = env.step(int(action))
+        trace.append((obs, reward, terminated, info.get('end_reason')))
+        if terminated:
+            env.reset()
+    return trace
+
+
+class TestFastForward(unittest.TestCase):
+    def assert_same_trace(self, exact, fast):
+        for (obs_a, reward_a, done_a, end_a), (obs_b, reward_b, done_b, end_b) in zip(exact, fast):
+            np.testing.assert_allclose(obs_b, obs_a, atol=1e-6)
+            self.assertAlmostEqual(reward_b, reward_a, places=9)
+            self.assertEqual((done_b, end_b), (done_a, end_a))
+
+    def test_rewards_and_observations_unchanged(self):
+        """Fast-forward gives the same race as frame-by-frame stepping"""
+        self.assert_same_trace(rollout(False), rollout(True))
+
+    def test_unchanged_with_traffic_schedule(self):
+        """Scheduled spawns are not jumped over"""
+        self.assert_same_trace(rollout(False, scheduled_traffic=True), rollout(True, scheduled_traffic=True))
+
+    def test_race_start_is_skipped(self):
+        """Before the first spawn, whole frame-skip steps are one closed-form jump"""
+        game = RoadFighterGame(seed=0)
+        game.fast_forward = True
+        frames = []
+        game._frame = lambda *args, frame=game._frame: frames.append(1) or frame(*args)
+        game.step_n(8, False, False, False)
+        self.assertEqual(frames, [])
+        self.assertAlmostEqual(game.elapsed_time, 8 / 60.0)
+        self.assertGreater(game.distance_traveled, 0.0)
+
+    def test_lateral_input_is_never_skipped(self):
+        """Lane changes run frame by frame"""
+        game = RoadFighterGame(seed=0)
+        game.fast_forward = True
+        game.step_n(8, True, False, False)
+        self.assertNotEqual(game.player.x, RoadFighterGame(seed=0).player.x)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core import RoadFighterGame
+from src.gym_env import RacingGameEnv
+from src.entities import OpponentCar
+
+
+def reference_step(game, action, frame_skip):
+    """Original per-frame env loop: one get_state and info per inner frame"""
+    left, right, brake = action == 1, action == 2, action == 3
+    total_reward = 0.0
+    state, info, done = None, {}, False
+    for _ in range(frame_skip):
+        state, reward, done, info = game.step(left, right, brake)
+        if game.player.is_changing_lane:
+            reward -= 0.05
+        total_reward += reward
+        if done:
+            if game.end_reason == 'collision':
+                reward -= 100.0
+            elif game.end_reason == 'victory':
+                reward += 100.0
+            total_reward += reward
+            break
+    return state, total_reward, done, info
+
+
+class TestFusedFrameSkip(unittest.TestCase):
+    def run_reference(self, seed, actions, frame_skip):
+        game = RoadFighterGame(seed=seed)
+        results = []
+        for action in actions:
+            results.append(reference_step(game, action, frame_skip))
+            if results[-1][2]:
+                break
+        return results
+
+    def test_env_matches_per_frame_loop(self):
+        """step_n gives the same observations, rewards and infos as stepping frame by frame"""
+        rng = np.random.default_rng(0)
+        actions = [int(a) for a in rng.integers(0, 4, size=1500)]
+        expected = self.run_reference(11, actions, 8)
+
+        env = RacingGameEnv(frame_skip=8)
+        env.reset(seed=11)
+        for action, (state, reward, done, info) in zip(actions, expected):
+            obs, env_reward, terminated, _, env_info = env.step(action)
+            np.testing.assert_allclose(obs, np.array(state, dtype=np.float32), atol=1e-6)
+            self.assertAlmostEqual(env_reward, reward, places=6)
+            self.assertEqual(terminated, done)
+            self.assertEqual(env_info, info)
+        self.assertTrue(expected[-1][2], "race should finish within the action budget")
+
+    def test_stops_on_terminal_frame(self):
+        """A collision mid-skip ends the loop and keeps that frame's reward for shaping"""
+        game = RoadFighterGame()
+        car = OpponentCar(game.player.current_lane, 0, 0, force_type='green')
+        car.x, car.y = game.player.x, game.player.y - 10
+        game.opponents.append(car)
+
+        _, reward, done, info = game.step_n(8, False, False, False)
+
+        self.assertTrue(done)
+        self.assertEqual(info['end_reason'], 'collision')
+        self.assertAlmostEqual(game.elapsed_time, 1 / 60.0)
+        self.assertEqual(game.last_frame_reward, reward)
+        self.assertLess(reward, -4.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+import subprocess
+import sys
+import os
+
+GAME_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(GAME_DIR)
+
+from src.entities import PlayerCar, OpponentCar
+from src.core import RoadFighterGame
+from src.constants import PLAYER_START_X, PLAYER_Y, PLAYER_WIDTH, PLAYER_HEIGHT
+
+
+class TestHeadlessCore(unittest.TestCase):
+    def test_core_runs_without_pygame(self):
+        """Core, entities and the gym env import and step with pygame unavailable"""
+        script = (
+            "import sys; sys.modules['pygame'] = None\n"
+            "from src.gym_env import RacingGameEnv\n"
+            "env = RacingGameEnv()\n"
+            "env.reset()\n"
+            "for _ in range(50): env.step(0)\n"
+            "env.close()\n"
+        )
+        result = subprocess.run([sys.executable, "-c", script], cwd=GAME_DIR,
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+    def test_aabb_overlap(self):
+        """Float AABB test: overlapping, touching and separated boxes"""
+        player = PlayerCar(PLAYER_START_X, PLAYER_Y)
+        car = OpponentCar(1, 0, 0, force_type='green')
+
+        car.x, car.y = player.x + PLAYER_WIDTH - 0.5, player.y + PLAYER_HEIGHT - 0.5
+        self.assertTrue(player.overlaps(car))
+        self.assertTrue(car.overlaps(player))
+
+        # Edges touching is not a collision
+        car.x, car.y = player.x + PLAYER_WIDTH, player.y
+        self.assertFalse(player.overlaps(car))
+        car.x, car.y = player.x, player.y - car.height
+        self.assertFalse(player.overlaps(car))
+
+    def test_collision_detected_in_engine(self):
+        """A car sitting on the player ends the race"""
+        game = RoadFighterGame()
+        car = OpponentCar(game.player.current_lane, 0, 0, force_type='green')
+        car.x, car.y = game.player.x, game.player.y - 10
+        game.opponents.append(car)
+        game.update(1 / 60.0, False, False, False)
+        self.assertTrue(game.game_over)
+        self.assertEqual(game.end_reason, 'collision')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import sys
+import os
+import threading
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from stable_baselines3 import PPO
+from src.gym_env import RacingGameEnv
+from src.inference import InferenceServer, evaluate_episodes
+
+
+class TestInferenceServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.model = PPO("MlpPolicy", RacingGameEnv(), seed=0)
+
+    def test_batches_requests_from_several_clients(self):
+        server = InferenceServer(self.model, [3, 2], max_latency=0.5).start()
+        try:
+            rng = np.random.default_rng(0)
+            obs = [rng.uniform(-1, 1, size=(3, 32)).astype(np.float32),
+                   rng.uniform(-1, 1, size=(2, 32)).astype(np.float32)]
+            actions = [None, None]
+
+            def ask(c):
+                actions[c] = server.clients[c].act(obs[c])
+
+            threads = [threading.Thread(target=ask, args=(c,)) for c in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=10)
+            for c in range(2):
+                expected, _ = self.model.predict(obs[c], deterministic=True)
+                np.testing.assert_array_equal(actions[c], expected)
+            # Both clients were answered by one forward pass
+            self.assertEqual(server.batches, 1)
+            self.assertEqual(server.rows, 5)
+            # A partial request only uses its first rows
+            np.testing.assert_array_equal(
+                server.clients[0].act(obs[0][:1]), self.model.predict(obs[0][:1], deterministic=True)[0])
+        finally:
+            for client in server.clients:
+                client.close()
+            server.close()
+
+    def test_evaluate_episodes_matches_sequential_play(self):
+        seeds = [4, 9, 4]
+        infos = evaluate_episodes(self.model, seeds, num_workers=2, envs_per_worker=2,
+                                  env_kwargs={'frame_skip': 8})
+        self.assertEqual([info['seed'] for info in infos], seeds)
+        for seed, info in zip(seeds[:2], infos[:2]):
+            env = RacingGameEnv(frame_skip=8)
+            obs, _ = env.reset(seed=seed)
+            total, length, done = 0.0, 0, False
+            while not done:
+                action, _ = self.model.predict(obs, deterministic=True)
+                obs, reward, done, _, final = env.step(int(action))
+                total += reward
+                length += 1
+            self.assertEqual(info['length'], length)
+            self.assertAlmostEqual(info['reward'], total, places=4)
+            self.assertEqual(info['end_reason'], final['end_reason'])
+            self.assertEqual(info['collision_car_type'], env.game.collision_car_type)
+        self.assertEqual(infos[2]['reward'], infos[0]['reward'])
+
+
+if __name__ == '__main__':
+    unittest.main()
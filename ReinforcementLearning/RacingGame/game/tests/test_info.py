@@ -0,0 +1,97 @@
+import unittest
+import sys
+import os
+import pickle
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from stable_baselines3.common.env_util import make_vec_env
+from src.core import RoadFighterGame
+from src.gym_env import RacingGameEnv
+from src.info import StepInfo
+
+
+class TestStepInfo(unittest.TestCase):
+    def test_reads_like_the_old_dict(self):
+        game = RoadFighterGame(seed=0)
+        game.green_cars_passed = 2
+        _, _, _, info = game.step_n(4, False, False, False)
+        self.assertIsInstance(info, StepInfo)
+        self.assertEqual(info, {
+            'victory': False, 'distance': game.distance_traveled, 'score': game.score,
+            'end_reason': None, 'cars_passed': {'green': 2, 'yellow': 0, 'red': 0},
+        })
+        self.assertIsNone(info.get('episode'))
+        with self.assertRaises(KeyError):
+            info['episode']
+
+    def test_values_are_frozen_at_step_end(self):
+        game = RoadFighterGame(seed=0)
+        info = game.step_n(4, False, False, False)[3]
+        distance = info['distance']
+        game.step_n(4, False, False, False)
+        self.assertEqual(info['distance'], distance)
+
+    def test_wrapper_keys_and_pickling(self):
+        info = RoadFighterGame(seed=0).step(False, False, False)[3]
+        info['episode'] = {'r': 1.0}
+        info['score'] = 7
+        self.assertEqual(info['episode'], {'r': 1.0})
+        self.assertEqual(info.copy()['score'], 7)
+        self.assertEqual(pickle.loads(pickle.dumps(info)), info)
+        del info['episode']
+        self.assertNotIn('episode', info)
+
+    def test_engine_keys_can_be_deleted(self):
+        """del and pop work on engine keys as on a dict"""
+        info = RoadFighterGame(seed=0).step(False, False, False)[3]
+        score = info['score']
+        self.assertEqual(info.pop('score'), score)
+        self.assertNotIn('score', info)
+        self.assertIsNone(info.get('score'))
+        with self.assertRaises(KeyError):
+            del info['score']
+        del info['cars_passed']
+        self.assertEqual(list(info), ['victory', 'distance', 'end_reason'])
+        self.assertEqual(len(info), 3)
+        self.assertEqual(pickle.loads(pickle.dumps(info)), info)
+        info['score'] = 1
+        self.assertEqual(info.to_dict(), {'victory': False, 'distance': info['distance'],
+                                          'score': 1, 'end_reason': None})
+
+    def test_env_returns_dict_on_episode_end(self):
+        env = RacingGameEnv(frame_skip=8)
+        env.reset(seed=0)
+        terminated = False
+        while not terminated:
+            _, _, terminated, _, info = env.step(0)
+        self.assertIs(type(info), dict)
+        self.assertIn(info['end_reason'], ('collision', 'timeout', 'victory'))
+
+    def test_obs_buffer_reuse(self):
+        env = RacingGameEnv(frame_skip=8, copy_obs=False)
+        first, _ = env.reset(seed=0)
+        second = env.step(0)[0]
+        self.assertIs(first, second)
+        copying = RacingGameEnv(frame_skip=8)
+        obs, _ = copying.reset(seed=0)
+        self.assertIsNot(obs, copying.step(0)[0])
+
+    def test_dummy_vec_env_terminal_observation(self):
+        """The auto-reset after a race's last step leaves its terminal_observation intact"""
+        vec_env = make_vec_env(lambda: RacingGameEnv(frame_skip=8, copy_obs=False), n_envs=1, seed=3)
+        ref = RacingGameEnv(frame_skip=8)
+        vec_env.reset()
+        ref.reset(seed=3)
+        done = False
+        while not done:
+            _, _, dones, infos = vec_env.step([0])
+            ref_obs, _, done, _, _ = ref.step(0)
+            self.assertEqual(bool(dones[0]), done)
+        np.testing.assert_array_equal(infos[0]['terminal_observation'], ref_obs)
+        self.assertFalse(np.array_equal(infos[0]['terminal_observation'], vec_env.buf_obs[None][0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
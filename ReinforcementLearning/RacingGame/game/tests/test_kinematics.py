@@ -0,0 +1,90 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core import RoadFighterGame
+from src.entities import OpponentCar, PlayerCar
+from src.gym_env import RacingGameEnv
+from src.kinematics import x_after, first_contact
+from src.constants import *
+
+
+def integrate(car, frames, mult):
+    """Per-frame reference: (x, direction) after each frame"""
+    path = []
+    for _ in range(frames):
+        car.y = 0.0  # Stay on screen (off-screen cars stop updating)
+        car.update(1 / 60.0, 0, mult)
+        path.append((car.x, car.movement_direction))
+    return path
+
+
+def rollout(macro_steps, steps=2500, seed=4):
+    env = RacingGameEnv(frame_skip=8, macro_steps=macro_steps)
+    env.reset(seed=seed)
+    actions = np.random.default_rng(seed).choice([0, 0, 0, 0, 3, 1, 2], size=steps)
+    trace = []
+    for action in actions:
+        obs, reward, terminated, _, info = env.step(int(action))
+        trace.append((obs, reward, terminated, info['score'], info['cars_passed']))
+        if terminated:
+            env.reset()
+    return trace
+
+
+class TestKinematics(unittest.TestCase):
+    def test_paths_match_per_frame_updates(self):
+        """Closed-form x and direction agree with OpponentCar.update for every frame count"""
+        for car_type in ('green', 'yellow', 'red'):
+            for lane in range(NUM_LANES):
+                for side in (-1, 1):
+                    for mult in (1.0, 1.4, 2.0):
+                        car = OpponentCar(lane, force_type=car_type, side=side)
+                        car.x += 7.3 if car_type == 'red' else 0.0
+                        twin = OpponentCar(lane, force_type=car_type, side=side)
+                        twin.x = car.x
+                        reference = integrate(twin, 400, mult)
+                        for frames in (1, 2, 17, 60, 151, 400):
+                            x, direction = x_after(car, frames, mult)
+                            self.assertAlmostEqual(x, reference[frames - 1][0], places=6)
+                            self.assertEqual(direction, reference[frames - 1][1])
+
+    def test_swept_contact_catches_thin_overlaps(self):
+        """A car that only grazes the player between two sampled frames is still reported"""
+        player = PlayerCar(PLAYER_START_X, PLAYER_Y)
+        car = OpponentCar(0, force_type='red', side=1)
+        car.x = player.x - OPPONENT_WIDTH - 1.0
+        car.y = player.y - OPPONENT_HEIGHT - 30.0
+        contact = first_contact(player, car, 60, 2.0)
+        self.assertIsNotNone(contact)
+        self.assertLess(contact, 60)
+        # A car in a far lane never touches
+        car = OpponentCar(3, force_type='green')
+        self.assertIsNone(first_contact(player, car, 600, 2.0))
+
+    def test_macro_steps_match_frame_by_frame(self):
+        """Races stepped with macro steps give the same observations, rewards and score"""
+        for seed in (4, 9):
+            exact, macro = rollout(False, seed=seed), rollout(True, seed=seed)
+            for (obs_a, reward_a, done_a, score_a, passed_a), (obs_b, reward_b, done_b, score_b, passed_b) in zip(exact, macro):
+                np.testing.assert_allclose(obs_b, obs_a, atol=1e-5)
+                self.assertAlmostEqual(reward_b, reward_a, places=6)
+                self.assertEqual((done_b, score_b, passed_b), (done_a, score_a, passed_a))
+
+    def test_macro_step_skips_frames_in_traffic(self):
+        """With cars on the road but none near, a whole decision is one closed-form step"""
+        game = RoadFighterGame(seed=0)
+        game.macro_steps = True
+        game._add_opponent(OpponentCar(3, y_offset=300, force_type='yellow', side=-1))
+        frames = []
+        game._frame = lambda *args, frame=game._frame: frames.append(1) or frame(*args)
+        game.step_n(8, False, False, False)
+        self.assertEqual(frames, [])
+        self.assertAlmostEqual(game.opponents[0].y, 200 + 8 * 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core import RoadFighterGame
+from src.entities import OpponentCar
+from src.gym_env import RacingGameEnv
+from src.observation import ObservationBuilder, OBS_SIZE
+from src.rng import BlockRandom
+from src.constants import *
+
+
+def reference_state(game):
+    """Original list-based State V3 construction"""
+    player = game.player
+    mult = game._get_speed_multiplier()
+    state = [
+        player.x / SCREEN_WIDTH,
+        player.velocity_y / PLAYER_MAX_SPEED,
+        player.current_lane / (NUM_LANES - 1),
+        1.0 if player.is_changing_lane else 0.0,
+        game.time_remaining / RACE_TIME_LIMIT,
+        min(game.distance_traveled / TARGET_DISTANCE, 1.0),
+        mult / 2.0,
+    ]
+    opp_data = []
+    for opp in game.opponents:
+        if not opp.active:
+            continue
+        dx = (opp.x - player.x) / SCREEN_WIDTH
+        dy = (opp.y - player.y) / SCREEN_HEIGHT
+        type_val = {'green': 0.0, 'yellow': 0.5, 'red': 1.0}[opp.car_type]
+        opp_data.append((dx * dx + dy * dy, [dx, dy, type_val, float(opp.movement_direction), (120 * mult) / 300.0]))
+    opp_data.sort(key=lambda item: item[0])
+    for i in range(5):
+        state.extend(opp_data[i][1] if i < len(opp_data) else [0.0, -2.0, 0.0, 0.0, 0.0])
+    return state
+
+
+class TestObservationBuilder(unittest.TestCase):
+    def test_matches_reference_with_crowded_road(self):
+        """Buffer contents equal the list-based State V3, including k-nearest ordering"""
+        rng = BlockRandom(7)
+        game = RoadFighterGame()
+        for i in range(9):
+            car = OpponentCar(rng.randint(0, NUM_LANES - 1), 0, 0, rng=rng)
+            car.y = -100 + 95 * i + rng.random()
+            game.opponents.append(car)
+
+        out = np.zeros(OBS_SIZE, dtype=np.float32)
+        ObservationBuilder().write(game, out)
+        np.testing.assert_allclose(out, np.array(reference_state(game), dtype=np.float32), atol=1e-6)
+
+    def test_padding_when_road_is_empty(self):
+        """Empty neighbor slots use the far-away padding"""
+        game = RoadFighterGame()
+        out = np.full(OBS_SIZE, 9.0, dtype=np.float32)
+        game.write_state(out)
+        np.testing.assert_array_equal(out[7:].reshape(5, 5), np.tile([0.0, -2.0, 0.0, 0.0, 0.0], (5, 1)))
+
+    def test_env_writes_into_persistent_buffer(self):
+        """RacingGameEnv fills its own float32 buffer and returns copies of it"""
+        env = RacingGameEnv()
+        obs, _ = env.reset()
+        buffer = env._obs
+        for _ in range(30):
+            obs, _, terminated, _, _ = env.step(0)
+            if terminated:
+                break
+        self.assertIs(env._obs, buffer)
+        self.assertEqual(obs.dtype, np.float32)
+        np.testing.assert_array_equal(obs, buffer)
+        self.assertIsNot(obs, buffer)
+        np.testing.assert_allclose(obs, np.array(reference_state(env.game), dtype=np.float32), atol=1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
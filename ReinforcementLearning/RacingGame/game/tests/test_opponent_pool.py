@@ -0,0 +1,60 @@
+import unittest
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core import RoadFighterGame
+from src.entities import OpponentCar, PlayerCar
+from src.constants import OPPONENT_DESPAWN_Y, OPPONENT_POOL_SIZE
+
+
+class TestOpponentPool(unittest.TestCase):
+    def test_cars_use_slots(self):
+        """Cars have no per-instance __dict__ and carry an explicit passed flag"""
+        car = OpponentCar(1, 0, 0, force_type='red')
+        self.assertFalse(hasattr(car, '__dict__'))
+        self.assertFalse(hasattr(PlayerCar(0, 0), '__dict__'))
+        self.assertFalse(car.passed_counted)
+        with self.assertRaises(AttributeError):
+            car.unknown_attribute = 1
+
+    def test_cull_swap_removes_and_recycles(self):
+        """Off-screen cars leave the list in place and their slots get reused"""
+        game = RoadFighterGame()
+        game.spawn_interval = 1e9
+        game._free_opponents.clear()  # Pretend every slot is on the road
+        cars = [OpponentCar(lane, 0, 0, force_type='green') for lane in range(4)]
+        for i, car in enumerate(cars):
+            car.y = 100.0 * i
+        cars[1].y = OPPONENT_DESPAWN_Y - 0.5
+        game.opponents.extend(cars)
+        opponents = game.opponents
+        game.player.x = 0  # Out of the way of every lane
+
+        game.update(1 / 60.0, False, False, False)
+
+        self.assertIs(game.opponents, opponents)
+        self.assertEqual(len(game.opponents), 3)
+        self.assertNotIn(cars[1], game.opponents)
+        self.assertIs(game._free_opponents[-1], cars[1])
+
+        reused = game._new_opponent(2, 0, force_type='yellow')
+        self.assertIs(reused, cars[1])
+        self.assertEqual(reused.car_type, 'yellow')
+        self.assertEqual(reused.y, -reused.height)
+        self.assertFalse(reused.passed_counted)
+
+    def test_pool_size_is_bounded(self):
+        """Long runs never allocate past the pool, and reset returns every slot"""
+        game = RoadFighterGame(seed=5)
+        for _ in range(3):
+            while not game.game_over:
+                game.step_n(8, False, False, False)
+            self.assertLessEqual(len(game._free_opponents), OPPONENT_POOL_SIZE)
+            game.reset()
+            self.assertEqual(game.opponents, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
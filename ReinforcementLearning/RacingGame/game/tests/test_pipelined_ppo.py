@@ -0,0 +1,139 @@
+import unittest
+import sys
+import os
+import tempfile
+import numpy as np
+import torch as th
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from stable_baselines3.common.callbacks import BaseCallback, CallbackList
+from stable_baselines3.common.env_util import make_vec_env
+from src.gym_env import RacingGameEnv
+from src.env_pool import AsyncEnvPool
+from src.pipelined_ppo import PipelinedPPO
+from src.async_eval import AsyncEvaluator, AsyncEvalCallback
+
+
+class RolloutCounter(BaseCallback):
+    """Counts finished rollouts"""
+
+    def __init__(self):
+        super().__init__()
+        self.rollouts = 0
+
+    def _on_step(self):
+        return True
+
+    def _on_rollout_end(self):
+        self.rollouts += 1
+
+
+def make_model(env, **kwargs):
+    return PipelinedPPO("MlpPolicy", env, n_steps=32, batch_size=32, n_epochs=2, seed=0, **kwargs)
+
+
+class TestPipelinedPPO(unittest.TestCase):
+    def test_pipelined_learn_counts_steps_and_overlap(self):
+        env = make_vec_env(RacingGameEnv, n_envs=2, env_kwargs={'frame_skip': 8})
+        model = make_model(env, pipelined=True)
+        counter = RolloutCounter()
+        model.learn(total_timesteps=256, callback=counter)
+        # Same number of rollouts and updates as plain PPO
+        self.assertEqual(model.num_timesteps, 256)
+        self.assertEqual(counter.rollouts, 4)
+        self.assertEqual(model._n_updates, 4 * 2)
+        self.assertGreater(model.env_seconds, 0.0)
+        self.assertGreater(model.learner_seconds, 0.0)
+        self.assertGreaterEqual(model.overlap_seconds, 0.0)
+        self.assertLessEqual(model.overlap_seconds, min(model.env_seconds, model.learner_seconds))
+        env.close()
+
+    def test_pipelined_learn_over_async_pool(self):
+        env = AsyncEnvPool(4, batch_size=2, num_workers=2, env_kwargs={'frame_skip': 8})
+        try:
+            model = make_model(env, pipelined=True)
+            model.learn(total_timesteps=256)
+            self.assertEqual(model.num_timesteps, 256)
+            self.assertEqual(model._n_updates, 2 * 2)
+        finally:
+            env.close()
+
+    def test_callbacks_see_the_acting_policy(self):
+        """AsyncEvalCallback publishes the behaviour copy, never the policy train() is updating"""
+        env = make_vec_env(RacingGameEnv, n_envs=2, env_kwargs={'frame_skip': 8})
+        model = make_model(env, pipelined=True)
+        evaluator = AsyncEvaluator(model.policy, n_episodes=2, frame_skip=8)
+        published = []
+        publish = evaluator.publish
+
+        def spy(policy, num_timesteps):
+            published.append((policy, num_timesteps))
+            return publish(policy, num_timesteps)
+
+        evaluator.publish = spy
+        try:
+            callback = AsyncEvalCallback(evaluator, eval_freq=8, verbose=0)
+            model.learn(total_timesteps=256, callback=callback)
+            self.assertEqual(model.num_timesteps, 256)
+            self.assertGreater(len(published), 0)
+            for policy, num_timesteps in published:
+                self.assertIsNot(policy, model.policy)
+                # After the first rollout, steps are merged only once the collector is joined
+                self.assertTrue(num_timesteps <= 64 or num_timesteps % 64 == 0)
+            self.assertIs(model.acting_policy, model.policy)
+        finally:
+            evaluator.close()
+            env.close()
+
+    def test_lag_correction(self):
+        env = make_vec_env(RacingGameEnv, n_envs=2, env_kwargs={'frame_skip': 8})
+        model = make_model(env, pipelined=True)
+        model._setup_learn(64, None)
+        callback = CallbackList([])
+        callback.init_callback(model)
+        model._collect_timed(model.policy, model.rollout_buffer, callback)
+        buffer = model.rollout_buffer
+        advantages = buffer.advantages.copy()
+        behaviour_log_probs = buffer.log_probs.copy()
+
+        # 1. Unchanged policy: weights of one, same advantages
+        weights = model._correct_lag(buffer)
+        np.testing.assert_allclose(weights, 1.0, atol=1e-5)
+        np.testing.assert_allclose(buffer.advantages, advantages, atol=1e-4)
+
+        # 2. Changed policy: log-probs re-scored, weights truncated ratios
+        buffer.log_probs = behaviour_log_probs.copy()
+        with th.no_grad():
+            for param in model.policy.action_net.parameters():
+                param.add_(0.5)
+        weights = model._correct_lag(buffer)
+        obs = th.as_tensor(buffer.observations.reshape(-1, 32))
+        actions = th.as_tensor(buffer.actions.reshape(-1)).long()
+        with th.no_grad():
+            _, log_probs, _ = model.policy.evaluate_actions(obs, actions)
+        log_probs = log_probs.numpy().reshape(buffer.log_probs.shape)
+        np.testing.assert_allclose(buffer.log_probs, log_probs, atol=1e-5)
+        np.testing.assert_allclose(weights, np.minimum(np.exp(log_probs - behaviour_log_probs), 1.0), rtol=1e-5)
+        self.assertLess(weights.min(), 1.0)
+        env.close()
+
+    def test_save_load_and_opt_out(self):
+        env = make_vec_env(RacingGameEnv, n_envs=2, env_kwargs={'frame_skip': 8})
+        model = make_model(env)
+        self.assertFalse(model.pipelined)
+        model.learn(total_timesteps=64)
+        self.assertEqual(model.num_timesteps, 64)
+        self.assertEqual(model.learner_seconds, 0.0)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "model")
+            model.save(path)
+            loaded = PipelinedPPO.load(path, env=env, pipelined=True)
+            self.assertTrue(loaded.pipelined)
+            loaded.learn(total_timesteps=64)
+            self.assertEqual(loaded.num_timesteps, 64)
+        env.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
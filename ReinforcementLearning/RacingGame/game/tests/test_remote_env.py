@@ -0,0 +1,140 @@
+import unittest
+import sys
+import os
+import json
+import socket
+import tempfile
+import threading
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.gym_env import RacingGameEnv
+from src.observation import OBS_SIZE
+from src.remote_env import (EnvServer, RemoteVecEnv, HELLO, CMD_HELLO, CMD_CALL, CMD_ERROR,
+                            CMD_CLOSE, CMD_SHUTDOWN, _recv, _send)
+
+
+def _failing_server(listener):
+    """One-race server that answers CALL with None and every RESET/STEP with ERROR"""
+    conn, _ = listener.accept()
+    with conn, listener:
+        while True:
+            try:
+                command, payload = _recv(conn)
+            except ConnectionError:
+                return
+            if command == CMD_HELLO:
+                _send(conn, CMD_HELLO, HELLO.pack(1, OBS_SIZE))
+            elif command == CMD_CALL:
+                indices = json.loads(bytes(payload))['indices']
+                _send(conn, CMD_CALL, json.dumps([None] * len(indices)).encode())
+            elif command in (CMD_CLOSE, CMD_SHUTDOWN):
+                return
+            else:
+                _send(conn, CMD_ERROR, b'injected failure')
+
+
+class TestRemoteVecEnv(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.servers = [
+            EnvServer("127.0.0.1:0", 2, num_workers=1, env_kwargs={'frame_skip': 4}),
+            EnvServer("unix:" + os.path.join(cls.tmp.name, "env.sock"), 1, num_workers=1,
+                      env_kwargs={'frame_skip': 4}),
+        ]
+        cls.threads = [threading.Thread(target=s.serve_forever, daemon=True) for s in cls.servers]
+        for thread in cls.threads:
+            thread.start()
+        cls.env = RemoteVecEnv([s.address for s in cls.servers])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.env.shutdown_servers()
+        for thread in cls.threads:
+            thread.join(timeout=10)
+        cls.tmp.cleanup()
+
+    def test_aggregates_servers_and_matches_local_envs(self):
+        self.assertEqual(self.env.num_envs, 3)
+        self.env.seed(21)
+        obs = self.env.reset()
+        refs = [RacingGameEnv(frame_skip=4) for _ in range(3)]
+        np.testing.assert_array_equal(obs, np.stack([ref.reset(seed=21 + i)[0] for i, ref in enumerate(refs)]))
+
+        rng = np.random.default_rng(1)
+        ended = False
+        for _ in range(300):
+            actions = rng.integers(0, 4, size=3)
+            obs, rewards, dones, infos = self.env.step(actions)
+            for i, ref in enumerate(refs):
+                ref_obs, ref_reward, terminated, _, ref_info = ref.step(int(actions[i]))
+                self.assertEqual(bool(dones[i]), terminated)
+                self.assertAlmostEqual(float(rewards[i]), ref_reward, places=4)
+                if terminated:
+                    ended = True
+                    np.testing.assert_array_equal(infos[i]['terminal_observation'], ref_obs)
+                    self.assertEqual(infos[i]['end_reason'], ref_info['end_reason'])
+                    self.assertEqual(infos[i]['cars_passed'], ref_info['cars_passed'])
+                    self.assertIn('episode', infos[i])
+                    ref_obs = ref.reset()[0]
+                else:
+                    self.assertEqual(infos[i], {})
+                np.testing.assert_array_equal(obs[i], ref_obs)
+        self.assertTrue(ended)
+
+    def test_attribute_calls_and_errors(self):
+        self.assertEqual(self.env.get_attr('frame_skip'), [4, 4, 4])
+        self.env.set_attr('frame_skip', 3, indices=[2])
+        self.assertEqual(self.env.get_attr('frame_skip', indices=[1, 2]), [4, 3])
+        self.env.set_attr('frame_skip', 4)
+        with self.assertRaises(RuntimeError):
+            self.env.get_attr('no_such_attribute')
+        # The connection survives an error reply
+        self.assertEqual(self.env.get_attr('render_mode'), [None] * 3)
+
+    def test_calls_outside_the_whitelist_are_refused(self):
+        with self.assertRaises(RuntimeError):
+            self.env.env_method('close')
+        with self.assertRaises(RuntimeError):
+            self.env.set_attr('game', None)
+        self.assertEqual(self.env.get_attr('frame_skip'), [4, 4, 4])
+
+    def test_reset_options_are_rejected(self):
+        self.env.set_options({'traffic_schedule': None})
+        with self.assertRaises(ValueError):
+            self.env.reset()
+        self.env.set_options(None)
+
+
+class TestRemoteErrors(unittest.TestCase):
+    def test_every_reply_is_read_before_raising(self):
+        """An ERROR from the first server leaves the others' replies drained"""
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(1)
+        fake = threading.Thread(target=_failing_server, args=(listener,), daemon=True)
+        fake.start()
+        server = EnvServer("127.0.0.1:0", 1, num_workers=1, env_kwargs={'frame_skip': 4})
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        host, port = listener.getsockname()
+        env = RemoteVecEnv([f"{host}:{port}", server.address])
+        try:
+            with self.assertRaises(RuntimeError):
+                env.reset()
+            with self.assertRaises(RuntimeError):
+                env.step(np.zeros(2, dtype=np.int64))
+            with self.assertRaises(RuntimeError):
+                env.get_attr('no_such_attribute')
+            # The real server's connection is still in step with its requests
+            self.assertEqual(env.get_attr('frame_skip', indices=[1]), [4])
+        finally:
+            env.shutdown_servers()
+            fake.join(timeout=10)
+            thread.join(timeout=10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+import sys
+import os
+import threading
+import torch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from stable_baselines3 import PPO
+from src.batched_env import BatchedRoadFighter
+from src.shm_vec_env import SharedMemoryVecEnv
+from src.resources import plan_resources, apply_plan, available_cpus, ResourcePlanCallback, _pin_threads
+
+
+class ThreadRecorder(ResourcePlanCallback):
+    """Records the torch thread count seen at every rollout step"""
+
+    def __init__(self, plan):
+        super().__init__(plan)
+        self.seen = []
+
+    def _on_step(self):
+        self.seen.append(torch.get_num_threads())
+        return True
+
+
+class TestResourcePlan(unittest.TestCase):
+    def setUp(self):
+        self.threads = torch.get_num_threads()
+        self.cpus = available_cpus()
+
+    def tearDown(self):
+        torch.set_num_threads(self.threads)
+        if hasattr(os, "sched_setaffinity"):
+            _pin_threads(self.cpus)
+
+    def test_alternating_phases_share_cores(self):
+        plan = plan_resources(num_workers=6, cpus=range(8))
+        self.assertEqual(plan.learner_cpus, list(range(8)))
+        self.assertEqual(plan.train_threads, 8)
+        self.assertEqual(plan.collect_threads, 1)
+        # Workers keep off core 0, one core each
+        self.assertEqual(plan.worker_cpus, [[1], [2], [3], [4], [5], [6]])
+        self.assertEqual(plan.describe(),
+                         "8 cores: learner on 0-7 (8 train / 1 rollout threads), 6 env workers on cores 1-6")
+
+    def test_pipelined_split_is_disjoint(self):
+        plan = plan_resources(num_workers=5, pipelined=True, cpus=range(8))
+        self.assertEqual(plan.learner_cpus, [5, 6, 7])
+        self.assertEqual(plan.worker_cpus, [[0], [1], [2], [3], [4]])
+        self.assertEqual(plan.train_threads, 2)
+        # More workers than cores: they share, the learner keeps one core
+        plan = plan_resources(num_workers=12, pipelined=True, cpus=range(4))
+        self.assertEqual(plan.learner_cpus, [3])
+        self.assertEqual([cpus[0] for cpus in plan.worker_cpus], [0, 1, 2] * 4)
+        self.assertEqual(plan.train_threads, 1)
+        # In-process envs: the collector thread gets a core
+        self.assertEqual(plan_resources(0, pipelined=True, cpus=range(4)).train_threads, 3)
+        self.assertEqual(plan_resources(0, pipelined=True, learner_threads=2, cpus=range(4)).train_threads, 2)
+        self.assertEqual(plan_resources(2, cpus=[0]).worker_cpus, [[0], [0]])
+
+    @unittest.skipUnless(hasattr(os, "sched_setaffinity"), "CPU affinity unsupported")
+    def test_apply_pins_workers_and_learner(self):
+        env = SharedMemoryVecEnv(2, num_workers=2, env_kwargs={'frame_skip': 8})
+        try:
+            plan = plan_resources(num_workers=len(env.worker_pids))
+            self.assertTrue(apply_plan(plan, env))
+            self.assertEqual(torch.get_num_threads(), plan.train_threads)
+            self.assertEqual(sorted(os.sched_getaffinity(0)), plan.learner_cpus)
+            for pid, cpus in zip(env.worker_pids, plan.worker_cpus):
+                self.assertEqual(sorted(os.sched_getaffinity(pid)), cpus)
+            env.reset()
+        finally:
+            env.close()
+
+    @unittest.skipUnless(os.path.isdir("/proc/self/task"), "no per-thread affinity")
+    def test_apply_pins_running_threads(self):
+        """Threads started before apply_plan are pinned too, not only the caller"""
+        release = threading.Event()
+        thread = threading.Thread(target=release.wait)
+        thread.start()
+        try:
+            plan = plan_resources(0, cpus=self.cpus[-1:])
+            self.assertTrue(apply_plan(plan))
+            self.assertEqual(sorted(os.sched_getaffinity(thread.native_id)), plan.learner_cpus)
+            self.assertEqual(sorted(os.sched_getaffinity(0)), plan.learner_cpus)
+        finally:
+            release.set()
+            thread.join()
+
+    def test_callback_switches_threads_and_times_phases(self):
+        plan = plan_resources(0, learner_threads=2)
+        env = BatchedRoadFighter(2, frame_skip=8)
+        model = PPO("MlpPolicy", env, n_steps=32, batch_size=32, n_epochs=1, seed=0)
+        callback = ThreadRecorder(plan)
+        model.learn(total_timesteps=128, callback=callback)
+        self.assertEqual(set(callback.seen), {plan.collect_threads})
+        self.assertEqual(torch.get_num_threads(), plan.train_threads)
+        self.assertGreater(callback.rollout_seconds, 0.0)
+        self.assertGreater(callback.update_seconds, 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
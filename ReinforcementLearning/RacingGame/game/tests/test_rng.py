@@ -0,0 +1,59 @@
+import unittest
+import sys
+import os
+import random
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core import RoadFighterGame
+from src.gym_env import RacingGameEnv
+from src.rng import BlockRandom
+
+
+def rollout(env, seed, steps=400):
+    obs, _ = env.reset(seed=seed)
+    trace = [obs]
+    for t in range(steps):
+        obs, _, terminated, _, _ = env.step(t % 4)
+        trace.append(obs)
+        if terminated:
+            obs, _ = env.reset()
+    return np.array(trace)
+
+
+class TestEngineRng(unittest.TestCase):
+    def test_block_random_ranges(self):
+        """random/randint/choice stay in range and cover every outcome"""
+        rng = BlockRandom(0)
+        draws = [rng.random() for _ in range(1000)]
+        self.assertTrue(all(0.0 <= u < 1.0 for u in draws))
+        self.assertEqual({rng.randint(0, 3) for _ in range(1000)}, {0, 1, 2, 3})
+        self.assertEqual({rng.choice((-1, 1)) for _ in range(100)}, {-1, 1})
+
+    def test_reset_seed_reproduces_traffic(self):
+        """reset(seed) replays the same race; other seeds give other traffic"""
+        first = rollout(RacingGameEnv(frame_skip=8), seed=3)
+        second = rollout(RacingGameEnv(frame_skip=8), seed=3)
+        other = rollout(RacingGameEnv(frame_skip=8), seed=4)
+        np.testing.assert_array_equal(first, second)
+        self.assertFalse(np.array_equal(first, other))
+
+    def test_engines_do_not_share_state(self):
+        """Each engine owns its stream: interleaving and the random module have no effect"""
+        solo = RoadFighterGame(seed=9)
+        for _ in range(200):
+            solo.step_n(8, False, False, False)
+
+        paired = RoadFighterGame(seed=9)
+        noise = RoadFighterGame(seed=10)
+        for _ in range(200):
+            random.random()
+            noise.step_n(8, False, False, False)
+            paired.step_n(8, False, False, False)
+
+        self.assertEqual(paired.get_state(), solo.get_state())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.gym_env import RacingGameEnv
+from src.shm_vec_env import SharedMemoryVecEnv
+from src.shm_worker import _RaceGroup, _layout, _offsets, _attach
+
+
+class TestSharedMemoryVecEnv(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.env = SharedMemoryVecEnv(3, num_workers=2, env_kwargs={'frame_skip': 4})
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.env.close()
+
+    def test_matches_single_envs(self):
+        self.env.seed(11)
+        obs = self.env.reset()
+        refs = [RacingGameEnv(frame_skip=4) for _ in range(3)]
+        ref_obs = np.stack([ref.reset(seed=11 + i)[0] for i, ref in enumerate(refs)])
+        np.testing.assert_array_equal(obs, ref_obs)
+
+        rng = np.random.default_rng(0)
+        for _ in range(60):
+            actions = rng.integers(0, 4, size=3)
+            obs, rewards, dones, infos = self.env.step(actions)
+            for i, ref in enumerate(refs):
+                ref_obs, ref_reward, terminated, _, _ = ref.step(int(actions[i]))
+                self.assertEqual(bool(dones[i]), terminated)
+                self.assertAlmostEqual(float(rewards[i]), ref_reward, places=4)
+                if terminated:
+                    np.testing.assert_array_equal(infos[i]['terminal_observation'], ref_obs)
+                    ref_obs = ref.reset()[0]
+                np.testing.assert_array_equal(obs[i], ref_obs)
+
+    def test_episode_end_info(self):
+        self.env.reset()
+        # Steering into the road edge ends the race by timeout or collision
+        episode_return = np.zeros(3)
+        length = np.zeros(3, dtype=int)
+        for _ in range(2000):
+            obs, rewards, dones, infos = self.env.step(np.full(3, 1))
+            episode_return += rewards
+            length += 1
+            if dones.any():
+                break
+        idx = int(np.flatnonzero(dones)[0])
+        info = infos[idx]
+        self.assertIn(info['end_reason'], ('collision', 'timeout', 'victory'))
+        self.assertEqual(set(info['cars_passed']), {'green', 'yellow', 'red'})
+        self.assertEqual(info['episode']['l'], length[idx])
+        self.assertAlmostEqual(info['episode']['r'], episode_return[idx], places=3)
+        self.assertEqual(info['terminal_observation'].shape, (32,))
+        for i in np.flatnonzero(~dones):
+            self.assertEqual(infos[i], {})
+
+    def test_returned_arrays_are_copies(self):
+        obs = self.env.reset()
+        before = obs.copy()
+        self.env.step(np.zeros(3, dtype=int))
+        np.testing.assert_array_equal(obs, before)
+
+    def test_attribute_calls(self):
+        self.assertEqual(self.env.get_attr('frame_skip'), [4, 4, 4])
+        self.env.set_attr('frame_skip', 2, indices=[2])
+        self.assertEqual(self.env.get_attr('frame_skip', indices=[0, 2]), [4, 2])
+        self.env.set_attr('frame_skip', 4)
+        self.assertEqual(self.env.env_method('_observation', indices=1)[0].shape, (32,))
+        self.assertEqual(self.env.env_is_wrapped(object), [False] * 3)
+
+    def test_worker_errors_are_raised(self):
+        with self.assertRaises(RuntimeError):
+            self.env.get_attr('no_such_attribute')
+        # The worker survives and keeps serving
+        self.assertEqual(self.env.get_attr('render_mode'), [None] * 3)
+
+
+class TestRaceGroup(unittest.TestCase):
+    def test_races_step_into_their_shared_rows(self):
+        """Worker envs write observations into the shared row and return it without a copy"""
+        layout = _layout(2, 1)
+        _, size = _offsets(layout)
+        arrays = _attach(bytearray(size), layout)
+        group = _RaceGroup(arrays, 0, 2, {'frame_skip': 4})
+        for i, env in enumerate(group.envs):
+            obs, _ = env.reset(seed=i)
+            self.assertTrue(np.shares_memory(obs, arrays['obs'][i]))
+            self.assertTrue(np.shares_memory(env.step(0)[0], arrays['obs'][i]))
+        group.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import sys
+import os
+import random
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core import RoadFighterGame
+from src.entities import OpponentCar
+from src.spatial import LaneIndex
+from src.constants import *
+
+
+class TestLaneIndex(unittest.TestCase):
+    def assert_index_consistent(self, game):
+        index = game._lane_index
+        indexed = [opp for bucket in index.lanes for opp in bucket]
+        self.assertEqual(sorted(map(id, indexed)), sorted(map(id, game.opponents)))
+        for lane, bucket in enumerate(index.lanes):
+            ys = [opp.y for opp in bucket]
+            self.assertEqual(ys, sorted(ys))
+            for opp in bucket:
+                self.assertEqual(opp.lane, lane)
+
+    def test_index_tracks_dense_traffic(self):
+        """Spawns, lane changes and despawns keep the buckets complete and sorted"""
+        game = RoadFighterGame(seed=2)
+        game.spawn_interval = 0.3
+        for _ in range(3000):
+            game.player.x = ROAD_LEFT_EDGE  # Hug the left edge
+            game.update(1 / 60.0, False, False, False)
+            if game.game_over:
+                game.reset()
+                game.spawn_interval = 0.3
+            self.assert_index_consistent(game)
+
+    def test_queries_match_brute_force(self):
+        """Spacing and collision answers equal a scan over every opponent"""
+        rng = random.Random(4)
+        game = RoadFighterGame()
+        for _ in range(500):
+            game.opponents = []
+            for _ in range(rng.randint(0, 12)):
+                car = OpponentCar(rng.randrange(NUM_LANES), 0, 0, force_type='green')
+                car.y = rng.uniform(-400, 850)
+                car.x += rng.uniform(-40, 40)
+                game.opponents.append(car)
+            game.player.x = rng.uniform(ROAD_LEFT_EDGE, ROAD_RIGHT_EDGE - PLAYER_WIDTH)
+            index = LaneIndex()
+            index.sync(game.opponents)
+
+            expected = [opp for opp in game.opponents if game.player.overlaps(opp)]
+            hit = index.first_overlap(game.player)
+            if expected:
+                self.assertIn(hit, expected)
+            else:
+                self.assertIsNone(hit)
+
+            y = rng.uniform(-400, 0)
+            spacing_clash = any(abs(opp.y - y) < OPPONENT_MIN_SPACING for opp in game.opponents)
+            self.assertEqual(index.any_within(y, OPPONENT_MIN_SPACING), spacing_clash)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import sys
+import os
+import csv
+import json
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from stable_baselines3 import PPO
+import sweep
+
+
+def write_log(trial_dir, episodes):
+    """A training_log.csv as CSVLoggingCallback writes it, from (reward, distance) pairs"""
+    os.makedirs(trial_dir, exist_ok=True)
+    with open(os.path.join(trial_dir, "training_log.csv"), "w", newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Timestamp", "Step", "EpisodeLen", "Reward", "Distance", "Score", "EndReason",
+                         "Victory", "GreenPassed", "YellowPassed", "RedPassed"])
+        for step, (reward, distance) in enumerate(episodes):
+            writer.writerow(["", step, 1, f"{reward:.2f}", f"{distance:.1f}", 0, "crash", False, 0, 0, 0])
+
+
+class TestSweep(unittest.TestCase):
+    def test_configs_milestones_and_core_shares(self):
+        configs = sweep.sample_configs(5, seed=1)
+        self.assertEqual(len(configs), 5)
+        self.assertEqual(len({tuple(sorted(c.items())) for c in configs}), 5)
+        self.assertEqual([c['seed'] for c in configs], list(range(5)))
+        self.assertEqual(len(sweep.sample_configs(1000)), 54)  # The whole grid
+        self.assertEqual(sweep.milestones(16, 100, 2), [100, 200, 400, 800, 1600])
+        self.assertEqual(sweep.milestones(5, 100, 2), [100, 200, 400])
+        self.assertEqual(sweep.milestones(1, 100, 2), [100])
+        self.assertEqual(sweep.core_shares(3, 8), [3, 3, 2])
+        self.assertEqual(sweep.core_shares(16, 4), [1, 1, 1, 1])
+
+    def test_stats_use_the_last_episodes_and_rank_on_reward_and_distance(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_log(os.path.join(tmp, "a"), [(-100.0, 0.0)] + [(10.0, 500.0)] * 4)
+            stats = sweep.trial_stats(os.path.join(tmp, "a"), window=4)
+            self.assertEqual(stats, {'episodes': 4, 'reward': 10.0, 'distance': 500.0})
+            self.assertEqual(sweep.trial_stats(os.path.join(tmp, "missing"))['episodes'], 0)
+
+        stats = {
+            0: {'reward': 5.0, 'distance': 900.0},
+            1: {'reward': 9.0, 'distance': 800.0},
+            2: {'reward': 1.0, 'distance': 100.0},
+            3: {'reward': None, 'distance': None},
+            4: {'reward': 8.0, 'distance': 950.0},
+        }
+        # Ranks (reward + distance): 4 -> 1+0, 1 -> 0+2, 0 -> 2+1
+        self.assertEqual(sweep.rank_trials(stats), [4, 1, 0, 2, 3])
+
+    def test_sweep_halves_trials_and_resumes_survivors(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            results = sweep.run_sweep(sweep_dir=tmp, num_trials=2, cpus=[0], min_steps=64,
+                                      n_envs=2, n_steps=32)
+            self.assertEqual(results['milestones'], [64, 128])
+            rungs = [len(trial['rungs']) for trial in results['trials']]
+            self.assertEqual(sorted(rungs), [1, 2])
+            best = results['trials'][results['best']['trial']]
+            self.assertEqual([rung['steps'] for rung in best['rungs']], [64, 128])
+            self.assertIsNone(best['eliminated_at'])
+            self.assertTrue(os.path.exists(results['best']['model']))
+            with open(os.path.join(tmp, "sweep_results.json")) as f:
+                self.assertEqual(json.load(f)['best'], results['best'])
+            # The survivor resumed: its model holds every step so far
+            self.assertEqual(PPO.load(results['best']['model']).num_timesteps, 128)
+
+
+if __name__ == '__main__':
+    unittest.main()
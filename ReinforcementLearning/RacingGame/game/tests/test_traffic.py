@@ -0,0 +1,128 @@
+import unittest
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core import RoadFighterGame
+from src.gym_env import RacingGameEnv
+from src.traffic import TrafficSchedule, SINGLE
+from src.config import GameConfig
+from src.constants import *
+
+
+def record_spawns(game):
+    """Wrap the engine's spawn hook to log (time, lane, type) of every new car"""
+    log = []
+    add = game._add_opponent
+
+    def logging_add(car):
+        log.append((round(game.elapsed_time, 6), car.start_lane, car.car_type))
+        add(car)
+
+    game._add_opponent = logging_add
+    return log
+
+
+class TestTrafficSchedule(unittest.TestCase):
+    def test_compile_is_deterministic(self):
+        """Same seed -> same schedule; entries are sorted and well formed"""
+        first = TrafficSchedule.compile(7)
+        self.assertEqual(first.entries, TrafficSchedule.compile(7).entries)
+        self.assertNotEqual(first.entries, TrafficSchedule.compile(8).entries)
+        self.assertEqual(first.times, sorted(first.times))
+        self.assertGreater(len(first), 40)
+        for _, lane, car_type, _, side, _, _ in first.entries:
+            self.assertIn(lane, range(NUM_LANES))
+            self.assertIn(car_type, ('green', 'yellow', 'red'))
+            self.assertIn(side, (-1, 1))
+
+    def test_engine_spawns_schedule_with_spacing(self):
+        """Scheduled cars appear on time, in order, and keep the minimum spacing"""
+        schedule = TrafficSchedule.compile(3)
+        game = RoadFighterGame()
+        game.set_traffic_schedule(schedule)
+        game.reset()
+        log = record_spawns(game)
+        while not game.game_over:
+            game.player.x = 0  # Off the road: no collisions
+            game.lane_camping_mode = False
+            game.update(1 / 60.0, False, False, False)
+            ys = sorted(opp.y for opp in game.opponents)
+            for upper, lower in zip(ys, ys[1:]):
+                self.assertGreaterEqual(lower - upper, OPPONENT_MIN_SPACING - 1e-6)
+
+        expected = [(lane, car_type) for t, lane, car_type, *_ in schedule.entries if t <= game.elapsed_time]
+        self.assertEqual([(lane, car_type) for _, lane, car_type in log], expected)
+        for (time, _, _), entry in zip(log, schedule.entries):
+            self.assertAlmostEqual(time, entry[0], delta=1 / 60.0)
+
+    def test_replay_is_independent_of_policy(self):
+        """Two different policies driving on one schedule meet identical traffic"""
+        schedule = TrafficSchedule.compile(11)
+        logs = []
+        for action in (0, 3):
+            env = RacingGameEnv(frame_skip=8)
+            env.reset(options={'traffic_schedule': schedule})
+            env.game.lane_camping_mode = False
+            log = record_spawns(env.game)
+            for _ in range(150):
+                env.game.player.x = 0
+                env.step(action)
+            logs.append(log)
+        self.assertEqual(logs[0], logs[1])
+        self.assertGreater(len(logs[0]), 5)
+
+    def test_replay_applies_to_one_reset(self):
+        """A schedule given in reset options is not replayed by later resets without one"""
+        schedule = TrafficSchedule.compile(11)
+        env = RacingGameEnv(frame_skip=8)
+        env.reset(options={'traffic_schedule': schedule})
+        self.assertIs(env.game.traffic, schedule)
+        env.reset()
+        self.assertIsNone(env.game.traffic)
+        scheduled = RacingGameEnv(frame_skip=8, scheduled_traffic=True)
+        scheduled.reset(options={'traffic_schedule': schedule})
+        scheduled.reset()
+        self.assertIsNotNone(scheduled.game.traffic)
+        self.assertIsNot(scheduled.game.traffic, schedule)
+
+    def test_compile_follows_game_config(self):
+        """A three-lane config gets a three-lane schedule the engine can run"""
+        config = GameConfig(num_lanes=3, spawn_interval=1.5)
+        schedule = TrafficSchedule.compile(1, config)
+        self.assertIs(schedule.config, config)
+        self.assertEqual({lane for _, lane, *_ in schedule.entries}, {0, 1, 2})
+        self.assertGreater(len(schedule), len(TrafficSchedule.compile(1)))
+
+        game = RoadFighterGame(config=config)
+        game.set_traffic_schedule(schedule)
+        game.reset()
+        while not game.game_over:
+            game.player.x = 0  # Off the road: no collisions
+            game.update(1 / 60.0, False, False, True)
+        self.assertEqual(game.end_reason, 'timeout')
+        self.assertEqual(game._traffic_cursor, len(schedule))
+
+    def test_schedule_must_match_engine_config(self):
+        """An engine refuses a schedule compiled for another road"""
+        game = RoadFighterGame(config=GameConfig(num_lanes=3))
+        with self.assertRaises(ValueError):
+            game.set_traffic_schedule(TrafficSchedule.compile(1))
+        # An equal config compiled separately is accepted
+        game.set_traffic_schedule(TrafficSchedule.compile(1, GameConfig(num_lanes=3)))
+
+    def test_camping_override_applied_on_pop(self):
+        """A camping player gets the next scheduled car in their lane"""
+        schedule = TrafficSchedule([(0.0, 0, 'green', 0, 1, SINGLE, 0)])
+        game = RoadFighterGame()
+        game.set_traffic_schedule(schedule)
+        game.lane_camping_mode = True
+        game.last_player_lane = 3
+        game.update(1 / 60.0, False, False, False)
+        self.assertEqual(len(game.opponents), 1)
+        self.assertEqual(game.opponents[0].start_lane, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+import torch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import train
+import tune
+
+
+class TestTune(unittest.TestCase):
+    def test_layouts_respect_the_core_count(self):
+        layouts = tune.env_layouts(2)
+        self.assertIn(("batched", 8, None), layouts)
+        self.assertIn(("shm", 8, 2), layouts)
+        for backend, n_envs, workers in layouts:
+            self.assertLessEqual(n_envs, 8)
+            if workers is not None:
+                self.assertLessEqual(workers, 2)
+        self.assertEqual(tune.thread_counts(6), [1, 2, 4])
+
+    def test_trials_write_a_config_train_applies(self):
+        saved = {name: getattr(train, name) for name in train.TUNABLE_SETTINGS}
+        threads = torch.get_num_threads()
+        original = (tune.ENV_COUNTS, tune.BACKENDS, tune.TOP_LAYOUTS, tune.PPO_TRIAL_N_STEPS)
+        tune.ENV_COUNTS, tune.BACKENDS, tune.TOP_LAYOUTS, tune.PPO_TRIAL_N_STEPS = (4,), ("batched", "dummy"), 1, 64
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "tuned_config.json")
+                tuned = tune.run_tuning(path=path, cpu_count=1, env_seconds=0.05)
+                self.assertEqual(tuned['N_ENVS'], 4)
+                self.assertIn(tuned['VEC_ENV_BACKEND'], ("batched", "dummy"))
+                self.assertEqual(len(tuned['measured']['env_trials']), 2)
+                self.assertGreater(tuned['measured']['samples_per_sec'], 0)
+                with open(path) as f:
+                    self.assertEqual(json.load(f)['TORCH_THREADS'], 1)
+
+                applied = train.apply_tuned_config(path)
+                self.assertEqual(set(applied), set(train.TUNABLE_SETTINGS))
+                self.assertEqual(train.VEC_ENV_BACKEND, tuned['VEC_ENV_BACKEND'])
+                self.assertEqual(train.N_ENVS, 4)
+        finally:
+            tune.ENV_COUNTS, tune.BACKENDS, tune.TOP_LAYOUTS, tune.PPO_TRIAL_N_STEPS = original
+            for name, value in saved.items():
+                setattr(train, name, value)
+            torch.set_num_threads(threads)
+
+    def test_missing_config_changes_nothing(self):
+        self.assertEqual(train.apply_tuned_config("/nonexistent/tuned_config.json"), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.gym_env import RacingGameEnv
+
+# Mock pygame
+with patch.dict('sys.modules', {'pygame': MagicMock(), 'pygame.mixer': MagicMock()}):
+    from src.renderer import GameRenderer
+
+
+def play_episode(env, seed=0):
+    """One episode, rendering every step; returns the number of steps"""
+    env.reset(seed=seed)
+    steps, done = 0, False
+    while not done:
+        _, _, done, _, _ = env.step(0)
+        env.render()
+        steps += 1
+    return steps
+
+
+class TestTurboRender(unittest.TestCase):
+    def test_renderer_frame_cap(self):
+        renderer = GameRenderer()
+        renderer.screen = MagicMock()
+        renderer.clock = MagicMock()
+        game = RacingGameEnv().game
+        renderer.render(game)
+        renderer.clock.tick.assert_called_with(60)
+        renderer.render(game, fps=None)
+        renderer.clock.tick.assert_called_with()
+
+    def test_turbo_drops_frames_but_shows_the_end(self):
+        renderer = MagicMock()
+        env = RacingGameEnv(render_mode="turbo", frame_skip=8, display_fps=1, renderer=renderer)
+        with patch.dict('sys.modules', {'pygame': MagicMock()}):
+            steps = play_episode(env)
+        self.assertGreater(steps, 10)
+        # The first frame, then at most one per wall-clock second, plus the last
+        self.assertLess(renderer.render.call_count, steps)
+        last = renderer.render.call_args
+        self.assertIs(last.args[0], env.game)
+        self.assertIsNone(last.kwargs['fps'])
+        self.assertTrue(env.game.game_over)
+
+    def test_human_mode_draws_every_step(self):
+        renderer = MagicMock()
+        env = RacingGameEnv(render_mode="human", frame_skip=8, renderer=renderer)
+        with patch.dict('sys.modules', {'pygame': MagicMock()}):
+            steps = play_episode(env)
+        self.assertEqual(renderer.render.call_count, steps)
+
+    def test_shared_renderer_outlives_envs_and_episodes(self):
+        renderer = MagicMock()
+        env = RacingGameEnv(render_mode="turbo", frame_skip=8, display_fps=1000, renderer=renderer)
+        with patch.dict('sys.modules', {'pygame': MagicMock()}):
+            play_episode(env, seed=1)
+            play_episode(env, seed=2)
+        env.close()
+        renderer.close.assert_not_called()
+        # The next env draws into the same window
+        second = RacingGameEnv(render_mode="turbo", renderer=renderer)
+        self.assertIs(second.renderer, renderer)
+        # Headless envs still never create one
+        self.assertIsNone(RacingGameEnv().renderer)
+
+
+if __name__ == '__main__':
+    unittest.main()
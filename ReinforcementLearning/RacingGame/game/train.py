@@ -1,12 +1,21 @@
 import gymnasium as gym
-from stable_baselines3 import PPO
 from stable_baselines3.common.callbacks import BaseCallback
 from stable_baselines3.common.env_util import make_vec_env
 from stable_baselines3.common.logger import configure
 from src.gym_env import RacingGameEnv
+from src.batched_env import BatchedRoadFighter
+from src.config import GameConfig
+from src.shm_vec_env import SharedMemoryVecEnv
+from src.env_pool import AsyncEnvPool
+from src.pipelined_ppo import PipelinedPPO
+from src.remote_env import RemoteVecEnv
+from src.resources import plan_resources, apply_plan, ResourcePlanCallback
+from src.async_eval import AsyncEvaluator, AsyncEvalCallback
+import json
 import os
 import signal
 import sys
+import torch
 
 # =========================================================
 # =========================================================
@@ -17,48 +26,27 @@ LOG_DIR = os.path.join(BASE_DIR, "logs")
 MODEL_DIR = os.path.join(BASE_DIR, "models")
 
 TOTAL_TIMESTEPS = 50_000_000  # Overnight: 50M steps for better learning
-CHECK_FREQ = 10_000  # Steps (not episodes) to verify/render
+CHECK_FREQ = 10_000  # Steps (not episodes) between evaluations of the current weights
+EVAL_EPISODES = 16  # Seeded headless races per evaluation, run by a separate evaluator process
 FRAME_SKIP = 8  # Increased from 4 to reduce zigzagging and speed up simulation
+GAME_CONFIG = None  # GameConfig variant to race on, e.g. GameConfig(num_lanes=3) (None = src/constants.py)
+N_ENVS = 8  # Parallel races per rollout
+VEC_ENV_BACKEND = "batched"  # "batched" (NumPy engine, one process), "shm"/"pool" (worker processes), "remote" (env servers) or "dummy" (make_vec_env)
+REMOTE_ENV_ADDRESSES = ["127.0.0.1:5555"]  # "remote": env_server.py instances, host:port or unix:/path (they set the race count)
+SHM_WORKERS = None  # Worker processes for the "shm" and "pool" backends (None = one per CPU)
+POOL_BATCH_SIZE = None  # "pool": races PPO acts on per batch, the first ones to finish (None = N_ENVS // 2)
+TORCH_THREADS = None  # Torch intra-op threads for the learner (None = torch default)
+PPO_BATCH_SIZE = 256
+PPO_N_EPOCHS = 20
+PLAN_CPU_RESOURCES = True  # Split cores between env workers and the learner: affinity and torch threads (src/resources.py)
+PIPELINED_TRAINING = False  # Collect rollout k+1 with a weight snapshot while training on rollout k (pays off with spare cores)
 CHECKPOINT_FREQ = 1_000_000  # Save checkpoint every 1M steps
 MODEL_PATH = os.path.join(MODEL_DIR, "road_fighter_ppo")
 
+# Machine-specific throughput settings written by tune.py, applied at startup
+TUNED_CONFIG_PATH = os.path.join(BASE_DIR, "tuned_config.json")
+TUNABLE_SETTINGS = ("N_ENVS", "VEC_ENV_BACKEND", "SHM_WORKERS", "POOL_BATCH_SIZE", "TORCH_THREADS")
 
-class PeriodicRenderCallback(BaseCallback):
-    """
-    Custom Callback to visualize the agent's performance periodically.
-    It pauses training to run ONE episode in 'human' render mode.
-    """
-    def __init__(self, check_freq: int, verbose=1):
-        super().__init__(verbose)
-        self.check_freq = check_freq
-
-    def _on_step(self) -> bool:
-        if self.n_calls % self.check_freq == 0:
-            print(f"\n--- Visualizing Performance at Step {self.num_timesteps} ---")
-            
-            # Create a separate environment for visualization
-            # We must use 'human' render mode here
-            test_env = RacingGameEnv(render_mode="human", frame_skip=FRAME_SKIP)
-            obs, _ = test_env.reset()
-            done = False
-            total_reward = 0
-            
-            while not done:
-                # Predict action using the current model
-                action, _ = self.model.predict(obs, deterministic=True)
-                
-                # Step the environment
-                obs, reward, terminated, truncated, _ = test_env.step(action)
-                done = terminated or truncated
-                total_reward += reward
-                
-                # Render is handled automatically by the env in human mode
-                test_env.render()
-                
-            test_env.close()
-            print(f"--- Visualization Complete. Score: {total_reward:.2f} ---\n")
-            
-        return True
 
 import csv
 import datetime
@@ -138,6 +126,49 @@ class CSVLoggingCallback(BaseCallback):
                     
         return True
 
+def apply_tuned_config(path=TUNED_CONFIG_PATH):
+    """
+    Override the TUNABLE_SETTINGS above with the ones tune.py measured as
+    fastest on this machine, if it has been run. Returns the applied settings.
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        tuned = json.load(f)
+    applied = {name: tuned[name] for name in TUNABLE_SETTINGS if name in tuned}
+    globals().update(applied)
+    if TORCH_THREADS:
+        torch.set_num_threads(TORCH_THREADS)
+    return applied
+
+def make_train_env(backend=None, n_envs=None, num_workers=None):
+    """
+    Build the vectorized training environment for the chosen backend
+    (defaults: VEC_ENV_BACKEND, N_ENVS, SHM_WORKERS).
+    """
+    backend = VEC_ENV_BACKEND if backend is None else backend
+    n_envs = N_ENVS if n_envs is None else n_envs
+    num_workers = SHM_WORKERS if num_workers is None else num_workers
+    env_kwargs = {'frame_skip': FRAME_SKIP, 'config': GAME_CONFIG}
+    if backend == "batched":
+        return BatchedRoadFighter(n_envs, **env_kwargs)
+    if backend == "dummy":
+        # DummyVecEnv copies each observation into its own buffer (the env
+        # copies the terminal one itself, since DummyVecEnv resets right after)
+        return make_vec_env(lambda: RacingGameEnv(copy_obs=False, **env_kwargs), n_envs=n_envs)
+    if backend == "shm":
+        # Each worker steps a group of RacingGameEnv races in shared memory
+        return SharedMemoryVecEnv(n_envs, num_workers=num_workers, env_kwargs=env_kwargs)
+    if backend == "pool":
+        # PoolPPO steps whichever POOL_BATCH_SIZE races finish first
+        batch_size = POOL_BATCH_SIZE or max(1, n_envs // 2)
+        return AsyncEnvPool(n_envs, batch_size=batch_size, num_workers=num_workers, env_kwargs=env_kwargs)
+    if backend == "remote":
+        # Races hosted by env_server.py processes, possibly on other machines
+        # (they race the default GameConfig)
+        return RemoteVecEnv(REMOTE_ENV_ADDRESSES)
+    raise ValueError(f"Unknown VEC_ENV_BACKEND: {backend}")
+
 # Global variable to handle graceful shutdown
 model_to_save = None
 
@@ -160,6 +191,11 @@ def main():
     
     # Register signal handler for Ctrl+C
     signal.signal(signal.SIGINT, signal_handler)
+
+    # Throughput settings measured by tune.py on this machine
+    tuned = apply_tuned_config()
+    if tuned:
+        print(f"⚙️  Tuned settings from {TUNED_CONFIG_PATH}: {tuned}")
     
     final_model_path = f"{MODEL_PATH}_final.zip"
     interrupted_path = f"{MODEL_PATH}_interrupted.zip"
@@ -201,41 +237,52 @@ def main():
         print(f"📂 Keeping existing logs in {LOG_DIR} (Appending)...")
 
     # 1. Create Headless Training Environment
-    # Use 8 parallel environments for ~8x speedup (overnight training)
-    train_env = make_vec_env(lambda: RacingGameEnv(frame_skip=FRAME_SKIP), n_envs=8)
+    # N_ENVS races on the VEC_ENV_BACKEND engine or processes (see make_train_env)
+    train_env = make_train_env()
+
+    # 1.5 Split the cores between env worker processes and the learner
+    resource_plan = None
+    if PLAN_CPU_RESOURCES:
+        resource_plan = plan_resources(num_workers=len(getattr(train_env, "worker_pids", [])),
+                                       pipelined=PIPELINED_TRAINING, learner_threads=TORCH_THREADS)
+        apply_plan(resource_plan, train_env)
+        print(f"🧮 CPU plan: {resource_plan.describe()}")
 
-    # 2. Initialize PPO Model
+    # 2. Initialize PPO Model (PipelinedPPO is plain PPO unless pipelined or the env is an AsyncEnvPool)
     if resume_training:
         try:
-            model = PPO.load(
+            model = PipelinedPPO.load(
                 model_to_load, 
                 env=train_env,
-                tensorboard_log=LOG_DIR 
+                tensorboard_log=LOG_DIR,
+                pipelined=PIPELINED_TRAINING
             )
             print("✅ Model loaded successfully.")
         except Exception as e:
             print(f"❌ Error loading model: {e}")
             print("Falling back to new model.")
-            model = PPO(
+            model = PipelinedPPO(
                 "MlpPolicy", 
                 train_env, 
                 verbose=1,
                 learning_rate=3e-4,
                 ent_coef=0.1, 
-                batch_size=256,   
-                n_epochs=20,       
-                tensorboard_log=LOG_DIR
+                batch_size=PPO_BATCH_SIZE,
+                n_epochs=PPO_N_EPOCHS,
+                tensorboard_log=LOG_DIR,
+                pipelined=PIPELINED_TRAINING
             )
     else:
-        model = PPO(
+        model = PipelinedPPO(
             "MlpPolicy", 
             train_env, 
             verbose=1,
             learning_rate=3e-4,
             ent_coef=0.1, 
-            batch_size=256,   
-            n_epochs=20,       
-            tensorboard_log=LOG_DIR
+            batch_size=PPO_BATCH_SIZE,
+            n_epochs=PPO_N_EPOCHS,
+            tensorboard_log=LOG_DIR,
+            pipelined=PIPELINED_TRAINING
         )
     
     # Set global reference for signal handler
@@ -245,8 +292,9 @@ def main():
     print("🚀 STARTING OVERNIGHT TRAINING")
     print("="*60)
     print(f"📊 Total Steps: {TOTAL_TIMESTEPS:,}")
-    print(f"🎮 Parallel Envs: 8")
+    print(f"🎮 Parallel Envs: {N_ENVS} ({VEC_ENV_BACKEND})")
     print(f"⚡ Frame Skip: {FRAME_SKIP} (reduced zigzagging)")
+    print(f"🔀 Pipelined: {'ON (collect while training)' if PIPELINED_TRAINING else 'OFF'}")
     print(f"💾 Checkpoints: Every {CHECKPOINT_FREQ:,} steps")
     print(f"🛑 Safe Interrupt: Press Ctrl+C to save and exit")
     print(f"📁 Logs: {LOG_DIR}/")
@@ -261,17 +309,31 @@ def main():
     if not os.path.exists(MODEL_DIR):
         os.makedirs(MODEL_DIR)
         
-    # Combine callbacks - VISUALIZATION DISABLED for speed
+    # Combine callbacks - evaluation runs headless in its own process, on the
+    # engine of VEC_ENV_BACKEND at FRAME_SKIP, so training never stops for it
+    # (see play_model.py to watch a model)
+    evaluator = AsyncEvaluator(model.policy, n_episodes=EVAL_EPISODES, frame_skip=FRAME_SKIP,
+                               backend=VEC_ENV_BACKEND, env_kwargs={'config': GAME_CONFIG})
     callbacks = [
         CheckpointCallback(save_freq=CHECKPOINT_FREQ, save_path=MODEL_PATH),
-        CSVLoggingCallback(log_dir=LOG_DIR)
+        CSVLoggingCallback(log_dir=LOG_DIR),
+        AsyncEvalCallback(evaluator, eval_freq=CHECK_FREQ)
     ]
+    if resource_plan is not None:
+        callbacks.append(ResourcePlanCallback(resource_plan))
         
-    model.learn(
-        total_timesteps=TOTAL_TIMESTEPS, 
-        callback=callbacks
-    )
+    try:
+        model.learn(
+            total_timesteps=TOTAL_TIMESTEPS, 
+            callback=callbacks
+        )
+    finally:
+        evaluator.close()
     
+    if PIPELINED_TRAINING:
+        print(f"🔀 Env {model.env_seconds:.0f}s, learner {model.learner_seconds:.0f}s, "
+              f"overlapped {model.overlap_seconds:.0f}s ({model.overlap_fraction:.0%} of learner time)")
+
     # 4. Save Final Model
     model.save(f"{MODEL_PATH}_final")
     print("Training Complete. Model Saved.")
@@ -0,0 +1,206 @@
+"""
+Road Fighter - Throughput Tuner
+
+Runs short timed trials on this machine and writes the fastest training
+layout to train.TUNED_CONFIG_PATH, which train.py applies at startup:
+
+1. Env trials: every vec-env backend over several race counts and
+   races-per-worker splits, stepped with random actions -> env-steps/sec.
+2. PPO trials: the fastest layouts under each torch thread count, timing
+   rollout collection and the PPO update separately -> samples/sec of the
+   whole collect + train loop.
+
+Learning hyperparameters (FRAME_SKIP, PPO_BATCH_SIZE, PPO_N_EPOCHS) are
+measured with but never changed: they alter what is learned, not just how fast.
+
+Usage: python tune.py
+"""
+
+import datetime
+import json
+import os
+import time
+import numpy as np
+import torch
+from stable_baselines3.common.callbacks import BaseCallback
+import train
+from src.env_pool import AsyncEnvPool
+from src.pool_ppo import PoolPPO
+
+# =========================================================
+# CONFIGURATION
+# =========================================================
+ENV_COUNTS = (4, 8, 16, 32, 64)
+ENVS_PER_WORKER = (1, 2, 4, 8, 16)
+BACKENDS = ("batched", "dummy", "shm", "pool")
+ENV_TRIAL_SECONDS = 1.0  # Timed stepping per env trial (after warm-up)
+WARMUP_STEPS = 10
+TOP_LAYOUTS = 3  # Env layouts carried into the PPO trials
+PPO_TRIAL_N_STEPS = 128  # Steps per race per trial rollout (train uses PPO's 2048)
+PPO_TRIAL_ROLLOUTS = 2  # The first rollout/update pair is warm-up
+
+
+def env_layouts(cpu_count):
+    """(backend, n_envs, num_workers) candidates for a machine with cpu_count cores"""
+    layouts = []
+    for n_envs in ENV_COUNTS:
+        if n_envs > max(8, 4 * cpu_count):
+            continue
+        for backend in BACKENDS:
+            if backend in ("batched", "dummy"):
+                layouts.append((backend, n_envs, None))
+                continue
+            for per_worker in ENVS_PER_WORKER:
+                workers = -(-n_envs // per_worker)
+                if per_worker <= n_envs and workers <= cpu_count:
+                    layouts.append((backend, n_envs, workers))
+    return layouts
+
+
+def thread_counts(cpu_count):
+    """1, 2, 4, ... up to cpu_count torch threads"""
+    counts = [1]
+    while counts[-1] * 2 <= cpu_count:
+        counts.append(counts[-1] * 2)
+    return counts
+
+
+def measure_env(backend, n_envs, num_workers, seconds=ENV_TRIAL_SECONDS):
+    """Env-steps/sec of one layout under random actions"""
+    env = train.make_train_env(backend, n_envs, num_workers)
+    rng = np.random.default_rng(0)
+    try:
+        if isinstance(env, AsyncEnvPool):
+            # Step through send/recv, as PoolPPO does
+            _, _, _, _, env_ids = env.async_reset()
+            def step():
+                env.send(rng.integers(0, 4, size=len(env_ids)), env_ids)
+                return env.recv()[4]
+        else:
+            env_ids = np.arange(n_envs)
+            env.reset()
+            def step():
+                env.step(rng.integers(0, 4, size=n_envs))
+                return env_ids
+
+        for _ in range(WARMUP_STEPS):
+            env_ids = step()
+        steps = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            env_ids = step()
+            steps += len(env_ids)
+        return steps / (time.perf_counter() - start)
+    finally:
+        env.close()
+
+
+class PhaseTimer(BaseCallback):
+    """Wall time of each rollout collection and each PPO update"""
+
+    def __init__(self):
+        super().__init__()
+        self.rollout_times = []
+        self.update_times = []
+        self._mark = None
+
+    def _on_rollout_start(self):
+        now = time.perf_counter()
+        if self._mark is not None:
+            self.update_times.append(now - self._mark)
+        self._mark = now
+
+    def _on_rollout_end(self):
+        now = time.perf_counter()
+        self.rollout_times.append(now - self._mark)
+        self._mark = now
+
+    def _on_training_end(self):
+        self._on_rollout_start()
+
+    def _on_step(self):
+        return True
+
+
+def measure_ppo(backend, n_envs, num_workers, threads):
+    """(rollout seconds, update seconds) per sample for one layout and thread count"""
+    torch.set_num_threads(threads)
+    env = train.make_train_env(backend, n_envs, num_workers)
+    try:
+        model = PoolPPO(
+            "MlpPolicy", env, n_steps=PPO_TRIAL_N_STEPS,
+            batch_size=train.PPO_BATCH_SIZE, n_epochs=train.PPO_N_EPOCHS, seed=0,
+        )
+        timer = PhaseTimer()
+        model.learn(total_timesteps=PPO_TRIAL_ROLLOUTS * PPO_TRIAL_N_STEPS * n_envs, callback=timer)
+    finally:
+        env.close()
+    samples = PPO_TRIAL_N_STEPS * n_envs
+    return timer.rollout_times[-1] / samples, timer.update_times[-1] / samples
+
+
+def run_tuning(path=train.TUNED_CONFIG_PATH, cpu_count=None, env_seconds=ENV_TRIAL_SECONDS):
+    """Run every trial, write the winner to path and return it"""
+    cpu_count = cpu_count or os.cpu_count() or 1
+    default_threads = torch.get_num_threads()
+
+    # 1. Env throughput per layout
+    env_results = []
+    for backend, n_envs, workers in env_layouts(cpu_count):
+        rate = measure_env(backend, n_envs, workers, env_seconds)
+        env_results.append({'backend': backend, 'n_envs': n_envs, 'workers': workers, 'env_steps_per_sec': rate})
+        print(f"  env  {backend:>7} n_envs={n_envs:<3} workers={workers or '-':<3} {rate:10.0f} steps/s")
+    env_results.sort(key=lambda r: -r['env_steps_per_sec'])
+
+    # 2. Whole training loop (collect + update) for the best layouts
+    ppo_results = []
+    for layout in env_results[:TOP_LAYOUTS]:
+        for threads in thread_counts(cpu_count):
+            rollout, update = measure_ppo(layout['backend'], layout['n_envs'], layout['workers'], threads)
+            result = dict(layout, torch_threads=threads,
+                          rollout_sec_per_sample=rollout, update_sec_per_sample=update,
+                          samples_per_sec=1.0 / (rollout + update))
+            ppo_results.append(result)
+            print(f"  ppo  {layout['backend']:>7} n_envs={layout['n_envs']:<3} threads={threads:<3}"
+                  f" {result['samples_per_sec']:8.0f} samples/s"
+                  f" (update {100 * update / (rollout + update):.0f}%)")
+    torch.set_num_threads(default_threads)
+    best = max(ppo_results, key=lambda r: r['samples_per_sec'])
+
+    # 3. Settings train.py picks up (see train.TUNABLE_SETTINGS)
+    n_envs = best['n_envs']
+    tuned = {
+        'N_ENVS': n_envs,
+        'VEC_ENV_BACKEND': best['backend'],
+        'SHM_WORKERS': best['workers'],
+        'POOL_BATCH_SIZE': max(1, n_envs // 2) if best['backend'] == 'pool' else None,
+        'TORCH_THREADS': best['torch_threads'],
+        'measured': {
+            'cpu_count': cpu_count,
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'frame_skip': train.FRAME_SKIP,
+            'samples_per_sec': best['samples_per_sec'],
+            'rollout_sec_per_2048_steps': best['rollout_sec_per_sample'] * 2048 * n_envs,
+            'update_sec_per_2048_steps': best['update_sec_per_sample'] * 2048 * n_envs,
+            'env_trials': env_results,
+            'ppo_trials': ppo_results,
+        },
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(tuned, f, indent=2)
+    return tuned
+
+
+def main():
+    cpu_count = os.cpu_count() or 1
+    print(f"🔧 Tuning training throughput on {cpu_count} CPU(s)...")
+    tuned = run_tuning(cpu_count=cpu_count)
+    print(f"\n✅ Best: {tuned['N_ENVS']} envs on '{tuned['VEC_ENV_BACKEND']}'"
+          f" (workers={tuned['SHM_WORKERS']}), torch threads={tuned['TORCH_THREADS']}:"
+          f" {tuned['measured']['samples_per_sec']:.0f} samples/s")
+    print(f"💾 Written to {train.TUNED_CONFIG_PATH} (train.py applies it at startup)")
+
+
+if __name__ == "__main__":
+    main()